@@ -1,8 +1,9 @@
 from datetime import datetime, timedelta
+import hmac
+import time
 from typing import Annotated, Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 # from sqlalchemy.orm import Session # Remove Session import
 
@@ -10,24 +11,27 @@ from .schemas import *
 # from . import models # Remove models import
 # from .database import get_db # Remove get_db import
 from .config import settings # Import settings
-
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from .hashing import hasher
 
 # JWT settings - now using config
 SECRET_KEY = settings.secret_key
 ALGORITHM = settings.algorithm
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
 
+# Version of the embedded profile claims. Bump it whenever the claim layout
+# changes so /api/auth/me stops trusting tokens minted with the old layout.
+# (2: added "pv", the user's profile_version.)
+FAT_TOKEN_VERSION = 2
+
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
-# Password functions
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+# Password functions - bcrypt runs on the hashing executor, never on the event loop
+async def verify_password(plain_password, hashed_password):
+    return await hasher.verify_async(plain_password, hashed_password)
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+async def get_password_hash(password):
+    return await hasher.hash_async(password)
 
 # JWT token functions
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -38,11 +42,41 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": int(time.time())})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     
     return encoded_jwt
 
+def build_token_claims(user: UserOut, profile_version: int) -> dict:
+    """Claims for a user's access token, including the profile when fat tokens are enabled."""
+    claims = {"sub": user.email, "role": user.role.value}
+    if settings.token_format == "fat":
+        claims.update({
+            "uid": user.id,
+            "given_name": user.first_name,
+            "family_name": user.last_name,
+            "ver": FAT_TOKEN_VERSION,
+            "pv": profile_version,
+        })
+    return claims
+
+def user_from_token(token_data: TokenData) -> Optional[UserOut]:
+    """
+    The profile embedded in a fat token, or None if the token is thin or was
+    minted with a different claim version and has to be looked up instead.
+    """
+    if token_data.version != FAT_TOKEN_VERSION or token_data.profile_version is None:
+        return None
+    if token_data.id is None or token_data.first_name is None or token_data.last_name is None:
+        return None
+    return UserOut(
+        id=token_data.id,
+        first_name=token_data.first_name,
+        last_name=token_data.last_name,
+        email=token_data.email,
+        role=token_data.role,
+    )
+
 # User authentication - get_current_user now only decodes the token
 async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]):
     credentials_exception = HTTPException(
@@ -60,9 +94,22 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]):
         if email is None or user_role is None:
             raise credentials_exception
         
-        token_data = TokenData(email=email, role=user_role)
+        token_data = TokenData(
+            email=email,
+            role=user_role,
+            id=payload.get("uid"),
+            first_name=payload.get("given_name"),
+            last_name=payload.get("family_name"),
+            version=payload.get("ver"),
+            profile_version=payload.get("pv"),
+        )
     except JWTError:
         raise credentials_exception
     
     # No longer fetching user from DB here
-    return token_data 
\ No newline at end of file
+    return token_data 
+# Dependency for service-to-service and operations endpoints
+def require_internal_token(x_internal_token: Optional[str] = Header(None)):
+    expected = settings.internal_api_token
+    if not expected or x_internal_token is None or not hmac.compare_digest(x_internal_token, expected):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Internal endpoint")
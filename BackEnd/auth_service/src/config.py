@@ -4,7 +4,29 @@ class Settings(BaseSettings):
     secret_key: str
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    # "fat" tokens embed the UserOut profile so /api/auth/me needs no user-service call
+    token_format: str = "fat"
     database_url: str
+    # Shared secret for /api/auth/internal/* (X-Internal-Token); unset closes them
+    internal_api_token: str = ""
+
+    # Pooled HTTP client for calls to user-service
+    user_service_url: str = "http://user-service:8000"
+    user_service_max_connections: int = 100
+    user_service_max_keepalive: int = 20
+    user_service_keepalive_expiry: float = 30.0
+    user_service_connect_timeout: float = 2.0
+    user_service_read_timeout: float = 5.0
+    user_service_pool_timeout: float = 2.0
+
+    # Short-lived cache of user-service credential lookups, invalidated by user events
+    user_cache_size: int = 10000
+    user_cache_ttl_seconds: float = 30.0
+
+    # Password hashing executor ("process" or "thread")
+    hash_executor: str = "process"
+    hash_workers: int = 2
+    hash_max_queue: int = 64
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,168 @@
+"""
+Bounded executor for bcrypt hashing and verification.
+
+bcrypt costs 100-300 ms of CPU per call, so running it inline in an
+`async def` handler stalls every request on the worker. The work is handed
+to a small process pool instead; callers beyond the pool's capacity wait in
+a bounded queue and are rejected with 503 once that queue is full.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from .config import settings
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+# Worker functions must be module-level so they can be pickled to the pool
+def _timed(fn: Callable, *args) -> tuple:
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+class PasswordHasher:
+    """
+    Runs password hashing on a bounded executor.
+
+    `workers` caps how many hashes run at once; up to `max_queue` further
+    calls may wait for a worker before new calls fail fast with 503.
+    """
+
+    def __init__(self, workers: int, max_queue: int, executor: str = "process"):
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.executor_kind = executor
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.calls = 0
+        self.rejected = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return self.run(_verify, plain_password, hashed_password)
+
+    def hash(self, password: str) -> str:
+        return self.run(_hash, password)
+
+    async def verify_async(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run_async(_verify, plain_password, hashed_password)
+
+    async def hash_async(self, password: str) -> str:
+        return await self.run_async(_hash, password)
+
+    def run(self, fn: Callable, *args) -> Any:
+        """Run `fn(*args)` on the executor, blocking the calling thread."""
+        started = time.perf_counter()
+        future = self._submit(fn, *args)
+        try:
+            result, run_seconds = future.result()
+        except Exception:
+            self._finish(started, None)
+            raise
+        self._finish(started, run_seconds)
+        return result
+
+    async def run_async(self, fn: Callable, *args) -> Any:
+        """Run `fn(*args)` on the executor without blocking the event loop."""
+        started = time.perf_counter()
+        future = self._submit(fn, *args)
+        try:
+            result, run_seconds = await asyncio.wrap_future(future)
+        except Exception:
+            self._finish(started, None)
+            raise
+        except BaseException:
+            # Cancelled (client gone, timeout): drop the call if it has not
+            # started, and free its slot once the pool is done with it
+            future.cancel()
+            future.add_done_callback(lambda _: self._finish(started, None))
+            raise
+        self._finish(started, run_seconds)
+        return result
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = self._pending
+            calls = self.calls
+            return {
+                "executor": self.executor_kind,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": min(pending, self.workers),
+                "queued": max(0, pending - self.workers),
+                "calls": calls,
+                "rejected": self.rejected,
+                "errors": self.errors,
+                "avg_ms": round(self.total_seconds / calls * 1000, 3) if calls else 0.0,
+                "avg_run_ms": round(self.total_run_seconds / calls * 1000, 3) if calls else 0.0,
+                "max_ms": round(self.max_seconds * 1000, 3),
+            }
+
+    def _submit(self, fn: Callable, *args):
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Password hashing is at capacity, please retry shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+            if self._executor is None:
+                self._executor = self._create_executor()
+            executor = self._executor
+        try:
+            return executor.submit(_timed, fn, *args)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+
+    def _finish(self, started: float, run_seconds: Optional[float]) -> None:
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._pending -= 1
+            self.calls += 1
+            self.total_seconds += elapsed
+            self.max_seconds = max(self.max_seconds, elapsed)
+            if run_seconds is None:
+                self.errors += 1
+            else:
+                self.total_run_seconds += run_seconds
+
+    def _create_executor(self) -> Executor:
+        if self.executor_kind == "thread":
+            return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return ProcessPoolExecutor(max_workers=self.workers)
+
+
+hasher = PasswordHasher(
+    workers=settings.hash_workers,
+    max_queue=settings.hash_max_queue,
+    executor=settings.hash_executor,
+)
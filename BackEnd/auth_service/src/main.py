@@ -1,6 +1,19 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from .routes import router
+from .hashing import hasher
+from .user_client import user_service_client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await user_service_client.start()
+    yield
+    await user_service_client.close()
+    hasher.shutdown()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
-app.include_router(router) 
\ No newline at end of file
+app.include_router(router)
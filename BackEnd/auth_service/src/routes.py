@@ -2,52 +2,60 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 # from sqlalchemy.orm import Session # Remove Session import
 from typing import Annotated, Optional
-import httpx # Import httpx
 
 from . import auth
-from .schemas import UserOut, TokenUserOut, TokenData
+from .hashing import hasher
+from .schemas import UserOut, TokenUserOut, TokenData, UserAuthInternal, UserEvent, UserEventType
+from .cache import TTLCache
+from .config import settings
+from .user_client import user_service_client
 # from . import models # Remove models import
 # from .database import get_db # Remove get_db import
 
 router = APIRouter()
 
-# Function to call user service API
-async def fetch_user_from_user_service(email: str):
-    # In a real scenario, use configuration for the user service URL
-    user_service_url = "http://user-service:8000/api/users/by-email/" # Use service name in docker network
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(f"{user_service_url}{email}")
-            response.raise_for_status() # Raise an exception for bad status codes
-            user_data = response.json()
-            return UserOut(**user_data) # Use UserOut schema, will need UserAuthOut later
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404:
-                return None # User not found
-            raise HTTPException(status_code=e.response.status_code, detail=f"Error fetching user from user service: {e}")
-        except httpx.RequestError as e:
-             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Network error communicating with user service: {e}")
-
-# Need a schema that includes password hash for internal communication
-# Let's define it here for now, or ideally import from a shared internal schemas package
-class UserAuthInternal(UserOut):
-    password_hash: str
-
-# Function to call user service API and get auth details
+# Recent credential lookups, keyed by lower-cased email. user-service posts
+# a UserEvent whenever a user changes so entries never outlive an update.
+user_auth_cache = TTLCache(maxsize=settings.user_cache_size, ttl=settings.user_cache_ttl_seconds)
+
+# Latest profile_version seen per email in this process. A fat token is
+# only served from its claims while its version is at least the known one;
+# an unknown version (never seen, evicted, restarted) means a lookup first.
+# Versions from events are kept as long as tokens live. Versions from
+# lookups expire with the credential cache: each user event reaches a
+# single worker, so the others only notice a change by looking it up
+# again, which bounds their staleness to user_cache_ttl_seconds.
+profile_versions = TTLCache(
+    maxsize=settings.user_cache_size,
+    ttl=settings.access_token_expire_minutes * 60,
+)
+# Recorded for deleted users: no token's version is current
+DELETED_PROFILE_VERSION = 2 ** 63 - 1
+
+def _saw_profile_version(email: str, version: int, ttl: Optional[float] = None) -> None:
+    key = email.lower()
+    known = profile_versions.get(key)
+    if known is None or version > known:
+        profile_versions.set(key, version, ttl)
+
+# Both helpers go through the app-lifetime pooled client
 async def fetch_user_auth_details_from_user_service(email: str) -> Optional[UserAuthInternal]:
-    user_service_url = "http://user-service:8000/api/users/by-email/" # Use service name in docker network
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(f"{user_service_url}{email}")
-            response.raise_for_status() # Raise an exception for bad status codes
-            user_data = response.json()
-            return UserAuthInternal(**user_data) # Use the internal schema
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404:
-                return None # User not found
-            raise HTTPException(status_code=e.response.status_code, detail=f"Error fetching user from user service: {e}")
-        except httpx.RequestError as e:
-             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Network error communicating with user service: {e}")
+    key = email.lower()
+    user = await user_auth_cache.get_or_load(
+        key, lambda: user_service_client.fetch_user_auth_details(email)
+    )
+    if user is None:
+        # Don't remember unknown emails, the user may be registering right now
+        user_auth_cache.invalidate(key)
+    else:
+        _saw_profile_version(key, user.profile_version, settings.user_cache_ttl_seconds)
+    return user
+
+async def fetch_user_from_user_service(email: str) -> Optional[UserOut]:
+    user = await fetch_user_auth_details_from_user_service(email)
+    if user is None:
+        return None
+    return UserOut(**user.model_dump(exclude={"password_hash"}))
 
 
 @router.post("/api/auth/login", response_model=TokenUserOut)
@@ -55,15 +63,9 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()): # Removed db
     # Fetch user from user service
     user_auth_details = await fetch_user_auth_details_from_user_service(form_data.username)
 
-    if not user_auth_details or not auth.verify_password(form_data.password, user_auth_details.password_hash):
+    if not user_auth_details or not await auth.verify_password(form_data.password, user_auth_details.password_hash):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
-    # Create access token
-    access_token = auth.create_access_token(data={
-        "sub": user_auth_details.email,
-        "role": user_auth_details.role.value
-        })
-
     # Return UserOut schema in the final response
     user_out = UserOut(
         id=user_auth_details.id,
@@ -73,15 +75,53 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()): # Removed db
         role=user_auth_details.role
     )
 
+    # Create access token
+    access_token = auth.create_access_token(
+        data=auth.build_token_claims(user_out, user_auth_details.profile_version)
+    )
+
     return {"access_token": access_token, "token_type": "bearer", "user": user_out}
 
 # Protected endpoint to get current user details after token validation
 @router.get("/api/auth/me", response_model=UserOut)
 async def read_users_me(current_user: Annotated[TokenData, Depends(auth.get_current_user)]):
-    # Fetch the full user object from the user service using the email from the token
+    # Fat tokens carry the whole profile; serve it straight from the verified
+    # claims when their profile_version is known to be current
+    user = auth.user_from_token(current_user)
+    known = profile_versions.get(current_user.email.lower())
+    if user is not None and known is not None and current_user.profile_version >= known:
+        return user
+
+    # Thin token, outdated token or unknown version: fetch the full user
+    # object from the user service (which also records its version)
     user = await fetch_user_from_user_service(current_user.email)
 
     if user is None:
          raise HTTPException(status_code=404, detail="User not found")
 
-    return user 
\ No newline at end of file
+    return user
+
+@router.get("/api/auth/internal/hashing/stats", dependencies=[Depends(auth.require_internal_token)])
+async def read_hashing_stats():
+    return hasher.stats()
+
+@router.get("/api/auth/internal/user-service-client/stats", dependencies=[Depends(auth.require_internal_token)])
+async def read_user_service_client_stats():
+    return user_service_client.stats()
+
+@router.post("/api/auth/internal/user-events", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(auth.require_internal_token)])
+async def receive_user_event(event: UserEvent):
+    for email in event.emails:
+        key = email.lower()
+        user_auth_cache.invalidate(key)
+        if event.event == UserEventType.deleted:
+            profile_versions.set(key, DELETED_PROFILE_VERSION)
+        elif event.profile_version is not None:
+            _saw_profile_version(key, event.profile_version)
+        else:
+            # Older user-service without versions: distrust every fat token
+            profile_versions.set(key, DELETED_PROFILE_VERSION)
+
+@router.get("/api/auth/internal/user-cache/stats", dependencies=[Depends(auth.require_internal_token)])
+async def read_user_cache_stats():
+    return user_auth_cache.stats()
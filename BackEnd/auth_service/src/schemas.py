@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import List, Optional
 from enum import Enum
 
 class UserRoleEnum(str, Enum):
@@ -16,6 +16,12 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     email: Optional[EmailStr] = None
     role: Optional[UserRoleEnum] = None # Added role to TokenData
+    # Profile claims, only present in "fat" tokens
+    id: Optional[int] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    version: Optional[int] = None
+    profile_version: Optional[int] = None
 
 class UserOut(BaseModel):
     id: int
@@ -27,6 +33,22 @@ class UserOut(BaseModel):
     class Config:
         from_attributes = True
 
+# Internal schema returned by user-service's by-email lookup, includes the password hash
+class UserAuthInternal(UserOut):
+    password_hash: str
+    profile_version: int = 1
+
+# Notification sent by user-service when a user is changed or removed
+class UserEventType(str, Enum):
+    updated = "user.updated"
+    deleted = "user.deleted"
+
+class UserEvent(BaseModel):
+    event: UserEventType
+    emails: List[str]
+    # The user's profile_version after an update
+    profile_version: Optional[int] = None
+
 class TokenUserOut(BaseModel):
     access_token: str
     token_type: str
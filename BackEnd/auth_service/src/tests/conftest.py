@@ -0,0 +1,5 @@
+import os
+
+# Settings are read when src.config is imported; the tests never reach a database
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
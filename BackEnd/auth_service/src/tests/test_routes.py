@@ -0,0 +1,135 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src import auth, routes
+from src.config import settings
+from src.schemas import UserAuthInternal, UserOut
+from src.user_client import user_service_client
+
+EMAIL = "Abebe@Example.com"
+INTERNAL_TOKEN = "internal-test-token"
+
+
+class FakeUserService:
+    """Stands in for user-service's by-email lookup and counts the calls."""
+
+    def __init__(self):
+        self.users = {}
+        self.calls = 0
+
+    def put(self, profile_version: int, first_name: str = "Abebe") -> None:
+        self.users[EMAIL.lower()] = UserAuthInternal(
+            id=7, first_name=first_name, last_name="Kebede", email=EMAIL.lower(),
+            role="passenger", password_hash="hash", profile_version=profile_version,
+        )
+
+    async def fetch_user_auth_details(self, email: str):
+        self.calls += 1
+        return self.users.get(email.lower())
+
+
+@pytest.fixture
+def user_service(monkeypatch):
+    fake = FakeUserService()
+    monkeypatch.setattr(user_service_client, "fetch_user_auth_details", fake.fetch_user_auth_details)
+    monkeypatch.setattr(settings, "internal_api_token", INTERNAL_TOKEN)
+    monkeypatch.setattr(settings, "token_format", "fat")
+    routes.user_auth_cache.clear()
+    routes.profile_versions.clear()
+    yield fake
+    routes.user_auth_cache.clear()
+    routes.profile_versions.clear()
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(routes.router)
+    return TestClient(app)
+
+
+def fat_token(profile_version: int, first_name: str = "Abebe") -> str:
+    user = UserOut(id=7, first_name=first_name, last_name="Kebede", email=EMAIL.lower(), role="passenger")
+    return auth.create_access_token(auth.build_token_claims(user, profile_version))
+
+
+def me(client, token):
+    return client.get("/api/auth/me", headers={"Authorization": f"Bearer {token}"})
+
+
+def send_event(client, event, profile_version=None, token=INTERNAL_TOKEN):
+    body = {"event": event, "emails": [EMAIL]}
+    if profile_version is not None:
+        body["profile_version"] = profile_version
+    return client.post("/api/auth/internal/user-events", json=body, headers={"X-Internal-Token": token})
+
+
+def test_unknown_version_is_looked_up_once_then_served_from_the_token(client, user_service):
+    user_service.put(profile_version=3)
+    token = fat_token(3)
+    assert me(client, token).json()["first_name"] == "Abebe"
+    assert user_service.calls == 1
+    assert me(client, token).status_code == 200
+    assert user_service.calls == 1
+    assert routes.profile_versions.get(EMAIL.lower()) == 3
+
+
+def test_older_token_gets_the_current_profile(client, user_service):
+    user_service.put(profile_version=2, first_name="Almaz")
+    response = me(client, fat_token(1))
+    assert response.json()["first_name"] == "Almaz"
+    # Known now, but the token is still older: never served from its claims
+    assert me(client, fat_token(1)).json()["first_name"] == "Almaz"
+
+
+def test_update_event_makes_older_tokens_stale(client, user_service):
+    user_service.put(profile_version=1)
+    token = fat_token(1)
+    assert me(client, token).status_code == 200
+    user_service.put(profile_version=2, first_name="Almaz")
+    assert send_event(client, "user.updated", profile_version=2).status_code == 204
+    assert me(client, token).json()["first_name"] == "Almaz"
+    calls = user_service.calls
+    assert me(client, fat_token(2, first_name="Almaz")).status_code == 200
+    assert user_service.calls == calls
+
+
+def test_versions_never_go_backwards(client, user_service):
+    send_event(client, "user.updated", profile_version=5)
+    send_event(client, "user.updated", profile_version=4)  # delivered out of order
+    assert routes.profile_versions.get(EMAIL.lower()) == 5
+
+
+def test_delete_event_rejects_every_token(client, user_service):
+    user_service.put(profile_version=1)
+    assert me(client, fat_token(1)).status_code == 200
+    del user_service.users[EMAIL.lower()]
+    assert send_event(client, "user.deleted").status_code == 204
+    assert routes.profile_versions.get(EMAIL.lower()) == routes.DELETED_PROFILE_VERSION
+    assert me(client, fat_token(1)).status_code == 404
+
+
+def test_deleted_user_is_not_trusted_after_the_marker_is_lost(client, user_service):
+    # e.g. a restart, an eviction, or the event went to another worker
+    assert me(client, fat_token(1)).status_code == 404
+    assert user_service.calls == 1
+
+
+def test_event_without_version_distrusts_fat_tokens(client, user_service):
+    send_event(client, "user.updated")
+    assert routes.profile_versions.get(EMAIL.lower()) == routes.DELETED_PROFILE_VERSION
+
+
+def test_versions_from_lookups_expire_with_the_credential_cache(client, user_service, monkeypatch):
+    user_service.put(profile_version=1)
+    monkeypatch.setattr(settings, "user_cache_ttl_seconds", 0)
+    assert me(client, fat_token(1)).status_code == 200
+    assert routes.profile_versions.get(EMAIL.lower()) is None
+    send_event(client, "user.updated", profile_version=2)
+    assert routes.profile_versions.get(EMAIL.lower()) == 2
+
+
+def test_user_events_need_the_internal_token(client, user_service):
+    assert send_event(client, "user.deleted", token="wrong").status_code == 403
+    assert routes.profile_versions.get(EMAIL.lower()) is None
@@ -0,0 +1,106 @@
+"""
+App-lifetime HTTP client for auth-service -> user-service calls.
+
+One pooled `httpx.AsyncClient` is opened in the app's lifespan handler so
+login and /api/auth/me reuse keep-alive connections instead of paying a
+TCP handshake per request.
+"""
+import time
+from typing import Optional
+from urllib.parse import quote
+
+import httpx
+from fastapi import HTTPException, status
+
+from .config import settings
+from .schemas import UserAuthInternal
+
+
+class UserServiceClient:
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_seconds = 0.0
+
+    async def start(self) -> None:
+        if self._client is not None:
+            return
+        self._client = httpx.AsyncClient(
+            base_url=settings.user_service_url,
+            limits=httpx.Limits(
+                max_connections=settings.user_service_max_connections,
+                max_keepalive_connections=settings.user_service_max_keepalive,
+                keepalive_expiry=settings.user_service_keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(
+                settings.user_service_read_timeout,
+                connect=settings.user_service_connect_timeout,
+                pool=settings.user_service_pool_timeout,
+            ),
+        )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def fetch_user_auth_details(self, email: str) -> Optional[UserAuthInternal]:
+        """
+        Fetch the user's profile and password hash by email.
+
+        Returns None when the user service answers 404.
+        """
+        if self._client is None:
+            # Outside the lifespan (e.g. scripts); open the pool on first use
+            await self.start()
+
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        started = time.perf_counter()
+        try:
+            response = await self._client.get(f"/api/users/by-email/{quote(email, safe='@')}")
+            response.raise_for_status() # Raise an exception for bad status codes
+            return UserAuthInternal(**response.json())
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return None # User not found
+            self.errors += 1
+            raise HTTPException(status_code=e.response.status_code, detail=f"Error fetching user from user service: {e}")
+        except httpx.TimeoutException as e:
+            self.timeouts += 1
+            raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=f"Timed out communicating with user service: {e!r}")
+        except httpx.RequestError as e:
+            self.errors += 1
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Network error communicating with user service: {e}")
+        finally:
+            self.in_flight -= 1
+            self.total_seconds += time.perf_counter() - started
+
+    def stats(self) -> dict:
+        connections = []
+        if self._client is not None:
+            # httpcore keeps the pool on the transport; not a public API, so read defensively
+            pool = getattr(self._client._transport, "_pool", None)
+            connections = list(getattr(pool, "connections", []) or [])
+        idle = sum(1 for conn in connections if conn.is_idle())
+        return {
+            "max_connections": settings.user_service_max_connections,
+            "max_keepalive_connections": settings.user_service_max_keepalive,
+            "open_connections": len(connections),
+            "idle_connections": idle,
+            "active_connections": len(connections) - idle,
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "avg_ms": round(self.total_seconds / self.requests * 1000, 3) if self.requests else 0.0,
+        }
+
+
+user_service_client = UserServiceClient()
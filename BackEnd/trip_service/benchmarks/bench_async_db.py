@@ -0,0 +1,88 @@
+"""
+Benchmark: sync SQLAlchemy sessions in the threadpool vs the async layer.
+
+Simulates N concurrent clients each issuing R "requests" that load one trip
+by primary key, the way a GET /trips/{id} handler would:
+
+- sync:  SessionLocal + db.get() run through anyio's default thread limiter
+         (40 threads, the same one Starlette uses for `def` handlers)
+- async: AsyncSessionLocal + await db.get() on the event loop
+
+Reports throughput and latency percentiles for each. Needs PostgreSQL with
+at least one row in `trips`:
+
+    cd BackEnd/trip_service
+    DB_HOST=localhost DB_PORT=5433 python -m benchmarks.bench_async_db --clients 500
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import anyio.to_thread
+
+from src import models
+from src.database import SessionLocal, AsyncSessionLocal, async_engine, engine
+
+
+def load_trip_sync(trip_id: int):
+    db = SessionLocal()
+    try:
+        return db.get(models.Trips, trip_id)
+    finally:
+        db.close()
+
+
+async def sync_request(trip_id: int):
+    return await anyio.to_thread.run_sync(load_trip_sync, trip_id)
+
+
+async def async_request(trip_id: int):
+    async with AsyncSessionLocal() as db:
+        return await db.get(models.Trips, trip_id)
+
+
+async def run(name, request, trip_ids, clients, requests_per_client):
+    latencies = []
+
+    async def client(offset: int):
+        for i in range(requests_per_client):
+            trip_id = trip_ids[(offset + i) % len(trip_ids)]
+            started = time.perf_counter()
+            await request(trip_id)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(n) for n in range(clients)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    total = len(latencies)
+    print(
+        f"{name:>5}: {total / elapsed:8.1f} req/s  "
+        f"p50 {statistics.median(latencies) * 1000:7.2f} ms  "
+        f"p99 {latencies[int(total * 0.99) - 1] * 1000:7.2f} ms  "
+        f"({total} requests in {elapsed:.2f} s)"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    args = parser.parse_args()
+
+    async with AsyncSessionLocal() as db:
+        trip_ids = list((await db.execute(models.Trips.__table__.select().with_only_columns(models.Trips.id).limit(1000))).scalars())
+    if not trip_ids:
+        raise SystemExit("No trips found; create some trips first")
+
+    await run("sync", sync_request, trip_ids, args.clients, args.requests)
+    await run("async", async_request, trip_ids, args.clients, args.requests)
+
+    await async_engine.dispose()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
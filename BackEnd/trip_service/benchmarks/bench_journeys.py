@@ -0,0 +1,132 @@
+"""
+Micro-benchmark: journey planner queries and updates on a synthetic timetable.
+
+No database or route service is needed: --cities cities get --trips-per-day
+trips a day each for --days days, between random pairs of cities, with
+random durations and prices. The connections are loaded into a
+JourneyPlanner the way rebuild() leaves them, then timed:
+
+- earliest arrival: JourneyPlanner.earliest_arrival (connection scan)
+- dijkstra:         a time-dependent Dijkstra over per-city departure lists,
+                    the usual alternative; also checks the scan's answers
+- cheapest:         JourneyPlanner.cheapest
+- update:           moving one trip with _apply, what a trip write costs,
+                    against re-sorting the whole list as a rebuild would
+
+    cd BackEnd/trip_service
+    python -m benchmarks.bench_journeys --cities 200 --trips-per-day 3000 --days 14 --queries 500
+"""
+import argparse
+import bisect
+import heapq
+import random
+import statistics
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from src.journeys import Connection, JourneyPlanner
+
+START = datetime(2026, 1, 1)
+
+
+def make_connections(cities: int, per_day: int, days: int, seed: int):
+    rng = random.Random(seed)
+    connections = []
+    for trip_id in range(per_day * days):
+        origin, destination = rng.sample(range(cities), 2)
+        departure = START + timedelta(days=trip_id // per_day, minutes=rng.randrange(24 * 60))
+        arrival = departure + timedelta(minutes=rng.randrange(30, 10 * 60))
+        connections.append(Connection(departure, trip_id, arrival, origin, destination, trip_id % 500, float(rng.randrange(5, 80))))
+    connections.sort()
+    return connections
+
+
+def load(planner: JourneyPlanner, connections) -> None:
+    with planner._lock:
+        planner._connections = list(connections)
+        planner._by_trip = {connection.trip_id: connection for connection in connections}
+
+
+def dijkstra_arrival(by_origin, min_transfer, origin, destination, depart_after):
+    best = {origin: depart_after}
+    heap = [(depart_after, origin)]
+    while heap:
+        reached, city = heapq.heappop(heap)
+        if city == destination:
+            return reached
+        if reached > best.get(city, reached):
+            continue
+        ready = reached if city == origin else reached + min_transfer
+        departures = by_origin[city]
+        for connection in departures[bisect.bisect_left(departures, (ready,)):]:
+            if connection.arrival_time < best.get(connection.destination, datetime.max):
+                best[connection.destination] = connection.arrival_time
+                heapq.heappush(heap, (connection.arrival_time, connection.destination))
+    return None
+
+
+def timed(name, queries, run):
+    latencies = []
+    answers = []
+    for query in queries:
+        started = time.perf_counter()
+        answers.append(run(*query))
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    print(
+        f"{name:>16}: p50 {statistics.median(latencies) * 1000:8.3f} ms, "
+        f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:8.3f} ms, "
+        f"{sum(answer is not None for answer in answers)}/{len(queries)} found"
+    )
+    return statistics.median(latencies), answers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cities", type=int, default=200)
+    parser.add_argument("--trips-per-day", type=int, default=3000)
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--min-transfer", type=float, default=15, help="minutes")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    connections = make_connections(args.cities, args.trips_per_day, args.days, args.seed)
+    planner = JourneyPlanner(args.days, 300, args.min_transfer, 48)
+    load(planner, connections)
+    by_origin = defaultdict(list)
+    for connection in connections:
+        by_origin[connection.origin].append(connection)
+    print(f"{len(connections)} connections between {args.cities} cities")
+
+    rng = random.Random(args.seed + 1)
+    queries = [
+        (*rng.sample(range(args.cities), 2), START + timedelta(days=rng.randrange(args.days // 2), hours=rng.randrange(24)))
+        for _ in range(args.queries)
+    ]
+    scan, journeys = timed("earliest arrival", queries, planner.earliest_arrival)
+    min_transfer = timedelta(minutes=args.min_transfer)
+    dijkstra, arrivals = timed("dijkstra", queries, lambda *query: dijkstra_arrival(by_origin, min_transfer, *query))
+    for journey, arrival in zip(journeys, arrivals):
+        if (journey.arrival_time if journey else None) != arrival:
+            raise SystemExit("FAILED: connection scan and Dijkstra disagree on an arrival time")
+    timed("cheapest", queries, planner.cheapest)
+    print(f"connection scan is {dijkstra / scan:.1f}x faster than Dijkstra for earliest arrival")
+
+    moved = [rng.choice(connections) for _ in range(1000)]
+    started = time.perf_counter()
+    with planner._lock:
+        for connection in moved:
+            planner._apply(connection.trip_id, connection._replace(departure_time=connection.departure_time + timedelta(minutes=5)))
+    update = (time.perf_counter() - started) / len(moved)
+    unsorted = list(connections)
+    rng.shuffle(unsorted)  # rows come back from the database in no particular order
+    started = time.perf_counter()
+    unsorted.sort()
+    resort = time.perf_counter() - started
+    print(f"{'update':>16}: {update * 1_000_000:8.1f} us per moved trip, full re-sort {resort * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
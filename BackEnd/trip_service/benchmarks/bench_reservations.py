@@ -0,0 +1,91 @@
+"""
+Contention benchmark: many clients reserving seats on one trip at once.
+
+Creates a throwaway trip with --capacity seats, then fires --clients
+concurrent reserve_seats() calls of --seats seats each through the async
+engine, the same code path as POST /trips/{id}/reservations. Checks that
+exactly capacity // seats reservations succeed, the rest are refused as
+sold out, and booked_seats never exceeds capacity. Reports throughput and
+latency percentiles.
+
+Needs PostgreSQL with the trip_service schema. Keep --clients well above
+the pool size (DB_POOL_SIZE + DB_MAX_OVERFLOW) to measure queueing too:
+
+    cd BackEnd/trip_service
+    DB_HOST=localhost DB_PORT=5433 python -m benchmarks.bench_reservations --clients 5000 --capacity 1000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import delete, select
+
+from src import models
+from src.database import AsyncSessionLocal, async_engine
+from src.reservations import reserve_seats
+
+
+async def create_trip(capacity: int) -> int:
+    departure = datetime.now().replace(microsecond=0) + timedelta(days=3650)
+    async with AsyncSessionLocal() as db:
+        trip = models.Trips(
+            route_id=0, bus_id=0, driver_id=0,
+            departure_time=departure, arrival_time=departure + timedelta(hours=1),
+            departure_date=departure.date(), price=0, booked_seats=0, capacity=capacity,
+        )
+        db.add(trip)
+        await db.commit()
+        return trip.id
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--capacity", type=int, default=1000)
+    parser.add_argument("--seats", type=int, default=1, help="seats per reservation")
+    args = parser.parse_args()
+
+    trip_id = await create_trip(args.capacity)
+    latencies = []
+    outcomes = {"reserved": 0, "refused": 0, "errors": 0}
+
+    async def client():
+        started = time.perf_counter()
+        try:
+            async with AsyncSessionLocal() as db:
+                await reserve_seats(db, trip_id, args.seats)
+            outcomes["reserved"] += 1
+        except HTTPException as e:
+            outcomes["refused" if e.status_code == 409 else "errors"] += 1
+        except Exception:
+            outcomes["errors"] += 1
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(args.clients)))
+    elapsed = time.perf_counter() - started
+
+    async with AsyncSessionLocal() as db:
+        booked = (await db.execute(select(models.Trips.booked_seats).where(models.Trips.id == trip_id))).scalar_one()
+        await db.execute(delete(models.Trips).where(models.Trips.id == trip_id))
+        await db.commit()
+    await async_engine.dispose()
+
+    latencies.sort()
+    expected = min(args.clients, args.capacity // args.seats)
+    print(
+        f"{args.clients} clients, {args.clients / elapsed:8.1f} reservations/s, "
+        f"p50 {statistics.median(latencies) * 1000:.2f} ms, p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.2f} ms"
+    )
+    print(f"reserved {outcomes['reserved']} (expected {expected}), refused {outcomes['refused']}, errors {outcomes['errors']}")
+    print(f"booked_seats {booked} / capacity {args.capacity}")
+    if booked > args.capacity or outcomes["reserved"] * args.seats != booked or outcomes["reserved"] != expected:
+        raise SystemExit("FAILED: seat count does not match the reservations made")
+    print("OK: no overselling")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
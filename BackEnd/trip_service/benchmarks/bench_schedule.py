@@ -0,0 +1,128 @@
+"""
+Benchmark: POST /trips/schedule's write path against one request per trip.
+
+Generates a daily schedule of --days trips for a throwaway bus and driver
+that already have --existing trips spread over the same dates, then writes
+it two ways:
+
+- per trip: one overlap SELECT and one INSERT + COMMIT per trip, what a
+  client creating the trips one at a time would cost the database
+- schedule: expand(), one check_conflicts() SELECT and one multi-row
+  insert_trips(), the code path of POST /trips/schedule
+
+Each mode runs --repeat times on a fresh set of dates and the best run is
+reported, split into its phases for the schedule path. Every trip created is
+deleted afterwards. Needs PostgreSQL with the trip_service schema:
+
+    cd BackEnd/trip_service
+    DB_HOST=localhost DB_PORT=5433 python -m benchmarks.bench_schedule --days 365 --existing 200
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, datetime, time as time_of_day, timedelta
+
+from sqlalchemy import delete, insert, or_, select
+
+from src import models, schemas
+from src.database import AsyncSessionLocal, async_engine
+from src.schedule import check_conflicts, expand, insert_trips
+
+Trips = models.Trips
+
+
+def make_schedule(bus_id: int, driver_id: int, start: date, days: int) -> schemas.TripSchedule:
+    return schemas.TripSchedule(
+        route_id=0, bus_id=bus_id, driver_id=driver_id,
+        start_date=start, end_date=start + timedelta(days=days - 1),
+        departure_time=time_of_day(8, 0), arrival_time=time_of_day(10, 0), price=0,
+    )
+
+
+async def add_existing(bus_id: int, driver_id: int, start: date, days: int, count: int) -> None:
+    # Evening trips, so they are scanned by check_conflicts but never overlap
+    rows = []
+    for day in random.sample(range(days), min(count, days)):
+        departure = datetime.combine(start + timedelta(days=day), time_of_day(18, 0))
+        rows.append({
+            "route_id": 0, "bus_id": bus_id, "driver_id": driver_id, "price": 0, "booked_seats": 0,
+            "departure_time": departure, "arrival_time": departure + timedelta(hours=2),
+            "departure_date": departure.date(),
+        })
+    if rows:
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(Trips), rows)
+            await db.commit()
+
+
+async def per_trip(schedule: schemas.TripSchedule) -> dict:
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        for trip in expand(schedule, None):
+            overlap = (await db.execute(
+                select(Trips.id).where(
+                    or_(Trips.bus_id == trip["bus_id"], Trips.driver_id == trip["driver_id"]),
+                    Trips.departure_time < trip["arrival_time"],
+                    Trips.arrival_time > trip["departure_time"],
+                ).limit(1)
+            )).first()
+            if overlap is not None:
+                raise SystemExit(f"FAILED: unexpected overlap on {trip['departure_date']}")
+            await db.execute(insert(Trips).values(**trip))
+            await db.commit()
+    return {"total": time.perf_counter() - started}
+
+
+async def scheduled(schedule: schemas.TripSchedule) -> dict:
+    started = time.perf_counter()
+    trips = expand(schedule, None)
+    expanded = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        await check_conflicts(db, trips)
+        checked = time.perf_counter()
+        ids = await insert_trips(db, trips)
+    done = time.perf_counter()
+    if len(ids) != len(trips):
+        raise SystemExit("FAILED: not every generated trip was inserted")
+    return {"expand": expanded - started, "check": checked - expanded, "insert": done - checked, "total": done - started}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=365, help="trips per schedule (one a day)")
+    parser.add_argument("--existing", type=int, default=200, help="trips the bus and driver already have in the range")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # Ids no real bus or driver uses, so the runs conflict with nothing else
+    bus_id = driver_id = -random.randint(1, 2**30)
+    start = date.today() + timedelta(days=3650)
+    results = {}
+    try:
+        for name, run in (("per trip", per_trip), ("schedule", scheduled)):
+            best = None
+            for _ in range(args.repeat):
+                await add_existing(bus_id, driver_id, start, args.days, args.existing)
+                timings = await run(make_schedule(bus_id, driver_id, start, args.days))
+                if best is None or timings["total"] < best["total"]:
+                    best = timings
+                start += timedelta(days=args.days)
+            results[name] = best
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(Trips).where(or_(Trips.bus_id == bus_id, Trips.driver_id == driver_id)))
+            await db.commit()
+        await async_engine.dispose()
+
+    for name, timings in results.items():
+        phases = ", ".join(f"{phase} {seconds * 1000:.1f} ms" for phase, seconds in timings.items() if phase != "total")
+        print(
+            f"{name:9s} {args.days} trips in {timings['total'] * 1000:9.1f} ms "
+            f"({args.days / timings['total']:9.1f} trips/s){f'  [{phases}]' if phases else ''}"
+        )
+    print(f"schedule is {results['per trip']['total'] / results['schedule']['total']:.1f}x faster than one request per trip")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
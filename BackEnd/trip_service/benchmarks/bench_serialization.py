@@ -0,0 +1,100 @@
+"""
+Micro-benchmark: per-row cost of serializing a trip list.
+
+No database is needed: rows are in-memory stand-ins for what GET /trips/
+loads (ORM-like objects for the default path, column-row dicts for the fast
+path), both with Numeric prices as Decimal. Timed from loaded rows to JSON
+bytes:
+
+- models + validate: _trip_out() per row, then List[schemas.Trip] validated
+  again and dumped, as FastAPI does for a `response_model`
+- models + stdlib:   _trip_out() per row, jsonable_encoder and json.dumps,
+  the path taken by older FastAPI releases
+- fast path:         TRIP_LIST.dump_json on the row dicts
+  (FAST_JSON_RESPONSES=true)
+
+    cd BackEnd/trip_service
+    python -m benchmarks.bench_serialization --rows 500 --repeat 200
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from src import schemas
+from src.responses import TRIP_LIST
+from src.routes import _trip_out
+
+TRIP_OUT_LIST = TypeAdapter(List[schemas.Trip])
+
+
+def make_rows(count: int):
+    start = datetime(2026, 1, 1, 6, 0)
+    rows = []
+    for i in range(count):
+        departure = start + timedelta(minutes=15 * i)
+        rows.append({
+            "trip_id": i,
+            "bus_id": i % 50,
+            "driver_id": i % 80,
+            "departure_time": departure,
+            "arrival_time": departure + timedelta(hours=5),
+            "departure_date": departure.date(),
+            "price": Decimal("450.00"),
+            "route_id": i % 12,
+        })
+    return rows
+
+
+def as_orm(row: dict) -> SimpleNamespace:
+    values = dict(row)
+    values["id"] = values.pop("trip_id")
+    return SimpleNamespace(**values)
+
+
+def models_validate(trips) -> bytes:
+    return TRIP_OUT_LIST.dump_json(TRIP_OUT_LIST.validate_python([_trip_out(trip) for trip in trips], from_attributes=True))
+
+
+def models_stdlib(trips) -> bytes:
+    return json.dumps(jsonable_encoder([_trip_out(trip) for trip in trips])).encode()
+
+
+def fast_path(rows) -> bytes:
+    return TRIP_LIST.dump_json(rows)
+
+
+def run(name, serialize, rows, repeat):
+    serialize(rows)  # warm up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        serialize(rows)
+    elapsed = time.perf_counter() - started
+    per_row_us = elapsed / (repeat * len(rows)) * 1_000_000
+    print(f"{name:>17}: {per_row_us:7.2f} us/row, {elapsed / repeat * 1000:8.3f} ms/response")
+    return per_row_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    trips = [as_orm(row) for row in rows]
+    assert json.loads(models_validate(trips)) == json.loads(fast_path(rows))
+    baseline = run("models + validate", models_validate, trips, args.repeat)
+    run("models + stdlib", models_stdlib, trips, args.repeat)
+    fast = run("fast path", fast_path, rows, args.repeat)
+    print(f"fast path is {baseline / fast:.1f}x faster per row than models + validate")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,16 @@
 from datetime import datetime, timedelta
 from typing import Annotated, Optional
+import hmac
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
 from . import schemas
 from . import models
 from .database import get_db
+from .config import settings
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -69,3 +71,14 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: Se
         raise credentials_exception
     
     return user
+
+
+# Dependency for operations endpoints
+def require_internal_token(x_internal_token: Optional[str] = Header(None)) -> None:
+    """
+    Allow the request only if it carries INTERNAL_API_TOKEN in the
+    X-Internal-Token header. Nothing is allowed while the token is unset.
+    """
+    expected = settings.INTERNAL_API_TOKEN
+    if not expected or x_internal_token is None or not hmac.compare_digest(x_internal_token, expected):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Internal endpoint")
@@ -7,4 +7,87 @@ class Settings:
     DB_NAME: str = os.getenv("DB_NAME", "microservices_db")
     DB_PORT: str = os.getenv("DB_PORT", "5432")
 
+    DATABASE_URL: str = os.getenv(
+        "DATABASE_URL",
+        f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}",
+    )
+    # Async data layer (asyncpg)
+    ASYNC_DATABASE_URL: str = os.getenv(
+        "ASYNC_DATABASE_URL",
+        f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}",
+    )
+
+    # Connection pool, applied to both the sync and the async engine
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # Behind PgBouncer in transaction mode: no app-side pool and no named
+    # prepared statements that could outlive a transaction's server connection
+    DB_PGBOUNCER: bool = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
+
+    # Shared secret operations tooling sends in X-Internal-Token to reach the
+    # /internal/* endpoints; they are refused while it is unset
+    INTERNAL_API_TOKEN: str = os.getenv("INTERNAL_API_TOKEN", "")
+
+    # Optional streaming replica for read-only endpoints. Reads fall back to
+    # the primary while replay lag exceeds REPLICA_MAX_LAG_SECONDS or the
+    # replica is down, and for REPLICA_STICKY_SECONDS after a client's write.
+    REPLICA_DATABASE_URL: str = os.getenv("REPLICA_DATABASE_URL", "")
+    REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+    REPLICA_CHECK_INTERVAL_SECONDS: float = float(os.getenv("REPLICA_CHECK_INTERVAL_SECONDS", "1"))
+    REPLICA_STICKY_SECONDS: int = int(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+
+    # Services that own the rows a trip references
+    ROUTE_SERVICE_URL: str = os.getenv("ROUTE_SERVICE_URL", "http://route-service:8000")
+    BUS_SERVICE_URL: str = os.getenv("BUS_SERVICE_URL", "http://bus-service:8000")
+    USER_SERVICE_URL: str = os.getenv("USER_SERVICE_URL", "http://user-service:8000")
+
+    # Shared HTTP client for reference validation (see references.py)
+    REFERENCE_MAX_CONNECTIONS: int = int(os.getenv("REFERENCE_MAX_CONNECTIONS", "100"))
+    REFERENCE_MAX_KEEPALIVE: int = int(os.getenv("REFERENCE_MAX_KEEPALIVE", "20"))
+    REFERENCE_KEEPALIVE_EXPIRY: float = float(os.getenv("REFERENCE_KEEPALIVE_EXPIRY", "30"))
+    REFERENCE_CONNECT_TIMEOUT: float = float(os.getenv("REFERENCE_CONNECT_TIMEOUT", "2"))
+    REFERENCE_READ_TIMEOUT: float = float(os.getenv("REFERENCE_READ_TIMEOUT", "5"))
+    REFERENCE_POOL_TIMEOUT: float = float(os.getenv("REFERENCE_POOL_TIMEOUT", "2"))
+    # Found references are cached for the TTL, missing ones only briefly so a
+    # newly created route, bus or driver can be used almost at once
+    REFERENCE_CACHE_SIZE: int = int(os.getenv("REFERENCE_CACHE_SIZE", "10000"))
+    REFERENCE_CACHE_TTL_SECONDS: float = float(os.getenv("REFERENCE_CACHE_TTL_SECONDS", "60"))
+    REFERENCE_NEGATIVE_TTL_SECONDS: float = float(os.getenv("REFERENCE_NEGATIVE_TTL_SECONDS", "5"))
+
+    # /trips/search/ result cache, keyed on (route_id, departure_date). Trip
+    # writes in this process invalidate the affected keys; other workers
+    # catch up within the TTL.
+    SEARCH_CACHE_SIZE: int = int(os.getenv("SEARCH_CACHE_SIZE", "10000"))
+    SEARCH_CACHE_TTL_SECONDS: float = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "30"))
+
+    # Keyset pagination and streaming for GET /trips/
+    DEFAULT_PAGE_SIZE: int = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+    MAX_PAGE_SIZE: int = int(os.getenv("MAX_PAGE_SIZE", "500"))
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+    # Encode list responses straight from column rows with a prebuilt
+    # TypeAdapter instead of per-row models re-validated by FastAPI
+    FAST_JSON_RESPONSES: bool = os.getenv("FAST_JSON_RESPONSES", "false").lower() == "true"
+
+    # In-memory seat maps and seat holds (see seatmap.py)
+    SEAT_HOLD_TTL_SECONDS: float = float(os.getenv("SEAT_HOLD_TTL_SECONDS", "600"))
+    SEAT_HOLD_WHEEL_SLOTS: int = int(os.getenv("SEAT_HOLD_WHEEL_SLOTS", "1024"))
+    # How stale a seat map may get before bookings by other workers are re-read
+    SEATMAP_REFRESH_SECONDS: float = float(os.getenv("SEATMAP_REFRESH_SECONDS", "5"))
+
+    # Upper bound on trips generated by one POST /trips/schedule
+    SCHEDULE_MAX_TRIPS: int = int(os.getenv("SCHEDULE_MAX_TRIPS", "1000"))
+
+    # Journey planner (see journeys.py). Trips become connections between the
+    # cities named by these fields of the route service payload.
+    ROUTE_ORIGIN_FIELD: str = os.getenv("ROUTE_ORIGIN_FIELD", "origin_city_id")
+    ROUTE_DESTINATION_FIELD: str = os.getenv("ROUTE_DESTINATION_FIELD", "destination_city_id")
+    PLANNER_HORIZON_DAYS: float = float(os.getenv("PLANNER_HORIZON_DAYS", "31"))
+    PLANNER_REBUILD_SECONDS: float = float(os.getenv("PLANNER_REBUILD_SECONDS", "300"))
+    PLANNER_MIN_TRANSFER_MINUTES: float = float(os.getenv("PLANNER_MIN_TRANSFER_MINUTES", "15"))
+    PLANNER_SEARCH_WINDOW_HOURS: float = float(os.getenv("PLANNER_SEARCH_WINDOW_HOURS", "48"))
+
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,102 @@
+"""
+Connection-pool metrics for the service's database engines.
+
+Counters come from SQLAlchemy pool events; the time spent waiting for a
+connection is measured by the session dependencies in database.py, which
+check a connection out up front.
+
+The user and trip services each keep an identical copy of this module,
+since each image is built from its own directory; change both together.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+
+class PoolMetrics:
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._pool = None
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.overflow_events = 0
+        self.timeouts = 0
+        self.waits = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def instrument(self, engine) -> None:
+        pool = engine.pool
+        self._pool = pool
+
+        @event.listens_for(pool, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            with self._lock:
+                self.connects += 1
+                # checkedout() already counts the connection being opened, so
+                # it is overflow only once more than pool_size are out
+                if _pool_value(pool, "checkedout") > _pool_value(pool, "size") > 0:
+                    self.overflow_events += 1
+
+        @event.listens_for(pool, "checkout")
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            with self._lock:
+                self.checkouts += 1
+
+        @event.listens_for(pool, "checkin")
+        def on_checkin(dbapi_connection, connection_record):
+            with self._lock:
+                self.checkins += 1
+
+        @event.listens_for(pool, "invalidate")
+        def on_invalidate(dbapi_connection, connection_record, exception):
+            with self._lock:
+                self.invalidations += 1
+
+    @contextmanager
+    def timed_wait(self):
+        """Time a pool checkout, counting pool timeouts."""
+        started = time.perf_counter()
+        try:
+            yield
+        except PoolTimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._lock:
+                self.waits += 1
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def snapshot(self) -> dict:
+        pool = self._pool
+        with self._lock:
+            return {
+                "pool": type(pool).__name__ if pool is not None else None,
+                "size": _pool_value(pool, "size"),
+                "checked_out": _pool_value(pool, "checkedout"),
+                "checked_in": _pool_value(pool, "checkedin"),
+                "overflow": _pool_value(pool, "overflow"),
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "overflow_events": self.overflow_events,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.wait_seconds_total / self.waits * 1000, 3) if self.waits else 0.0,
+                "max_wait_ms": round(self.wait_seconds_max * 1000, 3),
+            }
+
+
+def _pool_value(pool, name: str) -> int:
+    # NullPool (PgBouncer mode) has none of the QueuePool counters
+    method = getattr(pool, name, None)
+    return method() if callable(method) else 0
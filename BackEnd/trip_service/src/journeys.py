@@ -0,0 +1,295 @@
+"""
+Multi-leg journey planning over the trips table (Connection Scan Algorithm).
+
+Every trip with both times set, departing inside the planning horizon, is
+one connection: (departure, arrival, origin city, destination city, price).
+A trip only knows its route_id, so the cities come from the route service
+payload (ROUTE_ORIGIN_FIELD / ROUTE_DESTINATION_FIELD), fetched through the
+cached reference client. Connections are kept in one list sorted by
+departure time, and a query is a single forward scan of it:
+
+- earliest arrival: a connection can be taken if its origin is reached at
+  least PLANNER_MIN_TRANSFER_MINUTES before it departs (no margin at the
+  starting city); the scan stops once departures are past the best arrival
+  at the destination found so far.
+- cheapest: labels (arrival, cost) wait in a heap until they are ready for
+  a transfer and then lower the best cost known at their city; the scan is
+  bounded by PLANNER_SEARCH_WINDOW_HOURS after the requested departure.
+
+Trip writes in this process update the list in place. The whole list is
+rebuilt every PLANNER_REBUILD_SECONDS, which picks up writes from other
+workers and moves the horizon forward.
+"""
+import asyncio
+import bisect
+import heapq
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models, schemas
+from .config import settings
+from .references import reference_client
+
+Trips = models.Trips
+
+
+class Connection(NamedTuple):
+    # Field order is the sort order; trip_id makes every tuple unique
+    departure_time: datetime
+    trip_id: int
+    arrival_time: datetime
+    origin: int
+    destination: int
+    route_id: int
+    price: float
+
+
+TRIP_COLUMNS = (Trips.id, Trips.route_id, Trips.departure_time, Trips.arrival_time, Trips.price)
+
+
+class JourneyPlanner:
+    def __init__(self, horizon_days: float, rebuild_seconds: float, min_transfer_minutes: float, search_window_hours: float):
+        self.horizon = timedelta(days=horizon_days)
+        self.rebuild_seconds = rebuild_seconds
+        self.min_transfer = timedelta(minutes=min_transfer_minutes)
+        self.search_window = timedelta(hours=search_window_hours)
+        self._lock = threading.Lock()
+        self._rebuild_lock = asyncio.Lock()
+        self._connections: List[Connection] = []
+        self._by_trip: Dict[int, Connection] = {}
+        self._built_at: Optional[float] = None
+        self._pending: Optional[List[Tuple[int, Optional[Connection]]]] = None
+        self.rebuilds = 0
+        self.updates = 0
+        self.skipped_routes = 0
+
+    # --- building and incremental updates ---
+
+    async def rebuild(self, db: AsyncSession) -> int:
+        """Reload every connection in the horizon; returns how many there are."""
+        with self._lock:
+            # Writes made while loading are replayed on top of the new list
+            self._pending = []
+        try:
+            window_start, window_end = self._window()
+            rows = (await db.execute(
+                select(*TRIP_COLUMNS).where(
+                    Trips.departure_time >= window_start,
+                    Trips.departure_time < window_end,
+                    Trips.arrival_time.isnot(None),
+                )
+            )).all()
+            connections = await self._connections_for(rows)
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+        connections.sort()
+        with self._lock:
+            self._connections = connections
+            self._by_trip = {connection.trip_id: connection for connection in connections}
+            for trip_id, connection in self._pending:
+                self._apply(trip_id, connection)
+            self._pending = None
+            self._built_at = time.monotonic()
+            self.rebuilds += 1
+            return len(self._connections)
+
+    async def ensure_fresh(self, sessions: Callable[[], AsyncSession]) -> None:
+        """Rebuild if the list is due; a session is only opened for the rebuild."""
+        if self._built_at is not None and time.monotonic() - self._built_at < self.rebuild_seconds:
+            return
+        async with self._rebuild_lock:
+            # Another request may have rebuilt while we waited
+            if self._built_at is None or time.monotonic() - self._built_at >= self.rebuild_seconds:
+                async with sessions() as db:
+                    await self.rebuild(db)
+
+    async def refresh_trips(self, db: AsyncSession, trip_ids: Iterable[int]) -> None:
+        """Re-read trips after a write in this process and move their connections."""
+        trip_ids = list(trip_ids)
+        window_start, window_end = self._window()
+        rows = (await db.execute(select(*TRIP_COLUMNS).where(Trips.id.in_(trip_ids)))).all()
+        connections = {connection.trip_id: connection for connection in await self._connections_for(rows)}
+        for trip_id in trip_ids:
+            connection = connections.get(trip_id)
+            if connection is not None and not window_start <= connection.departure_time < window_end:
+                connection = None
+            self._record(trip_id, connection)
+
+    def remove(self, trip_id: int) -> None:
+        self._record(trip_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "connections": len(self._connections),
+                "cities": len({c.origin for c in self._connections} | {c.destination for c in self._connections}),
+                "age_seconds": None if self._built_at is None else round(time.monotonic() - self._built_at, 3),
+                "rebuilds": self.rebuilds,
+                "updates": self.updates,
+                "skipped_routes": self.skipped_routes,
+            }
+
+    def _record(self, trip_id: int, connection: Optional[Connection]) -> None:
+        with self._lock:
+            self.updates += 1
+            if self._pending is not None:
+                self._pending.append((trip_id, connection))
+            self._apply(trip_id, connection)
+
+    def _apply(self, trip_id: int, connection: Optional[Connection]) -> None:
+        # Caller holds the lock. Inserting into the sorted list is a memmove,
+        # cheap next to the request that changed the trip.
+        old = self._by_trip.pop(trip_id, None)
+        if old is not None:
+            index = bisect.bisect_left(self._connections, old)
+            if index < len(self._connections) and self._connections[index] == old:
+                del self._connections[index]
+        if connection is not None:
+            bisect.insort(self._connections, connection)
+            self._by_trip[trip_id] = connection
+
+    async def _connections_for(self, trips) -> List[Connection]:
+        trips = [trip for trip in trips if trip.departure_time is not None and trip.arrival_time is not None]
+        route_ids = list({trip.route_id for trip in trips})
+        payloads = await asyncio.gather(
+            *(reference_client.fetch("route", route_id) for route_id in route_ids),
+            return_exceptions=True,
+        )
+        cities = {}
+        for route_id, payload in zip(route_ids, payloads):
+            endpoints = _route_cities(payload)
+            if endpoints is None:
+                self.skipped_routes += 1
+            else:
+                cities[route_id] = endpoints
+        return [
+            Connection(
+                trip.departure_time, trip.id, trip.arrival_time,
+                *cities[trip.route_id], trip.route_id, float(trip.price or 0),
+            )
+            for trip in trips
+            if trip.route_id in cities
+        ]
+
+    def _window(self) -> Tuple[datetime, datetime]:
+        now = datetime.now()
+        # Trips that left recently can still be part of a journey in progress
+        return now - timedelta(days=1), now + self.horizon
+
+    # --- queries ---
+
+    def earliest_arrival(self, origin: int, destination: int, depart_after: datetime) -> Optional[schemas.Journey]:
+        with self._lock:
+            connections = self._connections
+            arrival: Dict[int, datetime] = {origin: depart_after}
+            via: Dict[int, int] = {}
+            for index in range(bisect.bisect_left(connections, (depart_after,)), len(connections)):
+                connection = connections[index]
+                best = arrival.get(destination)
+                if best is not None and connection.departure_time >= best:
+                    break
+                reached = arrival.get(connection.origin)
+                if reached is None:
+                    continue
+                margin = timedelta(0) if connection.origin == origin else self.min_transfer
+                if reached + margin > connection.departure_time:
+                    continue
+                current = arrival.get(connection.destination)
+                if connection.destination != origin and (current is None or connection.arrival_time < current):
+                    arrival[connection.destination] = connection.arrival_time
+                    via[connection.destination] = index
+            if destination not in via:
+                return None
+            legs = []
+            city = destination
+            while city != origin:
+                connection = connections[via[city]]
+                legs.append(connection)
+                city = connection.origin
+        return _journey(legs[::-1])
+
+    def cheapest(self, origin: int, destination: int, depart_after: datetime) -> Optional[schemas.Journey]:
+        with self._lock:
+            connections = self._connections
+            # label id -> (connection index, parent label id)
+            labels: List[Tuple[int, Optional[int]]] = []
+            best: Dict[int, Tuple[float, Optional[int]]] = {origin: (0.0, None)}
+            pending: List[Tuple[datetime, float, int, int]] = []  # (ready at, cost, label, city)
+            found: Optional[Tuple[float, datetime, int]] = None
+            window_end = depart_after + self.search_window
+            for index in range(bisect.bisect_left(connections, (depart_after,)), len(connections)):
+                connection = connections[index]
+                if connection.departure_time > window_end:
+                    break
+                # Arrivals ready for a transfer before this departure
+                while pending and pending[0][0] <= connection.departure_time:
+                    _, cost, label, city = heapq.heappop(pending)
+                    if city not in best or cost < best[city][0]:
+                        best[city] = (cost, label)
+                if connection.origin not in best:
+                    continue
+                cost = best[connection.origin][0] + connection.price
+                # Anything built on this leg costs at least `cost` and arrives
+                # no earlier, so it cannot beat the best journey found so far
+                if found is not None and (cost, connection.arrival_time) >= found[:2]:
+                    continue
+                labels.append((index, best[connection.origin][1]))
+                label = len(labels) - 1
+                if connection.destination == destination:
+                    if found is None or (cost, connection.arrival_time) < found[:2]:
+                        found = (cost, connection.arrival_time, label)
+                elif connection.destination != origin:
+                    heapq.heappush(pending, (connection.arrival_time + self.min_transfer, cost, label, connection.destination))
+            if found is None:
+                return None
+            legs = []
+            label = found[2]
+            while label is not None:
+                index, label = labels[label]
+                legs.append(connections[index])
+        return _journey(legs[::-1])
+
+
+def _route_cities(payload) -> Optional[Tuple[int, int]]:
+    if not isinstance(payload, dict):
+        return None
+    try:
+        return int(payload[settings.ROUTE_ORIGIN_FIELD]), int(payload[settings.ROUTE_DESTINATION_FIELD])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _journey(legs: List[Connection]) -> schemas.Journey:
+    return schemas.Journey(
+        departure_time=legs[0].departure_time,
+        arrival_time=legs[-1].arrival_time,
+        price=round(sum(leg.price for leg in legs), 2),
+        transfers=len(legs) - 1,
+        legs=[
+            schemas.JourneyLeg(
+                trip_id=leg.trip_id,
+                route_id=leg.route_id,
+                from_city_id=leg.origin,
+                to_city_id=leg.destination,
+                departure_time=leg.departure_time,
+                arrival_time=leg.arrival_time,
+                price=leg.price,
+            )
+            for leg in legs
+        ],
+    )
+
+
+journey_planner = JourneyPlanner(
+    settings.PLANNER_HORIZON_DAYS,
+    settings.PLANNER_REBUILD_SECONDS,
+    settings.PLANNER_MIN_TRANSFER_MINUTES,
+    settings.PLANNER_SEARCH_WINDOW_HOURS,
+)
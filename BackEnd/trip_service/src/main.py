@@ -2,6 +2,8 @@
 FastAPI main entrypoint for Auth API.
 Handles app creation, CORS, and router inclusion.
 """
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
@@ -12,11 +14,26 @@ from fastapi import status, Request
 from . import models
 from . import database
 from .routes import router
+from .replica import SAFE_METHODS
+from .references import reference_client
+from .seatmap import seat_registry
+from .journeys import journey_planner
 
 # Create the database tables
 models.Base.metadata.create_all(bind=database.engine)
 
-app = FastAPI(title="Auth API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled client for route/bus/user-service calls, for the app's lifetime
+    await reference_client.start()
+    # Seat maps of upcoming trips, so seat selection never starts cold
+    async with database.AsyncSessionLocal() as db:
+        await seat_registry.rebuild(db)
+        await journey_planner.rebuild(db)
+    yield
+    await reference_client.close()
+
+app = FastAPI(title="Auth API", lifespan=lifespan)
 
 # Global exception handler for password too short
 @app.exception_handler(RequestValidationError)
@@ -33,6 +50,14 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         content={"detail": exc.errors()}
     )
 
+# Read-your-writes: after a successful write, this client's reads skip the replica for a while
+@app.middleware("http")
+async def stick_reads_to_primary_after_write(request: Request, call_next):
+    response = await call_next(request)
+    if request.method not in SAFE_METHODS and response.status_code < 400:
+        database.replica.mark_write(response)
+    return response
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -40,6 +65,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include the router
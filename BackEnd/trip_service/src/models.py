@@ -1,10 +1,20 @@
-from sqlalchemy import Column, Integer, DateTime, Numeric, Date
+from sqlalchemy import DDL, CheckConstraint, Column, Integer, DateTime, Numeric, Date, Index, ForeignKey, String, UniqueConstraint, event, func
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.orm import relationship
 from .database import Base  # Assuming Base = declarative_base()
 
 
 class Trips(Base):
     __tablename__ = "trips"
+    __table_args__ = (
+        # /trips/search/: equality on route and date, rows returned in departure order
+        Index("idx_trips_route_date_time", "route_id", "departure_date", "departure_time"),
+        # GET /trips/ keyset pagination
+        Index("idx_trips_departure_date_id", "departure_date", "id"),
+        # Last line of defence against overselling; reservations already
+        # check this in their UPDATE
+        CheckConstraint("booked_seats >= 0 AND (capacity IS NULL OR booked_seats <= capacity)", name="ck_trips_booked_seats"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     route_id = Column(Integer, nullable=False)
@@ -14,4 +24,53 @@ class Trips(Base):
     departure_date = Column(Date)
     price = Column(Numeric(10, 2))
     booked_seats = Column(Integer)
-    driver_id = Column(Integer,nullable=False)
\ No newline at end of file
+    capacity = Column(Integer)  # seats on the bus; None = unknown, not bookable
+    driver_id = Column(Integer,nullable=False)
+
+# A bus or driver cannot be on two trips at once. Each constraint is a GiST
+# index over (id, [departure_time, arrival_time)): the overlap check is an
+# index probe done by PostgreSQL inside the INSERT/UPDATE, so concurrent
+# writes cannot both get through. Trips missing a time are not checked.
+def _no_overlap(column, name: str) -> ExcludeConstraint:
+    return ExcludeConstraint(
+        (column, "="),
+        (func.tsrange(Trips.departure_time, Trips.arrival_time, "[)"), "&&"),
+        name=name,
+        using="gist",
+        where="departure_time IS NOT NULL AND arrival_time IS NOT NULL",
+    )
+
+_no_overlap(Trips.bus_id, "ex_trips_bus_overlap")
+_no_overlap(Trips.driver_id, "ex_trips_driver_overlap")
+
+# btree_gist provides the GiST "=" operator class for the integer ids
+event.listen(
+    Trips.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"),
+)
+
+
+class TripSeatBooking(Base):
+    """A booked seat on a trip; the seat maps in seatmap.py are built from these rows."""
+    __tablename__ = "trip_seat_bookings"
+    __table_args__ = (
+        # One booking per seat; also serves the per-trip lookups
+        UniqueConstraint("trip_id", "seat_number", name="uq_trip_seat_bookings_seat"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    trip_id = Column(Integer, ForeignKey("trips.id", ondelete="CASCADE"), nullable=False)
+    seat_number = Column(Integer, nullable=False)
+    hold_id = Column(String(32))  # the hold that was confirmed
+    booked_at = Column(DateTime, server_default=func.now())
+
+
+class TripReservation(Base):
+    """Seats taken by POST /trips/{id}/reservations; releasing it gives back exactly these seats."""
+    __tablename__ = "trip_reservations"
+
+    id = Column(Integer, primary_key=True)
+    trip_id = Column(Integer, ForeignKey("trips.id", ondelete="CASCADE"), nullable=False, index=True)
+    seats = Column(Integer, nullable=False)
+    reserved_at = Column(DateTime, server_default=func.now())
@@ -0,0 +1,40 @@
+"""
+Opaque keyset-pagination cursors for GET /trips/.
+
+Trips are listed in (departure_date, id) order. A cursor encodes both
+values of the last row of the previous page; the next page is
+`WHERE (departure_date, id) > (:date, :id) ORDER BY departure_date, id LIMIT :n`,
+an index range scan on idx_trips_departure_date_id however deep the client
+pages.
+"""
+import base64
+import json
+from datetime import date
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+
+from .config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(departure_date: date, last_id: int) -> str:
+    raw = json.dumps({"date": departure_date.isoformat(), "id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        departure_date, last_id = date.fromisoformat(data["date"]), data["id"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(last_id, int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return departure_date, last_id
+
+
+def page_size(limit: Optional[int]) -> int:
+    return min(limit or settings.DEFAULT_PAGE_SIZE, settings.MAX_PAGE_SIZE)
@@ -0,0 +1,186 @@
+"""
+Validation of the route, bus and driver a trip refers to.
+
+All calls go through one pooled `httpx.AsyncClient` opened in the app's
+lifespan handler, and the checks for a request run concurrently, so a trip
+create costs one round of network latency instead of three. Found
+references are cached with their payload (REFERENCE_CACHE_TTL_SECONDS),
+missing ones for a much shorter time (REFERENCE_NEGATIVE_TTL_SECONDS).
+Latency is recorded per dependency in a histogram.
+"""
+import asyncio
+import bisect
+import threading
+import time
+from typing import Dict, Optional
+
+import httpx
+from fastapi import HTTPException, status
+
+from .cache import TTLCache
+from .config import settings
+
+# kind -> (base URL, path template, name used in error messages)
+REFERENCES = {
+    "route": (settings.ROUTE_SERVICE_URL, "/routes/{id}", "Route"),
+    "bus": (settings.BUS_SERVICE_URL, "/buses/id/{id}", "Bus"),
+    "driver": (settings.USER_SERVICE_URL, "/drivers/{id}", "Driver"),
+}
+
+# Upper bounds in milliseconds; the last bucket catches everything slower
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class ReferenceNotFound(Exception):
+    pass
+
+
+class LatencyHistogram:
+    def __init__(self, buckets_ms=LATENCY_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self._lock = threading.Lock()
+        self.counts = [0] * (len(buckets_ms) + 1)
+        self.total_seconds = 0.0
+        self.errors = 0
+        self.timeouts = 0
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets_ms, seconds * 1000)] += 1
+            self.total_seconds += seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            count = sum(self.counts)
+            labels = [f"le_{bound}ms" for bound in self.buckets_ms] + ["gt_%sms" % self.buckets_ms[-1]]
+            return {
+                "count": count,
+                "errors": self.errors,
+                "timeouts": self.timeouts,
+                "avg_ms": round(self.total_seconds / count * 1000, 3) if count else 0.0,
+                "p50_ms": self._quantile(0.5, count),
+                "p95_ms": self._quantile(0.95, count),
+                "p99_ms": self._quantile(0.99, count),
+                "buckets": dict(zip(labels, self.counts)),
+            }
+
+    def _quantile(self, q: float, count: int) -> Optional[float]:
+        # Upper bound of the bucket holding the q-th observation
+        if not count:
+            return None
+        seen = 0
+        for bound, bucket_count in zip(self.buckets_ms, self.counts):
+            seen += bucket_count
+            if seen >= q * count:
+                return bound
+        return None  # beyond the last bucket
+
+
+class ReferenceClient:
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self.found = TTLCache(settings.REFERENCE_CACHE_SIZE, settings.REFERENCE_CACHE_TTL_SECONDS)
+        self.missing = TTLCache(settings.REFERENCE_CACHE_SIZE, settings.REFERENCE_NEGATIVE_TTL_SECONDS)
+        self.latency = {kind: LatencyHistogram() for kind in REFERENCES}
+
+    async def start(self) -> None:
+        if self._client is not None:
+            return
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.REFERENCE_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.REFERENCE_MAX_KEEPALIVE,
+                keepalive_expiry=settings.REFERENCE_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                settings.REFERENCE_READ_TIMEOUT,
+                connect=settings.REFERENCE_CONNECT_TIMEOUT,
+                pool=settings.REFERENCE_POOL_TIMEOUT,
+            ),
+        )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def fetch(self, kind: str, ref_id: int) -> Optional[dict]:
+        """
+        Return the payload the owning service sends for the reference, or
+        None if it does not exist. Dependency failures raise 503/504 and are
+        not cached.
+        """
+        key = (kind, ref_id)
+        if self.missing.get(key):
+            return None
+        try:
+            return await self.found.get_or_load(key, lambda: self._load(kind, ref_id))
+        except ReferenceNotFound:
+            self.missing.set(key, True)
+            return None
+
+    def invalidate(self, kind: str, ref_id: int) -> None:
+        self.found.invalidate((kind, ref_id))
+        self.missing.invalidate((kind, ref_id))
+
+    def stats(self) -> dict:
+        return {
+            "latency": {kind: histogram.snapshot() for kind, histogram in self.latency.items()},
+            "found_cache": self.found.stats(),
+            "missing_cache": self.missing.stats(),
+        }
+
+    async def _load(self, kind: str, ref_id: int) -> dict:
+        if self._client is None:
+            # Outside the lifespan (e.g. scripts); open the pool on first use
+            await self.start()
+        base_url, path, name = REFERENCES[kind]
+        histogram = self.latency[kind]
+        started = time.perf_counter()
+        try:
+            response = await self._client.get(base_url + path.format(id=ref_id))
+        except httpx.TimeoutException:
+            histogram.timeouts += 1
+            raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=f"{name} service timed out")
+        except httpx.RequestError:
+            histogram.errors += 1
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"{name} service is unavailable")
+        finally:
+            histogram.observe(time.perf_counter() - started)
+
+        if response.status_code == 404:
+            raise ReferenceNotFound()
+        if response.status_code != 200:
+            histogram.errors += 1
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"{name} service returned {response.status_code}")
+        try:
+            return response.json()
+        except ValueError:
+            return {}
+
+
+reference_client = ReferenceClient()
+
+
+async def validate_references(
+    route_id: Optional[int] = None,
+    bus_id: Optional[int] = None,
+    driver_id: Optional[int] = None,
+) -> Dict[str, dict]:
+    """
+    Check the given references concurrently and return their payloads by
+    kind. Raises 404 for the first missing one, in route, bus, driver order.
+    """
+    wanted = {kind: ref_id for kind, ref_id in (("route", route_id), ("bus", bus_id), ("driver", driver_id)) if ref_id is not None}
+    results = await asyncio.gather(
+        *(reference_client.fetch(kind, ref_id) for kind, ref_id in wanted.items()),
+        return_exceptions=True,
+    )
+    payloads = {}
+    for kind, result in zip(wanted, results):
+        if isinstance(result, BaseException):
+            raise result
+        if result is None:
+            raise HTTPException(status_code=404, detail=f"{REFERENCES[kind][2]} not found")
+        payloads[kind] = result
+    return payloads
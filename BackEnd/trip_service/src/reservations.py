@@ -0,0 +1,109 @@
+"""
+Seat reservations against Trips.booked_seats.
+
+A reservation is a single conditional UPDATE:
+
+    UPDATE trips SET booked_seats = booked_seats + :n
+    WHERE id = :id AND capacity IS NOT NULL AND booked_seats + :n <= capacity
+    RETURNING booked_seats, capacity
+
+PostgreSQL locks the row, re-evaluates the WHERE clause against the latest
+committed version and either applies the increment or matches nothing.
+Concurrent bookings of one trip queue on that row only; there is no
+read-modify-write and no table lock, and the trip cannot be oversold. The
+row is read separately only when nothing matched, to tell "sold out" from
+"no such trip".
+
+Each successful reservation is recorded in trip_reservations in the same
+transaction, and its id is returned. Seats are given back only by releasing
+that id, which deletes the row and subtracts exactly its seats, so a client
+can never release seats it did not reserve (or release one reservation
+twice).
+"""
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models, schemas
+
+Trips = models.Trips
+TripReservation = models.TripReservation
+
+
+def bus_capacity(bus: dict) -> Optional[int]:
+    """Seat count from a bus service payload, if it has a usable one."""
+    try:
+        capacity = int(bus.get("capacity"))
+    except (TypeError, ValueError):
+        return None
+    return capacity if capacity > 0 else None
+
+
+async def reserve_seats(db: AsyncSession, trip_id: int, seats: int) -> schemas.SeatReservation:
+    booked = func.coalesce(Trips.booked_seats, 0)
+    row = (await db.execute(
+        update(Trips)
+        .where(Trips.id == trip_id, Trips.capacity.isnot(None), booked + seats <= Trips.capacity)
+        .values(booked_seats=booked + seats)
+        .returning(Trips.booked_seats, Trips.capacity)
+        .execution_options(synchronize_session=False)
+    )).first()
+    if row is None:
+        await db.rollback()
+        await _raise_not_reservable(db, trip_id)
+    reservation_id = (await db.execute(
+        insert(TripReservation).values(trip_id=trip_id, seats=seats).returning(TripReservation.id)
+    )).scalar_one()
+    await db.commit()
+    return schemas.SeatReservation(reservation_id=reservation_id, **availability(trip_id, *row).model_dump())
+
+
+async def release_reservation(db: AsyncSession, trip_id: int, reservation_id: int) -> schemas.SeatAvailability:
+    # Deleting the row first locks it, so concurrent releases of one id
+    # cannot both subtract its seats
+    seats = (await db.execute(
+        delete(TripReservation)
+        .where(TripReservation.id == reservation_id, TripReservation.trip_id == trip_id)
+        .returning(TripReservation.seats)
+    )).scalar_one_or_none()
+    if seats is None:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    row = (await db.execute(
+        update(Trips)
+        .where(Trips.id == trip_id)
+        .values(booked_seats=func.coalesce(Trips.booked_seats, 0) - seats)
+        .returning(Trips.booked_seats, Trips.capacity)
+        .execution_options(synchronize_session=False)
+    )).first()
+    await db.commit()
+    return availability(trip_id, *row)
+
+
+def availability(trip_id: int, booked_seats: Optional[int], capacity: Optional[int]) -> schemas.SeatAvailability:
+    booked_seats = booked_seats or 0
+    return schemas.SeatAvailability(
+        trip_id=trip_id,
+        capacity=capacity,
+        booked_seats=booked_seats,
+        available_seats=None if capacity is None else max(capacity - booked_seats, 0),
+    )
+
+
+async def _load(db: AsyncSession, trip_id: int):
+    return (await db.execute(select(Trips.booked_seats, Trips.capacity).where(Trips.id == trip_id))).first()
+
+
+async def _raise_not_reservable(db: AsyncSession, trip_id: int) -> None:
+    row = await _load(db, trip_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Trip not found")
+    current = availability(trip_id, *row)
+    if current.capacity is None:
+        raise HTTPException(status_code=409, detail="Trip capacity is unknown, seats cannot be reserved")
+    if current.available_seats == 0:
+        raise HTTPException(status_code=409, detail="Trip is sold out")
+    left = current.available_seats
+    raise HTTPException(status_code=409, detail=f"Only {left} seat{'' if left == 1 else 's'} left on this trip")
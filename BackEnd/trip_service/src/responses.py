@@ -0,0 +1,65 @@
+"""
+Opt-in fast path for JSON list responses (FAST_JSON_RESPONSES).
+
+The default path loads ORM objects, builds one schemas.Trip per row and lets
+FastAPI validate the list again against `response_model` before encoding.
+The fast path selects plain column rows and encodes them with a TypeAdapter
+built once at import: pydantic-core writes the JSON bytes directly, with no
+per-row model and no second validation. Numeric prices are written as JSON
+numbers and dates as ISO strings without going through Python conversions.
+
+TripRow mirrors schemas.Trip, which remains the documented response model.
+"""
+from datetime import date, datetime
+from typing import Any, List, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from typing_extensions import TypedDict
+
+
+class TripRow(TypedDict):
+    trip_id: int
+    bus_id: int
+    driver_id: int
+    departure_time: datetime
+    arrival_time: datetime
+    departure_date: date
+    price: float
+    route_id: int
+
+
+# ?fields= responses: any subset of the TripRow keys
+class SparseTripRow(TypedDict, total=False):
+    trip_id: int
+    bus_id: int
+    driver_id: int
+    departure_time: datetime
+    arrival_time: datetime
+    departure_date: date
+    price: float
+    route_id: int
+
+
+TRIP_ROW = TypeAdapter(TripRow)
+TRIP_LIST = TypeAdapter(List[TripRow])
+SPARSE_TRIP = TypeAdapter(SparseTripRow)
+SPARSE_TRIP_LIST = TypeAdapter(List[SparseTripRow])
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+
+def fast_json(adapter: TypeAdapter, rows: Any, response: Optional[Response] = None) -> FastJSONResponse:
+    """
+    Encode `rows` with `adapter`. Headers already set on the endpoint's
+    `response` parameter are carried over, since FastAPI ignores that object
+    once a Response is returned.
+    """
+    out = FastJSONResponse(adapter.dump_json(rows))
+    if response is not None:
+        for name, value in response.headers.items():
+            if name not in ("content-length", "content-type"):
+                out.headers.append(name, value)
+    return out
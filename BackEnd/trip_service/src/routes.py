@@ -1,86 +1,107 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from . import models, schemas
-from .database import SessionLocal
+from .auth import require_internal_token
+from .database import AsyncSessionLocal, SessionLocal, get_db, get_read_db, get_async_db, read_session, pool_stats
 from .config import settings
-import httpx
-from typing import List
+from .responses import TRIP_ROW, TRIP_LIST, SPARSE_TRIP, SPARSE_TRIP_LIST, fast_json
+from .pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, page_size
+from .fieldsets import parse_fields
+from .references import reference_client, validate_references
+from .cache import TTLCache
+from .reservations import availability, bus_capacity, release_reservation, reserve_seats
+from .seatmap import seat_registry
+from .schedule import check_conflicts, expand, insert_trips
+from .journeys import journey_planner
+from typing import List, Literal, Optional
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime, date as date_type
 
 router = APIRouter()
 
-# Dependency to get DB session
-def get_db():
+def _trip_out(trip: models.Trips) -> schemas.Trip:
+    return schemas.Trip(
+        trip_id=trip.id,
+        bus_id=trip.bus_id,
+        driver_id=trip.driver_id,
+        departure_time=trip.departure_time,
+        arrival_time=trip.arrival_time,
+        departure_date=trip.departure_date,
+        price=float(trip.price),
+        route_id=trip.route_id
+    )
+
+# Same fields as schemas.Trip, selected as plain rows for the fast JSON path
+TRIP_COLUMNS = (
+    models.Trips.id.label("trip_id"),
+    models.Trips.bus_id,
+    models.Trips.driver_id,
+    models.Trips.departure_time,
+    models.Trips.arrival_time,
+    models.Trips.departure_date,
+    models.Trips.price,
+    models.Trips.route_id,
+)
+
+# Field name -> column for ?fields=
+TRIP_COLUMN_BY_FIELD = {column.key: column for column in TRIP_COLUMNS}
+TRIP_FIELDS = tuple(TRIP_COLUMN_BY_FIELD)
+
+def _trip_rows(db: Session, *criteria, fields: Optional[List[str]] = None) -> List[dict]:
+    columns = TRIP_COLUMNS if fields is None else [TRIP_COLUMN_BY_FIELD[name] for name in fields]
+    return [row._asdict() for row in db.execute(select(*columns).where(*criteria))]
+
+# Search results by (route_id, departure_date), invalidated by trip writes
+search_cache = TTLCache(settings.SEARCH_CACHE_SIZE, settings.SEARCH_CACHE_TTL_SECONDS)
+
+def _forget_searches(*keys) -> None:
+    for key in keys:
+        search_cache.invalidate(key)
+
+def _search_rows(route_id: int, search_date: date_type) -> List[dict]:
+    # Served by idx_trips_route_date_time, already in departure order
     db = SessionLocal()
     try:
-        yield db
+        return [row._asdict() for row in db.execute(
+            select(*TRIP_COLUMNS)
+            .where(models.Trips.route_id == route_id, models.Trips.departure_date == search_date)
+            .order_by(models.Trips.departure_time, models.Trips.id)
+        )]
     finally:
         db.close()
 
-# --- Helper functions for inter-service validation ---
-async def validate_route_id(route_id: int) -> bool:
-    """
-    Validate route_id by calling the Route Service.
-    Returns True if exists, False otherwise.
-    """
-    url = f"{settings.ROUTE_SERVICE_URL}/routes/{route_id}"
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.get(url, timeout=5.0)
-            return resp.status_code == 200
-        except Exception:
-            return False
+# Exclusion constraints on trips (models.py) and what they protect
+OVERLAP_CONSTRAINTS = {"ex_trips_bus_overlap": "bus", "ex_trips_driver_overlap": "driver"}
+EXCLUSION_VIOLATION = "23P01"
 
-async def validate_bus_id(bus_id: int) -> bool:
-    """
-    Validate bus_id by calling the Bus Service.
-    Returns True if exists, False otherwise.
-    """
-    url = f"{settings.BUS_SERVICE_URL}/buses/id/{bus_id}"
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.get(url, timeout=5.0)
-            return resp.status_code == 200
-        except Exception:
-            return False
+def _overlap_conflict(error: IntegrityError) -> Optional[HTTPException]:
+    if getattr(error.orig, "pgcode", None) != EXCLUSION_VIOLATION:
+        return None
+    message = str(error.orig)
+    for constraint, what in OVERLAP_CONSTRAINTS.items():
+        if constraint in message:
+            return HTTPException(status_code=409, detail=f"The {what} already has a trip overlapping this time")
+    return None
 
-async def validate_driver_id(driver_id: int) -> bool:
-    """
-    Validate driver_id by calling the User Service.
-    Returns True if exists, False otherwise.
-    """
-    url = f"{settings.USER_SERVICE_URL}/drivers/{driver_id}"
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.get(url, timeout=5.0)
-            return resp.status_code == 200
-        except Exception:
-            return False
+def _check_times(departure_time: Optional[datetime], arrival_time: Optional[datetime]) -> None:
+    if departure_time is not None and arrival_time is not None and arrival_time <= departure_time:
+        raise HTTPException(status_code=400, detail="arrival_time must be after departure_time")
 
 # --- CRUD Endpoints for Trip ---
 
 @router.post("/trips/", response_model=schemas.Trip, status_code=status.HTTP_201_CREATED)
-async def create_trip(trip: schemas.TripCreat, db: Session = Depends(get_db)) -> schemas.Trip:
+async def create_trip(trip: schemas.TripCreat, db: AsyncSession = Depends(get_async_db)) -> schemas.Trip:
     """
     Create a new trip after validating route_id, bus_id, and driver_id.
     """
-    if not await validate_route_id(trip.route_id):
-        raise HTTPException(status_code=404, detail="Route not found")
-    if not await validate_bus_id(trip.bus_id):
-        raise HTTPException(status_code=404, detail="Bus not found")
-    if not await validate_driver_id(trip.driver_id):
-        raise HTTPException(status_code=404, detail="Driver not found")
-    # Check for duplicate trip
-    existing = db.query(models.Trips).filter(
-        models.Trips.bus_id == trip.bus_id,
-        models.Trips.departure_time == trip.departure_time
-    ).first()
-    if existing:
-        raise HTTPException(
-            status_code=400,
-            detail="A trip with this bus and departure time already exists."
-        )
+    _check_times(trip.departure_time, trip.arrival_time)
+    references = await validate_references(trip.route_id, trip.bus_id, trip.driver_id)
+    # Overlaps with the bus's or driver's other trips are rejected by the
+    # exclusion constraints on trips, atomically with the insert
     db_trip = models.Trips(
         route_id=trip.route_id,
         bus_id=trip.bus_id,
@@ -89,89 +110,177 @@ async def create_trip(trip: schemas.TripCreat, db: Session = Depends(get_db)) ->
         arrival_time=trip.arrival_time,
         departure_date=trip.departure_date,
         price=trip.price,
-        booked_seats=0
+        booked_seats=0,
+        capacity=trip.capacity or bus_capacity(references["bus"]),
     )
     db.add(db_trip)
     try:
-        db.commit()
-    except IntegrityError:
-        db.rollback()
-        raise HTTPException(
-            status_code=400,
-            detail="A trip with this bus and departure time already exists."
-        )
-    db.refresh(db_trip)
-    return db_trip
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        raise _overlap_conflict(e) or HTTPException(status_code=409, detail="Trip conflicts with an existing trip")
+    await db.refresh(db_trip)
+    _forget_searches((db_trip.route_id, db_trip.departure_date))
+    await journey_planner.refresh_trips(db, [db_trip.id])
+    return _trip_out(db_trip)
+
+@router.post("/trips/schedule", response_model=schemas.TripScheduleResult, status_code=status.HTTP_201_CREATED)
+async def schedule_trips(schedule: schemas.TripSchedule, db: AsyncSession = Depends(get_async_db)) -> schemas.TripScheduleResult:
+    """
+    Create a trip on every day of a date range that falls on one of
+    days_of_week. References are validated once, conflicts with the bus's
+    and driver's existing trips are checked with a single query, and all
+    trips are inserted together; nothing is created if any of it fails.
+    """
+    references = await validate_references(schedule.route_id, schedule.bus_id, schedule.driver_id)
+    trips = expand(schedule, schedule.capacity or bus_capacity(references["bus"]))
+    await check_conflicts(db, trips)
+    try:
+        trip_ids = await insert_trips(db, trips)
+    except IntegrityError as e:
+        await db.rollback()
+        raise _overlap_conflict(e) or HTTPException(status_code=409, detail="Schedule conflicts with existing trips")
+    _forget_searches(*((schedule.route_id, trip["departure_date"]) for trip in trips))
+    await journey_planner.refresh_trips(db, trip_ids)
+    return schemas.TripScheduleResult(created=len(trip_ids), trip_ids=trip_ids)
+
+def _trips_query(selected: Optional[List[str]], date_from, date_to, route_id, bus_id, driver_id):
+    # The keyset columns are always selected; ?fields= is applied to the output
+    names = list(TRIP_FIELDS) if selected is None else list(dict.fromkeys(["trip_id", "departure_date", *selected]))
+    query = select(*(TRIP_COLUMN_BY_FIELD[name] for name in names)).where(models.Trips.departure_date.isnot(None))
+    if date_from is not None:
+        query = query.where(models.Trips.departure_date >= date_from)
+    if date_to is not None:
+        query = query.where(models.Trips.departure_date <= date_to)
+    for column, value in ((models.Trips.route_id, route_id), (models.Trips.bus_id, bus_id), (models.Trips.driver_id, driver_id)):
+        if value is not None:
+            query = query.where(column == value)
+    return query.order_by(models.Trips.departure_date, models.Trips.id)
+
+def _project(row: dict, selected: Optional[List[str]]) -> dict:
+    return row if selected is None else {name: row[name] for name in selected}
+
+def _stream_trips(query, selected: Optional[List[str]], open_session):
+    # Runs while the response is sent, so it opens its own session. Rows are
+    # read with a server-side cursor and written one batch at a time.
+    adapter = SPARSE_TRIP if selected else TRIP_ROW
+    db = open_session()
+    try:
+        result = db.execute(query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+        for batch in result.partitions():
+            yield b"".join(adapter.dump_json(_project(row._asdict(), selected)) + b"\n" for row in batch)
+    finally:
+        db.close()
 
 @router.get("/trips/", response_model=List[schemas.Trip])
-def get_trips(db: Session = Depends(get_db)) -> List[schemas.Trip]:
-    """
-    Get all trips.
-    """
-    trips = db.query(models.Trips).all()
-    results = []
-    for trip in trips:
-        results.append(schemas.Trip(
-            trip_id=trip.id,
-            bus_id=trip.bus_id,
-            driver_id=trip.driver_id,
-            departure_time=trip.departure_time,
-            arrival_time=trip.arrival_time,
-            departure_date=trip.departure_date,
-            price=float(trip.price),
-            route_id=trip.route_id
-        ))
-    return results
+def get_trips(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    date_from: Optional[date_type] = None,
+    date_to: Optional[date_type] = None,
+    route_id: Optional[int] = None,
+    bus_id: Optional[int] = None,
+    driver_id: Optional[int] = None,
+    stream: bool = False,
+    fields: Optional[str] = None,
+) -> List[schemas.Trip]:
+    """
+    List trips in (departure_date, id) order, one page at a time; the
+    X-Next-Cursor header carries the cursor for the next page. Filters:
+    departure date range (inclusive), route, bus and driver. `fields` (e.g.
+    trip_id,departure_time,price) returns only those columns.
+
+    With `stream=true` every matching trip is streamed as NDJSON instead,
+    ignoring limit and cursor. Trips without a departure_date are not listed.
+    """
+    selected = parse_fields(fields, TRIP_FIELDS)
+    query = _trips_query(selected, date_from, date_to, route_id, bus_id, driver_id)
+    if stream:
+        return StreamingResponse(
+            _stream_trips(query, selected, lambda: read_session(request)),
+            media_type="application/x-ndjson",
+        )
+
+    size = page_size(limit)
+    if cursor:
+        query = query.where(tuple_(models.Trips.departure_date, models.Trips.id) > tuple_(*decode_cursor(cursor)))
+    db = read_session(request)
+    try:
+        rows = [row._asdict() for row in db.execute(query.limit(size + 1))]
+    finally:
+        db.close()
+    if len(rows) > size:
+        rows = rows[:size]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1]["departure_date"], rows[-1]["trip_id"])
+
+    if selected:
+        return fast_json(SPARSE_TRIP_LIST, [_project(row, selected) for row in rows], response)
+    if settings.FAST_JSON_RESPONSES:
+        return fast_json(TRIP_LIST, rows, response)
+    return [schemas.Trip(**row) for row in rows]
 
 @router.get("/trips/{trip_id}", response_model=schemas.Trip)
-def get_trip(trip_id: int, db: Session = Depends(get_db)) -> schemas.Trip:
+def get_trip(trip_id: int, fields: Optional[str] = None, db: Session = Depends(get_read_db)) -> schemas.Trip:
     """
-    Get a trip by its ID.
+    Get a trip by its ID, optionally only the columns named in `fields`.
     """
+    selected = parse_fields(fields, TRIP_FIELDS)
+    if selected:
+        rows = _trip_rows(db, models.Trips.id == trip_id, fields=selected)
+        if not rows:
+            raise HTTPException(status_code=404, detail="Trip not found")
+        return fast_json(SPARSE_TRIP, rows[0])
     trip = db.query(models.Trips).filter(models.Trips.id == trip_id).first()
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found")
-    return schemas.Trip(
-        trip_id=trip.id,
-        bus_id=trip.bus_id,
-        driver_id=trip.driver_id,
-        departure_time=trip.departure_time,
-        arrival_time=trip.arrival_time,
-        departure_date=trip.departure_date,
-        price=float(trip.price),
-        route_id=trip.route_id
-    )
+    return _trip_out(trip)
 
 @router.put("/trips/{trip_id}", response_model=schemas.Trip)
-async def update_trip(trip_id: int, trip_update: schemas.TripUpdate, db: Session = Depends(get_db)) -> schemas.Trip:
+async def update_trip(trip_id: int, trip_update: schemas.TripUpdate, db: AsyncSession = Depends(get_async_db)) -> schemas.Trip:
     """
     Update a trip by its ID. Validate any updated route_id, bus_id, or driver_id.
     """
-    db_trip = db.query(models.Trips).filter(models.Trips.id == trip_id).first()
+    db_trip = await db.get(models.Trips, trip_id)
     if not db_trip:
         raise HTTPException(status_code=404, detail="Trip not found")
-    # Validate if fields are being updated
+    _check_times(
+        trip_update.departure_time or db_trip.departure_time,
+        trip_update.arrival_time or db_trip.arrival_time,
+    )
+    # Validate the references being changed, concurrently
+    references = await validate_references(trip_update.route_id, trip_update.bus_id, trip_update.driver_id)
+    old_search_key = (db_trip.route_id, db_trip.departure_date)
     if trip_update.route_id is not None:
-        if not await validate_route_id(trip_update.route_id):
-            raise HTTPException(status_code=404, detail="Route not found")
         db_trip.route_id = trip_update.route_id
     if trip_update.bus_id is not None:
-        if not await validate_bus_id(trip_update.bus_id):
-            raise HTTPException(status_code=404, detail="Bus not found")
         db_trip.bus_id = trip_update.bus_id
     if trip_update.driver_id is not None:
-        if not await validate_driver_id(trip_update.driver_id):
-            raise HTTPException(status_code=404, detail="Driver not found")
         db_trip.driver_id = trip_update.driver_id
     if trip_update.departure_time is not None:
         db_trip.departure_time = trip_update.departure_time
     if trip_update.arrival_time is not None:
         db_trip.arrival_time = trip_update.arrival_time
+    if trip_update.departure_date is not None:
+        db_trip.departure_date = trip_update.departure_date
     if trip_update.price is not None:
         db_trip.price = trip_update.price
-    db.commit()
-    db.refresh(db_trip)
-    return db_trip
+    if trip_update.capacity is not None:
+        db_trip.capacity = trip_update.capacity
+    elif "bus" in references:
+        db_trip.capacity = bus_capacity(references["bus"]) or db_trip.capacity
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        raise _overlap_conflict(e) or HTTPException(status_code=409, detail="Capacity cannot be lower than the seats already booked")
+    await db.refresh(db_trip)
+    _forget_searches(old_search_key, (db_trip.route_id, db_trip.departure_date))
+    if trip_update.capacity is not None or "bus" in references:
+        seat_registry.forget(trip_id)
+    await journey_planner.refresh_trips(db, [trip_id])
+    return _trip_out(db_trip)
 
 @router.delete("/trips/{trip_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_trip(trip_id: int, db: Session = Depends(get_db)) -> None:
@@ -181,36 +290,165 @@ def delete_trip(trip_id: int, db: Session = Depends(get_db)) -> None:
     db_trip = db.query(models.Trips).filter(models.Trips.id == trip_id).first()
     if not db_trip:
         raise HTTPException(status_code=404, detail="Trip not found")
+    search_key = (db_trip.route_id, db_trip.departure_date)
     db.delete(db_trip)
     db.commit()
+    _forget_searches(search_key)
+    seat_registry.forget(trip_id)
+    journey_planner.remove(trip_id)
     return None
 
 @router.get("/trips/search/", response_model=List[schemas.Trip])
-def search_trips_by_route_and_date(route_id: int, departure_date: str, db: Session = Depends(get_db)) -> List[schemas.Trip]:
+async def search_trips_by_route_and_date(route_id: int, departure_date: str, fields: Optional[str] = None) -> List[schemas.Trip]:
     """
     Search for trips by route_id and departure_date (YYYY-MM-DD).
-    Returns all trips for the given route_id and departure_date.
+    Returns all trips for the given route_id and departure_date, in
+    departure order.
+
+    Results come from search_cache. Misses are loaded from the primary,
+    not the replica: a fill from a lagging replica right after a write
+    would keep the stale result cached for the whole TTL.
     """
     try:
         search_date = datetime.strptime(departure_date, "%Y-%m-%d").date()
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
-    trips = db.query(models.Trips).filter(
-        models.Trips.route_id == route_id,
-        models.Trips.departure_date == search_date,
-    ).all()
-    if not trips:
+    selected = parse_fields(fields, TRIP_FIELDS)
+    rows = await search_cache.get_or_load(
+        (route_id, search_date),
+        lambda: run_in_threadpool(_search_rows, route_id, search_date),
+    )
+    if not rows:
         raise HTTPException(status_code=404, detail="No trips found for this route and date.")
-    results = []
-    for trip in trips:
-        results.append(schemas.Trip(
-            trip_id=trip.id,
-            bus_id=trip.bus_id,
-            driver_id=trip.driver_id,
-            departure_time=trip.departure_time,
-            arrival_time=trip.arrival_time,
-            departure_date=trip.departure_date,
-            price=float(trip.price),
-            route_id=trip.route_id
-        ))
-    return results
+    if selected:
+        return fast_json(SPARSE_TRIP_LIST, [{name: row[name] for name in selected} for row in rows])
+    if settings.FAST_JSON_RESPONSES:
+        return fast_json(TRIP_LIST, rows)
+    return [schemas.Trip(**row) for row in rows]
+
+@router.get("/trips/journeys/", response_model=schemas.Journey)
+async def plan_journey(
+    from_city_id: int,
+    to_city_id: int,
+    depart_after: Optional[datetime] = None,
+    optimize: Literal["earliest", "cheapest"] = "earliest",
+) -> schemas.Journey:
+    """
+    Find an itinerary between two cities, with transfers if there is no
+    direct trip: the earliest arrival or the lowest total price, departing
+    at or after depart_after (now by default).
+
+    The scan runs over the in-memory timetable; a session is only opened
+    when the timetable is due for a rebuild.
+    """
+    if from_city_id == to_city_id:
+        raise HTTPException(status_code=400, detail="from_city_id and to_city_id must differ")
+    await journey_planner.ensure_fresh(AsyncSessionLocal)
+    depart_after = depart_after or datetime.now()
+    if optimize == "cheapest":
+        journey = journey_planner.cheapest(from_city_id, to_city_id, depart_after)
+    else:
+        journey = journey_planner.earliest_arrival(from_city_id, to_city_id, depart_after)
+    if journey is None:
+        raise HTTPException(status_code=404, detail="No journey found between these cities.")
+    return journey
+
+# --- Seat reservations ---
+
+@router.get("/trips/{trip_id}/availability", response_model=schemas.SeatAvailability)
+def get_trip_availability(trip_id: int, db: Session = Depends(get_read_db)) -> schemas.SeatAvailability:
+    """
+    Capacity, booked and available seats of a trip.
+    """
+    row = db.execute(select(models.Trips.booked_seats, models.Trips.capacity).where(models.Trips.id == trip_id)).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Trip not found")
+    return availability(trip_id, *row)
+
+@router.post("/trips/{trip_id}/reservations", response_model=schemas.SeatReservation)
+async def reserve_trip_seats(trip_id: int, request: schemas.SeatRequest, db: AsyncSession = Depends(get_async_db)) -> schemas.SeatReservation:
+    """
+    Reserve seats with one atomic conditional UPDATE. Returns 409 when the
+    trip does not have that many seats left. The reservation_id in the
+    response is what releases the seats again.
+    """
+    return await reserve_seats(db, trip_id, request.seats)
+
+@router.delete("/trips/{trip_id}/reservations/{reservation_id}", response_model=schemas.SeatAvailability)
+async def release_trip_reservation(trip_id: int, reservation_id: int, db: AsyncSession = Depends(get_async_db)) -> schemas.SeatAvailability:
+    """
+    Give back the seats of one reservation. Returns 404 for an unknown or
+    already released reservation.
+    """
+    return await release_reservation(db, trip_id, reservation_id)
+
+# --- Seat selection ---
+# No session dependency here: the registry opens a session only when a seat
+# map has to be (re)loaded or a confirm committed, so requests served from
+# memory never take a connection from the pool.
+
+@router.get("/trips/{trip_id}/seats", response_model=schemas.SeatMap)
+async def get_trip_seats(trip_id: int) -> schemas.SeatMap:
+    """
+    Free, held and booked seat numbers of a trip, served from the in-memory
+    seat map.
+    """
+    return await seat_registry.seat_map(AsyncSessionLocal, trip_id)
+
+@router.post("/trips/{trip_id}/holds", response_model=schemas.SeatHold, status_code=status.HTTP_201_CREATED)
+async def hold_trip_seats(trip_id: int, request: schemas.SeatHoldRequest) -> schemas.SeatHold:
+    """
+    Hold specific seats for SEAT_HOLD_TTL_SECONDS while the passenger checks
+    out. Returns 409 if any of them is held or booked.
+    """
+    return await seat_registry.hold(AsyncSessionLocal, trip_id, request.seats)
+
+@router.post("/trips/{trip_id}/holds/{hold_id}/confirm", response_model=schemas.SeatMap)
+async def confirm_seat_hold(trip_id: int, hold_id: str) -> schemas.SeatMap:
+    """
+    Book the seats of a hold. Returns 404 once the hold has expired.
+    """
+    return await seat_registry.confirm(AsyncSessionLocal, trip_id, hold_id)
+
+@router.delete("/trips/{trip_id}/holds/{hold_id}", status_code=status.HTTP_204_NO_CONTENT)
+def release_seat_hold(trip_id: int, hold_id: str) -> None:
+    """
+    Give up a hold before it expires.
+    """
+    seat_registry.release(trip_id, hold_id)
+    return None
+
+@router.get("/internal/db-pool/stats", dependencies=[Depends(require_internal_token)])
+def get_db_pool_stats():
+    """
+    Connection-pool usage for the sync and async engines.
+    """
+    return pool_stats()
+
+@router.get("/internal/seat-maps/stats", dependencies=[Depends(require_internal_token)])
+def get_seat_map_stats():
+    """
+    Seat maps loaded, live holds and expired-hold counters.
+    """
+    return seat_registry.stats()
+
+@router.get("/internal/journeys/stats", dependencies=[Depends(require_internal_token)])
+def get_journey_planner_stats():
+    """
+    Size and age of the journey planner's connection list.
+    """
+    return journey_planner.stats()
+
+@router.get("/internal/references/stats", dependencies=[Depends(require_internal_token)])
+def get_reference_stats():
+    """
+    Latency histograms and cache counters for route/bus/driver validation.
+    """
+    return reference_client.stats()
+
+@router.get("/internal/search-cache/stats", dependencies=[Depends(require_internal_token)])
+def get_search_cache_stats():
+    """
+    Hit/miss counters for the trip search cache.
+    """
+    return search_cache.stats()
@@ -0,0 +1,108 @@
+"""
+Recurring timetables for POST /trips/schedule.
+
+A schedule is expanded into one trip per matching day and written with a
+fixed number of round trips, however many trips it generates:
+
+1. route, bus and driver are validated once (references.py),
+2. one SELECT loads the bus's and the driver's trips inside the schedule's
+   window; overlaps with the generated trips are found in memory with a
+   binary search per trip,
+3. one multi-row INSERT ... RETURNING creates every trip, committed once.
+
+The exclusion constraints on trips still back this up: a trip created
+concurrently between steps 2 and 3 makes the whole INSERT fail.
+"""
+import bisect
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models, schemas
+from .config import settings
+
+Trips = models.Trips
+
+
+def expand(schedule: schemas.TripSchedule, capacity: Optional[int]) -> List[dict]:
+    """Column values of every trip the schedule generates, in departure order."""
+    if schedule.end_date < schedule.start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    days = set(schedule.days_of_week)
+    if not days or not days <= set(range(7)):
+        raise HTTPException(status_code=400, detail="days_of_week must be weekday numbers 0 (Monday) to 6 (Sunday)")
+
+    duration = datetime.combine(date.min, schedule.arrival_time) - datetime.combine(date.min, schedule.departure_time)
+    if duration <= timedelta(0):
+        duration += timedelta(days=1)
+
+    trips = []
+    day = schedule.start_date
+    while day <= schedule.end_date:
+        if day.weekday() in days:
+            if len(trips) == settings.SCHEDULE_MAX_TRIPS:
+                raise HTTPException(status_code=400, detail=f"A schedule can create at most {settings.SCHEDULE_MAX_TRIPS} trips")
+            departure = datetime.combine(day, schedule.departure_time)
+            trips.append({
+                "route_id": schedule.route_id,
+                "bus_id": schedule.bus_id,
+                "driver_id": schedule.driver_id,
+                "departure_time": departure,
+                "arrival_time": departure + duration,
+                "departure_date": day,
+                "price": schedule.price,
+                "booked_seats": 0,
+                "capacity": capacity,
+            })
+        day += timedelta(days=1)
+    if not trips:
+        raise HTTPException(status_code=400, detail="The schedule does not match any day in its date range")
+    return trips
+
+
+async def check_conflicts(db: AsyncSession, trips: List[dict]) -> None:
+    """Raise 409 listing the dates on which a generated trip overlaps the bus's or driver's existing trips."""
+    first, last = trips[0], trips[-1]
+    bus_id, driver_id = first["bus_id"], first["driver_id"]
+    existing = (await db.execute(
+        select(Trips.bus_id, Trips.driver_id, Trips.departure_time, Trips.arrival_time)
+        .where(
+            or_(Trips.bus_id == bus_id, Trips.driver_id == driver_id),
+            Trips.departure_time < last["arrival_time"],
+            Trips.arrival_time > first["departure_time"],
+        )
+        .order_by(Trips.departure_time)
+    )).all()
+    if not existing:
+        return
+
+    # The exclusion constraints keep one bus's (or driver's) trips disjoint,
+    # so ordered by departure they are ordered by arrival too
+    timelines = {
+        "bus": [(row.departure_time, row.arrival_time) for row in existing if row.bus_id == bus_id],
+        "driver": [(row.departure_time, row.arrival_time) for row in existing if row.driver_id == driver_id],
+    }
+    for what, timeline in timelines.items():
+        arrivals = [arrival for _, arrival in timeline]
+        dates = []
+        for trip in trips:
+            # First existing trip still running when this one departs
+            index = bisect.bisect_right(arrivals, trip["departure_time"])
+            if index < len(timeline) and timeline[index][0] < trip["arrival_time"]:
+                dates.append(trip["departure_date"].isoformat())
+        if dates:
+            shown = ", ".join(dates[:10]) + (f" and {len(dates) - 10} more" if len(dates) > 10 else "")
+            raise HTTPException(status_code=409, detail=f"The {what} already has overlapping trips on {shown}")
+
+
+async def insert_trips(db: AsyncSession, trips: List[dict]) -> List[int]:
+    """Insert all trips with one multi-row INSERT and commit; returns their ids in order."""
+    ids = (await db.execute(
+        insert(Trips).returning(Trips.id, sort_by_parameter_order=True),
+        trips,
+    )).scalars().all()
+    await db.commit()
+    return list(ids)
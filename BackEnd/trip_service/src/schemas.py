@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import Optional
-from datetime import datetime, date
+from typing import List, Optional
+from datetime import datetime, date, time
 
 class TripCreat(BaseModel):
     route_id: int
@@ -10,6 +10,8 @@ class TripCreat(BaseModel):
     arrival_time: datetime
     departure_date: date
     price: float
+    # Seats for sale; taken from the bus service's capacity when omitted
+    capacity: Optional[int] = Field(None, gt=0)
 
 class TripUpdate(BaseModel):
     route_id: Optional[int] = None
@@ -19,6 +21,25 @@ class TripUpdate(BaseModel):
     arrival_time: Optional[datetime] = None
     departure_date: Optional[date] = None
     price: Optional[float] = None
+    capacity: Optional[int] = Field(None, gt=0)
+
+class TripSchedule(BaseModel):
+    route_id: int
+    bus_id: int
+    driver_id: int
+    start_date: date
+    end_date: date
+    # 0 = Monday ... 6 = Sunday; every day when omitted
+    days_of_week: List[int] = Field(default_factory=lambda: list(range(7)))
+    departure_time: time
+    # An arrival_time at or before departure_time arrives the next day
+    arrival_time: time
+    price: float
+    capacity: Optional[int] = Field(None, gt=0)
+
+class TripScheduleResult(BaseModel):
+    created: int
+    trip_ids: List[int]
 
 class Trip(BaseModel):
     trip_id: int
@@ -30,4 +51,49 @@ class Trip(BaseModel):
     price: float
     route_id: int
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class SeatRequest(BaseModel):
+    seats: int = Field(..., gt=0)
+
+class SeatAvailability(BaseModel):
+    trip_id: int
+    capacity: Optional[int] = None
+    booked_seats: int
+    available_seats: Optional[int] = None
+
+class SeatReservation(SeatAvailability):
+    reservation_id: int
+
+class SeatHoldRequest(BaseModel):
+    seats: List[int] = Field(..., min_length=1)
+
+class SeatHold(BaseModel):
+    hold_id: str
+    trip_id: int
+    seats: List[int]
+    expires_at: datetime
+
+class SeatMap(BaseModel):
+    trip_id: int
+    capacity: int
+    available_seats: int
+    free: List[int]
+    held: List[int]
+    booked: List[int]
+
+class JourneyLeg(BaseModel):
+    trip_id: int
+    route_id: int
+    from_city_id: int
+    to_city_id: int
+    departure_time: datetime
+    arrival_time: datetime
+    price: float
+
+class Journey(BaseModel):
+    departure_time: datetime
+    arrival_time: datetime
+    price: float
+    transfers: int
+    legs: List[JourneyLeg]
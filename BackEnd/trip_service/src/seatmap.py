@@ -0,0 +1,362 @@
+"""
+Per-seat availability held in memory.
+
+Every active trip (capacity known, departure today or later) has a
+TripSeats entry holding two bitmaps, booked and held, where bit n is seat n,
+so "which seats are free" is a couple of integer operations with no query.
+Booked bits mirror the trip_seat_bookings table, the committed source of
+truth. They are rebuilt for all active trips at startup, updated when this
+process confirms a hold, and re-read from the database at most every
+SEATMAP_REFRESH_SECONDS so bookings made by other workers show up. Callers
+pass a session factory rather than a session: one is only opened to
+(re)load a map or commit a confirm, so serving a loaded map never takes a
+connection from the pool.
+
+Holds live only in this process. Each one is scheduled on a hashed timer
+wheel that is advanced whenever the seat map is used: abandoned holds are
+released by the next request to touch it, with no background task and no
+sweeper query. A hold is advisory; confirming it inserts the seat rows and
+bumps Trips.booked_seats in one transaction, and the unique
+(trip_id, seat_number) constraint settles any race with another worker.
+"""
+import math
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models, schemas
+from .config import settings
+
+Trips = models.Trips
+TripSeatBooking = models.TripSeatBooking
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel with `slots` buckets of `tick_seconds` each. An entry
+    due at tick t sits in bucket t % slots; deadlines further out than one
+    revolution share buckets with nearer ones and are skipped until due.
+    """
+
+    def __init__(self, slots: int, tick_seconds: float, clock=time.monotonic):
+        self.tick_seconds = tick_seconds
+        self._clock = clock
+        self._slots: List[Dict[str, int]] = [{} for _ in range(slots)]
+        self._tick = self._now_tick()
+
+    def schedule(self, key: str, delay_seconds: float) -> int:
+        """Schedule `key` to expire after the delay and return its deadline tick."""
+        deadline = max(self._now_tick() + math.ceil(delay_seconds / self.tick_seconds), self._tick + 1)
+        self._slots[deadline % len(self._slots)][key] = deadline
+        return deadline
+
+    def cancel(self, key: str, deadline: int) -> None:
+        self._slots[deadline % len(self._slots)].pop(key, None)
+
+    def advance(self) -> List[str]:
+        """Move the wheel to the current time and return the keys that expired."""
+        now = self._now_tick()
+        expired = []
+        # A gap of a full revolution or more visits every bucket exactly once
+        for tick in range(self._tick + 1, min(now, self._tick + len(self._slots)) + 1):
+            bucket = self._slots[tick % len(self._slots)]
+            for key, deadline in list(bucket.items()):
+                if deadline <= now:
+                    expired.append(key)
+                    del bucket[key]
+        self._tick = max(self._tick, now)
+        return expired
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self._slots)
+
+    def _now_tick(self) -> int:
+        return int(self._clock() / self.tick_seconds)
+
+
+class TripSeats:
+    __slots__ = ("capacity", "booked", "held", "booked_seats", "loaded_at")
+
+    def __init__(self, capacity: int, booked: int, booked_seats: int, loaded_at: float):
+        self.capacity = capacity
+        self.booked = booked  # bitmap of seats in trip_seat_bookings
+        self.held = 0  # bitmap of seats under a hold in this process
+        self.booked_seats = booked_seats  # Trips.booked_seats, includes seat-less reservations
+        self.loaded_at = loaded_at
+
+    def seats(self, bitmap: int) -> List[int]:
+        return [seat for seat in range(1, self.capacity + 1) if bitmap >> seat & 1]
+
+    def free(self) -> int:
+        all_seats = (1 << (self.capacity + 1)) - 2  # bits 1..capacity
+        return all_seats & ~(self.booked | self.held)
+
+    def available(self) -> int:
+        # booked_seats also counts reservations made without seat numbers
+        return max(min(_count(self.free()), self.capacity - self.booked_seats - _count(self.held)), 0)
+
+
+class Hold:
+    __slots__ = ("hold_id", "trip_id", "mask", "deadline", "expires_at", "confirming")
+
+    def __init__(self, hold_id: str, trip_id: int, mask: int, deadline: int, expires_at: datetime):
+        self.hold_id = hold_id
+        self.trip_id = trip_id
+        self.mask = mask
+        self.deadline = deadline
+        self.expires_at = expires_at
+        self.confirming = False
+
+
+class SeatRegistry:
+    def __init__(self, hold_ttl: float, refresh_seconds: float, wheel_slots: int, clock=time.monotonic):
+        self.hold_ttl = hold_ttl
+        self.refresh_seconds = refresh_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._trips: Dict[int, TripSeats] = {}
+        self._holds: Dict[str, Hold] = {}
+        self._wheel = TimerWheel(wheel_slots, 1.0, clock)
+        self.expired = 0
+        self.refreshes = 0
+
+    async def rebuild(self, db: AsyncSession) -> int:
+        """Load the seat maps of every active trip; returns how many were loaded."""
+        trips = (await db.execute(
+            select(Trips.id, Trips.capacity, Trips.booked_seats)
+            .where(Trips.capacity.isnot(None), Trips.departure_date >= date.today())
+        )).all()
+        booked = await _booked_bitmaps(db, [trip_id for trip_id, _, _ in trips])
+        now = self._clock()
+        with self._lock:
+            self._trips = {
+                trip_id: TripSeats(capacity, booked.get(trip_id, 0), booked_seats or 0, now)
+                for trip_id, capacity, booked_seats in trips
+            }
+            held = {}
+            for hold in self._holds.values():
+                held[hold.trip_id] = held.get(hold.trip_id, 0) | hold.mask
+            for trip_id, mask in held.items():
+                if trip_id in self._trips:
+                    self._trips[trip_id].held = mask
+        return len(trips)
+
+    async def seat_map(self, sessions: Callable[[], AsyncSession], trip_id: int) -> schemas.SeatMap:
+        await self._ensure_loaded(sessions, trip_id)
+        with self._lock:
+            self._expire()
+            trip = self._trip(trip_id)
+            return schemas.SeatMap(
+                trip_id=trip_id,
+                capacity=trip.capacity,
+                available_seats=trip.available(),
+                free=trip.seats(trip.free()),
+                held=trip.seats(trip.held),
+                booked=trip.seats(trip.booked),
+            )
+
+    async def hold(self, sessions: Callable[[], AsyncSession], trip_id: int, seats: List[int]) -> schemas.SeatHold:
+        await self._ensure_loaded(sessions, trip_id)
+        with self._lock:
+            self._expire()
+            trip = self._trip(trip_id)
+            invalid = [seat for seat in seats if not 1 <= seat <= trip.capacity]
+            if invalid:
+                raise HTTPException(status_code=400, detail=f"Seats out of range 1-{trip.capacity}: {invalid}")
+            mask = _mask(seats)
+            taken = trip.seats(mask & (trip.booked | trip.held))
+            if taken:
+                raise HTTPException(status_code=409, detail=f"Seats not available: {taken}")
+            if _count(mask) > trip.available():
+                raise HTTPException(status_code=409, detail="Not enough seats left on this trip")
+            hold_id = uuid.uuid4().hex
+            deadline = self._wheel.schedule(hold_id, self.hold_ttl)
+            expires_at = datetime.utcnow() + timedelta(seconds=self.hold_ttl)
+            self._holds[hold_id] = Hold(hold_id, trip_id, mask, deadline, expires_at)
+            trip.held |= mask
+        return schemas.SeatHold(hold_id=hold_id, trip_id=trip_id, seats=sorted(set(seats)), expires_at=expires_at)
+
+    def release(self, trip_id: int, hold_id: str) -> None:
+        with self._lock:
+            self._expire()
+            hold = self._holds.get(hold_id)
+            if hold is None or hold.trip_id != trip_id or hold.confirming:
+                raise HTTPException(status_code=404, detail="Hold not found or expired")
+            self._wheel.cancel(hold_id, hold.deadline)
+            self._drop(hold)
+
+    async def confirm(self, sessions: Callable[[], AsyncSession], trip_id: int, hold_id: str) -> schemas.SeatMap:
+        """
+        Book the held seats: insert one trip_seat_bookings row per seat and
+        add them to Trips.booked_seats under the same capacity guard as
+        reservations, committed together. 409 if another worker booked one
+        of the seats first or the trip filled up; the hold is dropped either
+        way.
+        """
+        with self._lock:
+            self._expire()
+            hold = self._holds.get(hold_id)
+            if hold is None or hold.trip_id != trip_id or hold.confirming:
+                raise HTTPException(status_code=404, detail="Hold not found or expired")
+            # Keep the seats held while the transaction runs
+            hold.confirming = True
+            self._wheel.cancel(hold_id, hold.deadline)
+            seats = self._trip(trip_id).seats(hold.mask)
+
+        booked = func.coalesce(Trips.booked_seats, 0)
+        async with sessions() as db:
+            try:
+                await db.execute(insert(TripSeatBooking), [
+                    {"trip_id": trip_id, "seat_number": seat, "hold_id": hold_id} for seat in seats
+                ])
+                row = (await db.execute(
+                    update(Trips)
+                    .where(Trips.id == trip_id, Trips.capacity.isnot(None), booked + len(seats) <= Trips.capacity)
+                    .values(booked_seats=booked + len(seats))
+                    .returning(Trips.booked_seats)
+                    .execution_options(synchronize_session=False)
+                )).first()
+                if row is None:
+                    raise HTTPException(status_code=409, detail="Not enough seats left on this trip")
+                await db.commit()
+            except BaseException as e:
+                # Also reached when the request is cancelled during an await; the
+                # hold must not be left "confirming", holding its seats forever
+                self._finish(hold, None)
+                if not isinstance(e, (HTTPException, IntegrityError)):
+                    # The commit may or may not have gone through; re-read the
+                    # map on its next use
+                    self._mark_stale(trip_id)
+                if not isinstance(e, Exception):
+                    # Cancelled: await nothing more, closing the session rolls back
+                    raise
+                await db.rollback()
+                if isinstance(e, IntegrityError):
+                    # Our bitmap missed a booking made elsewhere; re-read it now
+                    await self._load(db, trip_id)
+                    raise HTTPException(status_code=409, detail="Some of the held seats were booked by someone else")
+                raise
+
+        self._finish(hold, row.booked_seats)
+        return await self.seat_map(sessions, trip_id)
+
+    def forget(self, trip_id: int) -> None:
+        """Drop a trip's seat map (and its holds), e.g. after it was deleted or resized."""
+        with self._lock:
+            self._trips.pop(trip_id, None)
+            for hold in [hold for hold in self._holds.values() if hold.trip_id == trip_id]:
+                self._wheel.cancel(hold.hold_id, hold.deadline)
+                del self._holds[hold.hold_id]
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._expire()
+            return {
+                "trips": len(self._trips),
+                "holds": len(self._holds),
+                "held_seats": sum(_count(hold.mask) for hold in self._holds.values()),
+                "scheduled_timers": len(self._wheel),
+                "expired_holds": self.expired,
+                "refreshes": self.refreshes,
+            }
+
+    async def _ensure_loaded(self, sessions: Callable[[], AsyncSession], trip_id: int) -> None:
+        with self._lock:
+            trip = self._trips.get(trip_id)
+            if trip is not None and self._clock() - trip.loaded_at < self.refresh_seconds:
+                return
+        async with sessions() as db:
+            await self._load(db, trip_id)
+
+    async def _load(self, db: AsyncSession, trip_id: int) -> None:
+        row = (await db.execute(select(Trips.capacity, Trips.booked_seats).where(Trips.id == trip_id))).first()
+        if row is None:
+            self.forget(trip_id)
+            raise HTTPException(status_code=404, detail="Trip not found")
+        if row.capacity is None:
+            self.forget(trip_id)
+            raise HTTPException(status_code=409, detail="Trip capacity is unknown, seats cannot be selected")
+        booked = (await _booked_bitmaps(db, [trip_id])).get(trip_id, 0)
+        with self._lock:
+            self.refreshes += 1
+            trip = TripSeats(row.capacity, booked, row.booked_seats or 0, self._clock())
+            # Holds survive a refresh; ones on seats that were booked elsewhere
+            # will fail their confirm
+            for hold in self._holds.values():
+                if hold.trip_id == trip_id:
+                    trip.held |= hold.mask
+            self._trips[trip_id] = trip
+
+    def _trip(self, trip_id: int) -> TripSeats:
+        # Caller holds the lock; the map can be forgotten between load and use
+        trip = self._trips.get(trip_id)
+        if trip is None:
+            raise HTTPException(status_code=404, detail="Trip not found")
+        return trip
+
+    def _finish(self, hold: Hold, booked_seats: Optional[int]) -> None:
+        with self._lock:
+            trip = self._drop(hold)
+            if trip is not None and booked_seats is not None:
+                trip.booked |= hold.mask
+                trip.booked_seats = booked_seats
+
+    def _mark_stale(self, trip_id: int) -> None:
+        with self._lock:
+            trip = self._trips.get(trip_id)
+            if trip is not None:
+                trip.loaded_at = float("-inf")
+
+    def _drop(self, hold: Hold) -> Optional[TripSeats]:
+        # Caller holds the lock
+        self._holds.pop(hold.hold_id, None)
+        trip = self._trips.get(hold.trip_id)
+        if trip is not None:
+            trip.held &= ~hold.mask
+        return trip
+
+    def _expire(self) -> None:
+        # Caller holds the lock
+        for hold_id in self._wheel.advance():
+            hold = self._holds.get(hold_id)
+            if hold is not None and not hold.confirming:
+                self._drop(hold)
+                self.expired += 1
+
+
+async def _booked_bitmaps(db: AsyncSession, trip_ids: Iterable[int]) -> Dict[int, int]:
+    trip_ids = list(trip_ids)
+    bitmaps: Dict[int, int] = {}
+    if not trip_ids:
+        return bitmaps
+    rows = await db.execute(
+        select(TripSeatBooking.trip_id, TripSeatBooking.seat_number).where(TripSeatBooking.trip_id.in_(trip_ids))
+    )
+    for trip_id, seat in rows:
+        bitmaps[trip_id] = bitmaps.get(trip_id, 0) | 1 << seat
+    return bitmaps
+
+
+def _mask(seats: Iterable[int]) -> int:
+    mask = 0
+    for seat in seats:
+        mask |= 1 << seat
+    return mask
+
+
+def _count(bitmap: int) -> int:
+    return bin(bitmap).count("1")
+
+
+seat_registry = SeatRegistry(
+    settings.SEAT_HOLD_TTL_SECONDS,
+    settings.SEATMAP_REFRESH_SECONDS,
+    settings.SEAT_HOLD_WHEEL_SLOTS,
+)
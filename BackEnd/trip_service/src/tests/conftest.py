@@ -0,0 +1,39 @@
+import pytest
+from sqlalchemy import MetaData, create_engine
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src import models
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """
+    A SQLite file with the trip service tables. The GiST exclusion
+    constraints are PostgreSQL-only and left out.
+    """
+    metadata = MetaData()
+    for table in models.Base.metadata.sorted_tables:
+        copy = table.to_metadata(metadata)
+        for constraint in [c for c in copy.constraints if isinstance(c, ExcludeConstraint)]:
+            copy.constraints.remove(constraint)
+    path = tmp_path / "trips.db"
+    engine = create_engine(f"sqlite:///{path}")
+    metadata.create_all(engine)
+    engine.dispose()
+    return path
+
+
+@pytest.fixture
+def session_factory(db_path):
+    engine = create_engine(f"sqlite:///{db_path}")
+    yield sessionmaker(bind=engine, autoflush=False)
+    engine.dispose()
+
+
+@pytest.fixture
+def async_session_factory(db_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    yield async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    engine.sync_engine.dispose()
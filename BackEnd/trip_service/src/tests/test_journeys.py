@@ -0,0 +1,205 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from src import journeys, models
+from src.config import settings
+from src.journeys import Connection, JourneyPlanner
+
+T = datetime(2026, 5, 1, 8, 0)
+A, B, C, D = 1, 2, 3, 4
+
+
+def conn(trip_id, origin, destination, depart, arrive, price=10.0):
+    """A connection departing and arriving `depart`/`arrive` minutes after T."""
+    return Connection(T + timedelta(minutes=depart), trip_id, T + timedelta(minutes=arrive), origin, destination, trip_id, price)
+
+
+def planner(*connections, min_transfer=10, window_hours=48):
+    planner = JourneyPlanner(horizon_days=31, rebuild_seconds=300, min_transfer_minutes=min_transfer, search_window_hours=window_hours)
+    with planner._lock:
+        for connection in connections:
+            planner._apply(connection.trip_id, connection)
+    return planner
+
+
+def legs(journey):
+    return [leg.trip_id for leg in journey.legs]
+
+
+def test_earliest_arrival_takes_a_faster_transfer_over_a_direct_trip():
+    journey = planner(
+        conn(1, A, B, 0, 60),
+        conn(2, B, C, 75, 120),
+        conn(3, A, C, 10, 180),
+    ).earliest_arrival(A, C, T)
+    assert legs(journey) == [1, 2]
+    assert (journey.arrival_time, journey.transfers, journey.price) == (T + timedelta(minutes=120), 1, 20.0)
+
+
+def test_transfer_margin():
+    timetable = (
+        conn(1, A, B, 0, 60),
+        conn(2, B, C, 65, 100),  # 5 minutes to change
+        conn(3, B, C, 70, 130),  # exactly the 10 minute margin
+    )
+    assert legs(planner(*timetable).earliest_arrival(A, C, T)) == [1, 3]
+    assert legs(planner(*timetable, min_transfer=0).earliest_arrival(A, C, T)) == [1, 2]
+
+
+def test_no_margin_at_the_starting_city():
+    assert legs(planner(conn(1, A, B, 0, 60)).earliest_arrival(A, B, T)) == [1]
+
+
+def test_departures_before_the_requested_time_and_unreachable_cities():
+    timetable = planner(conn(1, A, B, 0, 60), conn(2, C, D, 90, 120))
+    assert timetable.earliest_arrival(A, B, T + timedelta(minutes=1)) is None
+    assert timetable.earliest_arrival(A, D, T) is None
+    assert timetable.cheapest(A, D, T) is None
+
+
+def test_path_is_reconstructed_leg_by_leg():
+    journey = planner(
+        conn(1, A, B, 0, 60),
+        conn(2, B, C, 80, 140),
+        conn(3, B, D, 90, 400),  # reaches D, but later
+        conn(4, C, D, 160, 220),
+        conn(5, D, A, 230, 300),  # never part of a journey to D
+    ).earliest_arrival(A, D, T)
+    assert legs(journey) == [1, 2, 4]
+    assert [(leg.from_city_id, leg.to_city_id) for leg in journey.legs] == [(A, B), (B, C), (C, D)]
+    assert journey.departure_time == T and journey.arrival_time == T + timedelta(minutes=220)
+
+
+def test_cheapest_trades_time_for_price():
+    timetable = planner(
+        conn(1, A, C, 0, 120, price=50),
+        conn(2, A, B, 0, 60, price=20),
+        conn(3, B, C, 80, 200, price=20),
+        conn(4, B, C, 65, 90, price=1),  # too tight a transfer
+    )
+    assert legs(timetable.earliest_arrival(A, C, T)) == [1]
+    journey = timetable.cheapest(A, C, T)
+    assert legs(journey) == [2, 3]
+    assert journey.price == 40
+
+
+def test_cheapest_prefers_the_earlier_arrival_on_equal_price():
+    journey = planner(
+        conn(1, A, C, 0, 300, price=30),
+        conn(2, A, C, 10, 200, price=30),
+    ).cheapest(A, C, T)
+    assert legs(journey) == [2]
+
+
+def test_cheapest_stays_inside_the_search_window():
+    timetable = planner(
+        conn(1, A, B, 0, 60, price=100),
+        conn(2, A, B, 3 * 60, 4 * 60, price=1),
+        window_hours=2,
+    )
+    assert legs(timetable.cheapest(A, B, T)) == [1]
+
+
+def test_apply_moves_and_removes_connections():
+    timetable = planner(conn(1, A, B, 0, 60), conn(2, A, B, 30, 90), conn(3, B, C, 100, 160))
+    with timetable._lock:
+        timetable._apply(1, conn(1, A, B, 120, 180))  # rescheduled
+        timetable._apply(3, None)  # deleted
+        timetable._apply(99, None)  # unknown trips are ignored
+    assert [c.trip_id for c in timetable._connections] == [2, 1]
+    assert timetable._connections == sorted(timetable._connections)
+    assert set(timetable._by_trip) == {1, 2}
+    assert timetable._by_trip[1].departure_time == T + timedelta(minutes=120)
+
+
+@pytest.fixture
+def route_gate(monkeypatch):
+    """Route lookups for routes 1 (A to B) and 2 (B to C); they wait until the gate is set."""
+    routes = {1: (A, B), 2: (B, C)}
+    gate = asyncio.Event()
+    gate.reached = asyncio.Event()
+
+    async def fetch(kind, route_id):
+        gate.reached.set()
+        await gate.wait()
+        if route_id not in routes:
+            return None
+        origin, destination = routes[route_id]
+        return {settings.ROUTE_ORIGIN_FIELD: origin, settings.ROUTE_DESTINATION_FIELD: destination}
+
+    monkeypatch.setattr(journeys.reference_client, "fetch", fetch)
+    return gate
+
+
+def add_trips(session_factory, *trips):
+    db = session_factory()
+    ids = []
+    for route_id, hours in trips:
+        departure = datetime.now().replace(microsecond=0) + timedelta(hours=hours)
+        trip = models.Trips(
+            route_id=route_id, bus_id=route_id, driver_id=route_id, price=10,
+            departure_time=departure, arrival_time=departure + timedelta(hours=1), departure_date=departure.date(),
+        )
+        db.add(trip)
+        db.flush()
+        ids.append(trip.id)
+    db.commit()
+    db.close()
+    return ids
+
+
+def test_rebuild_loads_trips_and_skips_unknown_routes(async_session_factory, session_factory, route_gate):
+    add_trips(session_factory, (1, 2), (2, 4), (9, 6))
+    timetable = planner()
+    route_gate.set()
+
+    async def main():
+        async with async_session_factory() as db:
+            return await timetable.rebuild(db)
+
+    assert asyncio.run(main()) == 2
+    stats = timetable.stats()
+    assert (stats["connections"], stats["cities"], stats["rebuilds"], stats["skipped_routes"]) == (2, 3, 1, 1)
+
+
+def test_writes_during_a_rebuild_are_replayed_on_the_new_list(async_session_factory, session_factory, route_gate):
+    removed, kept = add_trips(session_factory, (1, 2), (2, 4))
+    timetable = planner()
+    added = Connection(datetime.now() + timedelta(hours=8), 999, datetime.now() + timedelta(hours=9), A, C, 3, 5.0)
+
+    async def main():
+        async with async_session_factory() as db:
+            rebuild = asyncio.ensure_future(timetable.rebuild(db))
+            await asyncio.wait_for(route_gate.reached.wait(), 5)  # rows read, lookups pending
+            timetable.remove(removed)  # e.g. DELETE /trips/{id} on this worker
+            timetable._record(added.trip_id, added)
+            route_gate.set()
+            await rebuild
+
+    asyncio.run(main())
+    assert sorted(timetable._by_trip) == [kept, 999]
+    assert timetable._pending is None
+    assert timetable.stats()["updates"] == 2
+
+
+def test_ensure_fresh_opens_a_session_only_for_a_rebuild(async_session_factory, session_factory, route_gate):
+    add_trips(session_factory, (1, 2))
+    timetable = planner()
+    route_gate.set()
+    opened = []
+
+    def sessions():
+        opened.append(1)
+        return async_session_factory()
+
+    async def main():
+        await timetable.ensure_fresh(sessions)
+        await timetable.ensure_fresh(sessions)
+        timetable._built_at -= timetable.rebuild_seconds
+        await timetable.ensure_fresh(sessions)
+
+    asyncio.run(main())
+    assert len(opened) == 2
+    assert timetable.stats()["rebuilds"] == 2
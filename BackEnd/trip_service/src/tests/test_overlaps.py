@@ -0,0 +1,134 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+
+from src import models, routes, schemas
+
+DEPARTURE = datetime(2026, 6, 1, 8, 0)
+
+
+class PgError(Exception):
+    """What the driver raises: a message naming the constraint, and its SQLSTATE."""
+
+    def __init__(self, pgcode, message):
+        super().__init__(message)
+        self.pgcode = pgcode
+
+
+def integrity_error(pgcode, message):
+    return IntegrityError("INSERT INTO trips ...", {}, PgError(pgcode, message))
+
+
+def exclusion(constraint):
+    return integrity_error(
+        "23P01", f'conflicting key value violates exclusion constraint "{constraint}"',
+    )
+
+
+@pytest.mark.parametrize("constraint, what", [("ex_trips_bus_overlap", "bus"), ("ex_trips_driver_overlap", "driver")])
+def test_exclusion_violations_are_409(constraint, what):
+    conflict = routes._overlap_conflict(exclusion(constraint))
+    assert conflict.status_code == 409
+    assert conflict.detail == f"The {what} already has a trip overlapping this time"
+
+
+@pytest.mark.parametrize("error", [
+    integrity_error("23505", 'duplicate key value violates unique constraint "trips_pkey"'),
+    integrity_error("23514", 'new row violates check constraint "ck_trips_booked_seats"'),
+    exclusion("ex_some_other_constraint"),
+    IntegrityError("INSERT INTO trips ...", {}, Exception("no pgcode, e.g. SQLite")),
+])
+def test_other_integrity_errors_are_not_overlaps(error):
+    assert routes._overlap_conflict(error) is None
+
+
+class FailingSession:
+    """A session whose commit fails with `error`."""
+
+    def __init__(self, error):
+        self.error = error
+        self.rolled_back = False
+
+    def add(self, instance):
+        pass
+
+    async def commit(self):
+        raise self.error
+
+    async def rollback(self):
+        self.rolled_back = True
+
+
+@pytest.fixture
+def references(monkeypatch):
+    async def validate(route_id, bus_id, driver_id):
+        return {}
+
+    monkeypatch.setattr(routes, "validate_references", validate)
+
+
+def new_trip(**overrides):
+    values = dict(
+        route_id=1, bus_id=1, driver_id=1, departure_time=DEPARTURE, arrival_time=DEPARTURE + timedelta(hours=2),
+        departure_date=DEPARTURE.date(), price=10, capacity=40,
+    )
+    values.update(overrides)
+    return schemas.TripCreat(**values)
+
+
+def create(trip, db):
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(routes.create_trip(trip, db))
+    return exc.value
+
+
+@pytest.mark.parametrize("constraint, what", [("ex_trips_bus_overlap", "bus"), ("ex_trips_driver_overlap", "driver")])
+def test_create_maps_an_overlap_to_409(references, constraint, what):
+    db = FailingSession(exclusion(constraint))
+    error = create(new_trip(), db)
+    assert (error.status_code, error.detail) == (409, f"The {what} already has a trip overlapping this time")
+    assert db.rolled_back
+
+
+def test_create_keeps_the_generic_409_for_other_integrity_errors(references):
+    db = FailingSession(integrity_error("23505", 'duplicate key value violates unique constraint "trips_pkey"'))
+    error = create(new_trip(), db)
+    assert (error.status_code, error.detail) == (409, "Trip conflicts with an existing trip")
+
+
+@pytest.mark.parametrize("hours", [0, -1])
+def test_create_rejects_arrival_not_after_departure(references, hours):
+    error = create(new_trip(arrival_time=DEPARTURE + timedelta(hours=hours)), FailingSession(None))
+    assert (error.status_code, error.detail) == (400, "arrival_time must be after departure_time")
+
+
+@pytest.fixture
+def trip_id(session_factory):
+    db = session_factory()
+    trip = models.Trips(
+        route_id=1, bus_id=1, driver_id=1, price=10, booked_seats=0, capacity=40,
+        departure_time=DEPARTURE, arrival_time=DEPARTURE + timedelta(hours=2), departure_date=DEPARTURE.date(),
+    )
+    db.add(trip)
+    db.commit()
+    trip_id = trip.id
+    db.close()
+    return trip_id
+
+
+@pytest.mark.parametrize("update", [
+    {"arrival_time": DEPARTURE},  # checked against the stored departure
+    {"departure_time": DEPARTURE + timedelta(hours=3)},  # and the stored arrival
+    {"departure_time": DEPARTURE + timedelta(hours=5), "arrival_time": DEPARTURE + timedelta(hours=4)},
+])
+def test_update_rejects_arrival_not_after_departure(async_session_factory, references, trip_id, update):
+    async def main():
+        async with async_session_factory() as db:
+            await routes.update_trip(trip_id, schemas.TripUpdate(**update), db)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(main())
+    assert (exc.value.status_code, exc.value.detail) == (400, "arrival_time must be after departure_time")
@@ -0,0 +1,80 @@
+import json
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException, Response
+
+from src import models, routes
+from src.config import settings
+from src.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(date(2026, 3, 1), 42)) == (date(2026, 3, 1), 42)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    "e30",  # {}
+    encode_cursor(date(2026, 3, 1), 42)[:-4],
+    "eyJkYXRlIjoiMjAyNi0xMy0wMSIsImlkIjoxfQ",  # month 13
+    "eyJkYXRlIjoiMjAyNi0wMy0wMSIsImlkIjoiMSJ9",  # id is a string
+])
+def test_invalid_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+@pytest.fixture
+def trips(session_factory, monkeypatch):
+    # Several trips share a departure_date so pages split inside one date
+    db = session_factory()
+    for day, count in ((1, 3), (2, 1), (3, 2)):
+        for hour in range(count):
+            departure = datetime(2026, 3, day, 8 + hour)
+            db.add(models.Trips(
+                route_id=1, bus_id=hour, driver_id=hour, price=10,
+                departure_time=departure, departure_date=departure.date(),
+            ))
+    db.add(models.Trips(route_id=1, bus_id=9, driver_id=9, price=10))  # no departure_date, never listed
+    db.commit()
+    rows = [(trip.departure_date, trip.id) for trip in db.query(models.Trips).filter(models.Trips.departure_date.isnot(None))]
+    db.close()
+    monkeypatch.setattr(routes, "read_session", lambda request: session_factory())
+    return sorted(rows)
+
+
+def _page(limit, cursor):
+    response = Response()
+    body = routes.get_trips(
+        SimpleNamespace(), response, limit=limit, cursor=cursor, date_from=None, date_to=None,
+        route_id=None, bus_id=None, driver_id=None, stream=False, fields="trip_id,departure_date",
+    )
+    rows = [(date.fromisoformat(row["departure_date"]), row["trip_id"]) for row in json.loads(body.body)]
+    return rows, response.headers.get(NEXT_CURSOR_HEADER)
+
+
+def test_pages_cover_every_trip_once_across_date_boundaries(trips):
+    seen = []
+    cursor = None
+    while True:
+        rows, cursor = _page(2, cursor)
+        seen.extend(rows)
+        if cursor is None:
+            break
+    assert seen == trips
+
+
+def test_cursor_resumes_after_the_last_row_of_a_shared_date(trips):
+    first_day, _ = trips[0]
+    rows, _ = _page(10, encode_cursor(first_day, trips[1][1]))
+    assert rows == trips[2:]
+
+
+def test_last_page_sends_no_cursor(trips, monkeypatch):
+    monkeypatch.setattr(settings, "DEFAULT_PAGE_SIZE", len(trips))
+    rows, cursor = _page(None, None)
+    assert rows == trips
+    assert cursor is None
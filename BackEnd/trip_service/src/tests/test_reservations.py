@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from src import models
+from src.reservations import release_reservation, reserve_seats
+
+
+@pytest.fixture
+def trip_id(session_factory):
+    db = session_factory()
+    trip = models.Trips(route_id=1, bus_id=1, driver_id=1, price=10, booked_seats=0, capacity=5)
+    db.add(trip)
+    db.commit()
+    trip_id = trip.id
+    db.close()
+    return trip_id
+
+
+def test_release_gives_back_exactly_the_reserved_seats(async_session_factory, trip_id):
+    async def main():
+        async with async_session_factory() as db:
+            first = await reserve_seats(db, trip_id, 2)
+            second = await reserve_seats(db, trip_id, 3)
+            assert (first.booked_seats, second.booked_seats, second.available_seats) == (2, 5, 0)
+            released = await release_reservation(db, trip_id, first.reservation_id)
+            assert (released.booked_seats, released.available_seats) == (3, 2)
+
+    asyncio.run(main())
+
+
+def test_a_reservation_is_released_once(async_session_factory, trip_id):
+    async def main():
+        async with async_session_factory() as db:
+            reservation = await reserve_seats(db, trip_id, 2)
+            await release_reservation(db, trip_id, reservation.reservation_id)
+            with pytest.raises(HTTPException) as exc:
+                await release_reservation(db, trip_id, reservation.reservation_id)
+            assert exc.value.status_code == 404
+            with pytest.raises(HTTPException) as exc:
+                await release_reservation(db, trip_id + 1, reservation.reservation_id)
+            assert exc.value.status_code == 404
+
+    asyncio.run(main())
+
+
+def test_refused_reservation_records_nothing(async_session_factory, session_factory, trip_id):
+    async def main():
+        async with async_session_factory() as db:
+            with pytest.raises(HTTPException) as exc:
+                await reserve_seats(db, trip_id, 6)
+            assert exc.value.status_code == 409
+
+    asyncio.run(main())
+    db = session_factory()
+    assert db.query(models.TripReservation).count() == 0
+    assert db.get(models.Trips, trip_id).booked_seats == 0
+    db.close()
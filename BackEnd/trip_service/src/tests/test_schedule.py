@@ -0,0 +1,127 @@
+import asyncio
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from src import models, schemas
+from src.config import settings
+from src.schedule import check_conflicts, expand
+
+
+def schedule(**overrides) -> schemas.TripSchedule:
+    values = dict(
+        route_id=1, bus_id=1, driver_id=1,
+        start_date=date(2026, 3, 2), end_date=date(2026, 3, 8),  # Monday to Sunday
+        departure_time=time(8, 0), arrival_time=time(10, 30), price=12.5,
+    )
+    values.update(overrides)
+    return schemas.TripSchedule(**values)
+
+
+def test_every_day_by_default():
+    trips = expand(schedule(), capacity=40)
+    assert [trip["departure_date"] for trip in trips] == [date(2026, 3, 2) + timedelta(days=i) for i in range(7)]
+    assert trips[0]["departure_time"] == datetime(2026, 3, 2, 8, 0)
+    assert trips[0]["arrival_time"] == datetime(2026, 3, 2, 10, 30)
+    assert {trip["capacity"] for trip in trips} == {40}
+    assert {trip["booked_seats"] for trip in trips} == {0}
+
+
+def test_arrival_before_departure_wraps_past_midnight():
+    trips = expand(schedule(departure_time=time(22, 0), arrival_time=time(1, 30)), capacity=None)
+    assert trips[0]["departure_time"] == datetime(2026, 3, 2, 22, 0)
+    assert trips[0]["arrival_time"] == datetime(2026, 3, 3, 1, 30)
+    assert trips[0]["departure_date"] == date(2026, 3, 2)
+
+
+def test_equal_times_mean_a_full_day():
+    [trip] = expand(schedule(end_date=date(2026, 3, 2), departure_time=time(9, 0), arrival_time=time(9, 0)), capacity=None)
+    assert trip["arrival_time"] - trip["departure_time"] == timedelta(days=1)
+
+
+def test_days_of_week_filter():
+    trips = expand(schedule(end_date=date(2026, 3, 15), days_of_week=[0, 2]), capacity=None)
+    assert [trip["departure_date"] for trip in trips] == [
+        date(2026, 3, 2), date(2026, 3, 4), date(2026, 3, 9), date(2026, 3, 11),
+    ]
+
+
+@pytest.mark.parametrize("overrides", [
+    {"days_of_week": [7]},
+    {"days_of_week": []},
+    {"end_date": date(2026, 3, 1)},
+    {"end_date": date(2026, 3, 3), "days_of_week": [6]},  # no Sunday in the range
+])
+def test_rejected_schedules(overrides):
+    with pytest.raises(HTTPException) as exc:
+        expand(schedule(**overrides), capacity=None)
+    assert exc.value.status_code == 400
+
+
+def test_max_trips_cap(monkeypatch):
+    monkeypatch.setattr(settings, "SCHEDULE_MAX_TRIPS", 3)
+    assert len(expand(schedule(end_date=date(2026, 3, 4)), capacity=None)) == 3
+    with pytest.raises(HTTPException) as exc:
+        expand(schedule(end_date=date(2026, 3, 5)), capacity=None)
+    assert exc.value.status_code == 400
+    # Days filtered out by days_of_week do not count
+    assert len(expand(schedule(end_date=date(2026, 3, 16), days_of_week=[0]), capacity=None)) == 3
+
+
+@pytest.fixture
+def existing(session_factory):
+    """Bus 1 and driver 7 already have trips on some days of the week."""
+    def add(bus_id, driver_id, start, end):
+        db.add(models.Trips(
+            route_id=2, bus_id=bus_id, driver_id=driver_id, price=5,
+            departure_time=start, arrival_time=end, departure_date=start.date(),
+        ))
+
+    db = session_factory()
+    add(1, 5, datetime(2026, 3, 3, 9, 0), datetime(2026, 3, 3, 11, 0))  # overlaps Tuesday's trip
+    add(1, 5, datetime(2026, 3, 4, 6, 0), datetime(2026, 3, 4, 8, 0))  # ends as Wednesday's departs
+    add(1, 5, datetime(2026, 3, 5, 10, 30), datetime(2026, 3, 5, 12, 0))  # starts as Thursday's arrives
+    add(2, 7, datetime(2026, 3, 6, 7, 0), datetime(2026, 3, 6, 8, 30))  # another bus, driver 7
+    db.commit()
+    db.close()
+
+
+def run_check(async_session_factory, trips):
+    async def main():
+        async with async_session_factory() as db:
+            await check_conflicts(db, trips)
+
+    asyncio.run(main())
+
+
+def test_overlaps_are_reported_by_date(async_session_factory, existing):
+    with pytest.raises(HTTPException) as exc:
+        run_check(async_session_factory, expand(schedule(), capacity=None))
+    assert exc.value.status_code == 409
+    assert exc.value.detail == "The bus already has overlapping trips on 2026-03-03"
+
+
+def test_driver_overlaps_are_checked_too(async_session_factory, existing):
+    with pytest.raises(HTTPException) as exc:
+        run_check(async_session_factory, expand(schedule(bus_id=3, driver_id=7), capacity=None))
+    assert exc.value.detail == "The driver already has overlapping trips on 2026-03-06"
+
+
+def test_touching_trips_do_not_overlap(async_session_factory, existing):
+    run_check(async_session_factory, expand(schedule(start_date=date(2026, 3, 4), end_date=date(2026, 3, 5)), capacity=None))
+
+
+def test_long_conflict_lists_are_shortened(async_session_factory, session_factory):
+    db = session_factory()
+    for day in range(12):
+        start = datetime(2026, 4, 1, 8, 0) + timedelta(days=day)
+        db.add(models.Trips(
+            route_id=2, bus_id=1, driver_id=5, price=5,
+            departure_time=start, arrival_time=start + timedelta(hours=1), departure_date=start.date(),
+        ))
+    db.commit()
+    db.close()
+    with pytest.raises(HTTPException) as exc:
+        run_check(async_session_factory, expand(schedule(start_date=date(2026, 4, 1), end_date=date(2026, 4, 12)), capacity=None))
+    assert exc.value.detail.endswith("2026-04-10 and 2 more")
@@ -0,0 +1,44 @@
+import asyncio
+import json
+from datetime import date, datetime
+
+import pytest
+
+from src import routes, schemas
+from src.config import settings
+from src.responses import FastJSONResponse
+
+ROW = {
+    "trip_id": 1, "bus_id": 2, "driver_id": 3, "route_id": 4, "price": 12.5,
+    "departure_time": datetime(2026, 7, 1, 8, 0), "arrival_time": datetime(2026, 7, 1, 10, 0),
+    "departure_date": date(2026, 7, 1),
+}
+
+
+@pytest.fixture(autouse=True)
+def search_rows(monkeypatch):
+    monkeypatch.setattr(routes, "_search_rows", lambda route_id, search_date: [ROW])
+    routes.search_cache.clear()
+    yield
+    routes.search_cache.clear()
+
+
+def search(fields=None):
+    return asyncio.run(routes.search_trips_by_route_and_date(4, "2026-07-01", fields))
+
+
+def test_search_uses_the_default_path_unless_fast_json_is_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", False)
+    assert search() == [schemas.Trip(**ROW)]
+
+
+def test_search_uses_the_fast_path_when_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+    response = search()
+    assert isinstance(response, FastJSONResponse)
+    assert json.loads(response.body)[0]["trip_id"] == 1
+
+
+def test_sparse_search_is_always_encoded_directly(monkeypatch):
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", False)
+    assert json.loads(search("trip_id,price").body) == [{"trip_id": 1, "price": 12.5}]
@@ -0,0 +1,162 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from src import models
+from src.seatmap import SeatRegistry, TimerWheel
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_wheel_expires_entries_after_gaps_longer_than_a_revolution():
+    clock = FakeClock()
+    wheel = TimerWheel(slots=8, tick_seconds=1.0, clock=clock)
+    wheel.schedule("soon", 3)
+    wheel.schedule("later", 20)  # shares a bucket with nearer deadlines
+    wheel.schedule("much later", 50)
+
+    clock.now += 25  # three revolutions without an advance
+    assert sorted(wheel.advance()) == ["later", "soon"]
+    assert len(wheel) == 1
+
+    clock.now += 24
+    assert wheel.advance() == []
+    clock.now += 1
+    assert wheel.advance() == ["much later"]
+    assert len(wheel) == 0
+
+
+def test_wheel_cancel_and_short_delays():
+    clock = FakeClock()
+    wheel = TimerWheel(slots=4, tick_seconds=1.0, clock=clock)
+    deadline = wheel.schedule("cancelled", 2)
+    wheel.schedule("immediate", 0)  # still waits for the next tick
+    wheel.cancel("cancelled", deadline)
+    assert wheel.advance() == []
+    clock.now += 5
+    assert wheel.advance() == ["immediate"]
+
+
+@pytest.fixture
+def trip_id(session_factory):
+    db = session_factory()
+    trip = models.Trips(route_id=1, bus_id=1, driver_id=1, price=10, booked_seats=0, capacity=4)
+    db.add(trip)
+    db.commit()
+    trip_id = trip.id
+    db.close()
+    return trip_id
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def registry(clock):
+    return SeatRegistry(hold_ttl=60, refresh_seconds=300, wheel_slots=16, clock=clock)
+
+
+def test_abandoned_hold_expires(async_session_factory, registry, clock, trip_id):
+    async def main():
+        hold = await registry.hold(async_session_factory, trip_id, [1, 2])
+        seat_map = await registry.seat_map(async_session_factory, trip_id)
+        assert (seat_map.held, seat_map.available_seats) == ([1, 2], 2)
+
+        clock.now += 61
+        seat_map = await registry.seat_map(async_session_factory, trip_id)
+        assert (seat_map.held, seat_map.free, seat_map.available_seats) == ([], [1, 2, 3, 4], 4)
+        assert registry.stats()["expired_holds"] == 1
+        with pytest.raises(HTTPException) as exc:
+            await registry.confirm(async_session_factory, trip_id, hold.hold_id)
+        assert exc.value.status_code == 404
+
+    asyncio.run(main())
+
+
+def test_loaded_map_is_served_without_a_session(async_session_factory, registry, clock, trip_id):
+    opened = []
+
+    def sessions():
+        opened.append(1)
+        return async_session_factory()
+
+    async def main():
+        await registry.seat_map(sessions, trip_id)
+        await registry.hold(sessions, trip_id, [1])
+        await registry.seat_map(sessions, trip_id)
+        assert len(opened) == 1
+        clock.now += 301  # SEATMAP_REFRESH_SECONDS later the map is re-read
+        await registry.seat_map(sessions, trip_id)
+        assert len(opened) == 2
+
+    asyncio.run(main())
+
+
+def test_hold_confirm_then_map(async_session_factory, session_factory, registry, trip_id):
+    async def main():
+        hold = await registry.hold(async_session_factory, trip_id, [2, 3])
+        with pytest.raises(HTTPException) as exc:
+            await registry.hold(async_session_factory, trip_id, [3])
+        assert exc.value.status_code == 409
+        seat_map = await registry.confirm(async_session_factory, trip_id, hold.hold_id)
+        assert (seat_map.booked, seat_map.held, seat_map.free) == ([2, 3], [], [1, 4])
+        assert seat_map.available_seats == 2
+
+    asyncio.run(main())
+    db = session_factory()
+    assert db.get(models.Trips, trip_id).booked_seats == 2
+    assert sorted(booking.seat_number for booking in db.query(models.TripSeatBooking)) == [2, 3]
+    db.close()
+
+
+def test_seat_booked_by_another_worker_fails_the_confirm(async_session_factory, session_factory, registry, trip_id):
+    async def main():
+        hold = await registry.hold(async_session_factory, trip_id, [1])
+        other = session_factory()
+        other.add(models.TripSeatBooking(trip_id=trip_id, seat_number=1))
+        other.commit()
+        other.close()
+        with pytest.raises(HTTPException) as exc:
+            await registry.confirm(async_session_factory, trip_id, hold.hold_id)
+        assert exc.value.status_code == 409
+        seat_map = await registry.seat_map(async_session_factory, trip_id)
+        assert (seat_map.booked, seat_map.held) == ([1], [])
+
+    asyncio.run(main())
+
+
+class StalledSession:
+    """A session whose queries never answer, e.g. the confirm's INSERT."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self, *args, **kwargs):
+        await asyncio.Event().wait()
+
+
+def test_cancelled_confirm_releases_the_hold(async_session_factory, registry, trip_id):
+    async def main():
+        hold = await registry.hold(async_session_factory, trip_id, [1, 2])
+        confirm = asyncio.ensure_future(registry.confirm(StalledSession, trip_id, hold.hold_id))
+        await asyncio.sleep(0.01)
+        confirm.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await confirm
+        assert registry.stats()["holds"] == 0
+        seat_map = await registry.seat_map(async_session_factory, trip_id)
+        assert (seat_map.held, seat_map.available_seats) == ([], 4)
+
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+"""
+Micro-benchmark: per-row cost of serializing a driver list.
+
+Rows are in-memory stand-ins for loaded Driver/User ORM objects, so no
+database is needed. Three paths are timed from loaded rows to JSON bytes:
+
+- models + validate: _driver_out() per row, then List[DriverOut] validated
+  again and dumped, as FastAPI does for a `response_model`
+- models + stdlib:   _driver_out() per row, jsonable_encoder and json.dumps,
+  the path taken by older FastAPI releases
+- fast path:         _driver_row() per row and DRIVER_LIST.dump_json
+  (FAST_JSON_RESPONSES=true)
+
+    cd BackEnd/user_service
+    python -m benchmarks.bench_serialization --rows 500 --repeat 200
+"""
+import argparse
+import json
+import time
+from datetime import date
+from types import SimpleNamespace
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from src.responses import DRIVER_LIST
+from src.routes import _driver_out, _driver_row
+from src.schemas import DriverOut
+
+DRIVER_OUT_LIST = TypeAdapter(List[DriverOut])
+
+
+def make_rows(count: int):
+    return [
+        SimpleNamespace(
+            id=i,
+            license_number=f"LIC-{i:06d}",
+            license_expiry=date(2027, 1, 1),
+            hire_date=date(2020, 5, 17),
+            city_id=i % 40,
+            operator_name="Selam Bus",
+            user=SimpleNamespace(
+                first_name="Abebe",
+                last_name="Kebede",
+                email=f"driver{i}@example.com",
+                address="Addis Ababa",
+            ),
+        )
+        for i in range(count)
+    ]
+
+
+def models_validate(rows) -> bytes:
+    return DRIVER_OUT_LIST.dump_json(DRIVER_OUT_LIST.validate_python([_driver_out(row) for row in rows], from_attributes=True))
+
+
+def models_stdlib(rows) -> bytes:
+    return json.dumps(jsonable_encoder([_driver_out(row) for row in rows])).encode()
+
+
+def fast_path(rows) -> bytes:
+    return DRIVER_LIST.dump_json([_driver_row(row) for row in rows])
+
+
+def run(name, serialize, rows, repeat):
+    serialize(rows)  # warm up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        serialize(rows)
+    elapsed = time.perf_counter() - started
+    per_row_us = elapsed / (repeat * len(rows)) * 1_000_000
+    print(f"{name:>17}: {per_row_us:7.2f} us/row, {elapsed / repeat * 1000:8.3f} ms/response")
+    return per_row_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    assert json.loads(models_validate(rows)) == json.loads(fast_path(rows))
+    baseline = run("models + validate", models_validate, rows, args.repeat)
+    run("models + stdlib", models_stdlib, rows, args.repeat)
+    fast = run("fast path", fast_path, rows, args.repeat)
+    print(f"fast path is {baseline / fast:.1f}x faster per row than models + validate")
+
+
+if __name__ == "__main__":
+    main()
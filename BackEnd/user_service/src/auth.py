@@ -1,26 +1,89 @@
 from datetime import datetime, timedelta
 from typing import Annotated, Optional
-from passlib.context import CryptContext
+import hashlib
+import hmac
+import time
 from fastapi import Depends, HTTPException, status, Header
 from sqlalchemy.orm import Session
+from jose import JWTError, jwt
+from pydantic import ValidationError
 import httpx
 
 from . import schemas
 from . import models
 from .database import get_db
+from .config import settings
+from .cache import TTLCache
+from .hashing import hasher
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Tokens already validated by the auth-service, keyed by a hash of the token
+token_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_SIZE,
+    ttl=settings.TOKEN_CACHE_TTL_SECONDS,
+)
 
-# Password functions
+def check_auth_settings() -> None:
+    """
+    Refuse to start without a signing key in local mode, instead of
+    accepting tokens signed with a guessable default.
+    """
+    if settings.AUTH_VERIFY_MODE != "remote" and not settings.SECRET_KEY:
+        raise RuntimeError("SECRET_KEY must be set when AUTH_VERIFY_MODE is local")
+
+# Password functions - blocking, for use from sync (threadpool) handlers.
+# bcrypt itself runs on the shared hashing executor.
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return hasher.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return hasher.hash(password)
+
+# Function to validate token locally, without a round trip to the auth-service
+def verify_token_locally(token: str) -> schemas.CurrentUser:
+    """
+    Validates the token in-process using the same key and algorithm as the auth-service.
+
+    Args:
+        token: The JWT token string.
+
+    Returns:
+        The principal built from the token claims (including id and names
+        when the token is a fat token).
+
+    Raises:
+        HTTPException: If the signature is invalid, the token has expired or
+            the required claims are missing.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid authentication credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        # jwt.decode checks the signature and the "exp" claim
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        raise credentials_exception
+
+    email = payload.get("sub")
+    role = payload.get("role")
+    if email is None or role is None:
+        raise credentials_exception
+
+    try:
+        # Profile claims are only present in auth-service's "fat" tokens
+        return schemas.CurrentUser(
+            id=payload.get("uid"),
+            first_name=payload.get("given_name"),
+            last_name=payload.get("family_name"),
+            email=email,
+            role=role,
+        )
+    except ValidationError:
+        raise credentials_exception
 
 # Function to validate token by calling the auth-service
-async def validate_token_with_auth_service(token: str) -> Optional[schemas.UserAuthOut]:
+async def validate_token_with_auth_service(token: str) -> Optional[schemas.CurrentUser]:
     """
     Validates the token by making an internal request to the auth-service.
 
@@ -34,7 +97,7 @@ async def validate_token_with_auth_service(token: str) -> Optional[schemas.UserA
         HTTPException: If the token is invalid or the auth-service is unreachable.
     """
     # Use the service name 'auth-service' defined in docker-compose
-    auth_service_url = "http://auth-service:8000/api/auth/me" # Corrected port for inter-service communication
+    auth_service_url = f"{settings.AUTH_SERVICE_URL}/api/auth/me"
     async with httpx.AsyncClient() as client:
         try:
             # Send the token in the Authorization header as Bearer token
@@ -43,8 +106,8 @@ async def validate_token_with_auth_service(token: str) -> Optional[schemas.UserA
 
             # Assuming the auth-service /me endpoint returns the user data if the token is valid
             user_data = response.json()
-            # Validate and return the user data using the UserAuthOut schema
-            return schemas.UserAuthOut(**user_data)
+            # /me returns the public profile (no password hash)
+            return schemas.CurrentUser(**user_data)
         except httpx.HTTPStatusError as e:
             # Handle specific HTTP errors from auth-service (e.g., 401 Unauthorized)
             # If auth-service returns 401, re-raise as 401 in user-service
@@ -73,15 +136,51 @@ async def validate_token_with_auth_service(token: str) -> Optional[schemas.UserA
             )
 
 
+async def validate_token_cached(token: str) -> Optional[schemas.CurrentUser]:
+    """
+    Validates the token with the auth-service, reusing recent results.
+
+    Entries live until the earlier of the token's "exp" claim and
+    TOKEN_CACHE_TTL_SECONDS. Concurrent requests carrying the same token
+    share a single call to the auth-service.
+    """
+    ttl = settings.TOKEN_CACHE_TTL_SECONDS
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+    except JWTError:
+        exp = None
+    if isinstance(exp, (int, float)):
+        ttl = min(ttl, exp - time.time())
+    if ttl <= 0:
+        # Expired (or cache disabled): let the auth-service give the verdict
+        return await validate_token_with_auth_service(token)
+
+    key = hashlib.sha256(token.encode()).hexdigest()
+    return await token_cache.get_or_load(
+        key, lambda: validate_token_with_auth_service(token), ttl=ttl
+    )
+
+
+# Dependency for service-to-service and operations endpoints
+def require_internal_token(x_internal_token: Optional[str] = Header(None)) -> None:
+    """
+    Allow the request only if it carries INTERNAL_API_TOKEN in the
+    X-Internal-Token header. Nothing is allowed while the token is unset.
+    """
+    expected = settings.INTERNAL_API_TOKEN
+    if not expected or x_internal_token is None or not hmac.compare_digest(x_internal_token, expected):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Internal endpoint")
+
 # Dependency to get the current authenticated user
 # Manually extract token from Authorization header
 async def get_current_authenticated_user(
     authorization: str = Header(None)
-) -> schemas.UserAuthOut:
+) -> schemas.CurrentUser:
     """
     FastAPI dependency to get the current authenticated user.
 
-    Extracts the token from the Authorization header and validates it using the auth-service.
+    Extracts the token from the Authorization header and validates it, either
+    locally or by calling the auth-service depending on AUTH_VERIFY_MODE.
 
     Args:
         authorization: The Authorization header string (e.g., "Bearer <token>").
@@ -108,8 +207,11 @@ async def get_current_authenticated_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Validate the token by calling the auth-service
-    user = await validate_token_with_auth_service(token)
+    if settings.AUTH_VERIFY_MODE == "remote":
+        # Validate the token by calling the auth-service
+        user = await validate_token_cached(token)
+    else:
+        user = verify_token_locally(token)
 
     # validate_token_with_auth_service already raises HTTPException for invalid tokens, 
     # but we keep this check for clarity and potential future changes
@@ -0,0 +1,110 @@
+"""
+Streaming export of users and drivers as NDJSON or CSV.
+
+Rows are read with a server-side cursor, EXPORT_BATCH_SIZE at a time, and
+each batch is written to the response as soon as it arrives. Only plain
+column tuples are fetched (no ORM objects or Pydantic models), so memory
+use does not depend on how many rows are exported.
+"""
+import csv
+import enum
+import io
+import json
+from datetime import date, datetime
+from functools import partial
+from typing import Callable, Iterator, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from .config import settings
+from .models import User, Driver, UserRoleEnum
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+USER_COLUMNS = (User.id, User.first_name, User.last_name, User.email, User.role, User.address, User.created_at)
+DRIVER_COLUMNS = (
+    Driver.id.label("driver_id"),
+    Driver.license_number, Driver.license_expiry, Driver.hire_date, Driver.city_id, Driver.operator_name,
+)
+
+
+def users_query(
+    role: Optional[UserRoleEnum] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> Select:
+    query = select(*USER_COLUMNS)
+    if role is not None:
+        query = query.where(User.role == role)
+    return _created_between(query, created_from, created_to).order_by(User.id)
+
+
+def drivers_query(
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    city_id: Optional[int] = None,
+    operator_name: Optional[str] = None,
+) -> Select:
+    query = select(*USER_COLUMNS, *DRIVER_COLUMNS).join(Driver, Driver.user_id == User.id)
+    if city_id is not None:
+        query = query.where(Driver.city_id == city_id)
+    if operator_name is not None:
+        query = query.where(Driver.operator_name == operator_name)
+    return _created_between(query, created_from, created_to).order_by(User.id)
+
+
+def _created_between(query: Select, created_from: Optional[datetime], created_to: Optional[datetime]) -> Select:
+    # Half-open range: created_from <= created_at < created_to
+    if created_from is not None:
+        query = query.where(User.created_at >= created_from)
+    if created_to is not None:
+        query = query.where(User.created_at < created_to)
+    return query
+
+
+def stream_rows(query: Select, export_format: str, open_session: Callable[[], Session]) -> Iterator[str]:
+    """
+    Yield the export one batch at a time.
+
+    The session is opened here with `open_session` rather than taken from a
+    dependency: the generator runs while the response is being sent, after
+    request dependencies have been cleaned up. The connection is held until
+    the last batch is sent.
+    """
+    columns = [column.key for column in query.selected_columns]
+    write = partial(_ndjson_batch, columns) if export_format == "ndjson" else _csv_batch
+    if export_format == "csv":
+        # Send the header before the query runs so the first byte goes out at once
+        yield _csv_batch([columns])
+
+    db = open_session()
+    try:
+        result = db.execute(query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+        for batch in result.partitions():
+            yield write(batch)
+    finally:
+        db.close()
+
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _ndjson_batch(columns: Sequence[str], rows) -> str:
+    return "".join(
+        json.dumps(dict(zip(columns, map(_plain, row))), separators=(",", ":")) + "\n"
+        for row in rows
+    )
+
+
+def _csv_batch(rows) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_plain(value) for value in row] for row in rows)
+    return buffer.getvalue()
@@ -0,0 +1,210 @@
+"""
+Bulk user import from NDJSON or CSV.
+
+Rows are processed in chunks of IMPORT_CHUNK_SIZE. For each chunk:
+
+1. every row is validated against the role's Create schema,
+2. emails (lower-cased by the schema) are de-duplicated within the chunk
+   and against `users` with a single `WHERE lower(email) IN (...)` query,
+3. passwords are hashed in parallel on the hashing pool,
+4. users and role rows are written with two multi-row INSERT statements
+   and committed together.
+
+A chunk that fails while writing is rolled back and its rows are reported
+as "failed"; chunks committed before it stay in the summary.
+"""
+import csv
+import io
+import json
+import logging
+from typing import Dict, Iterator, List, Tuple
+
+from fastapi import HTTPException, Request
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .hashing import hasher
+from .models import User, UserRoleEnum, ROLE_TABLES
+from .schemas import (
+    AdminCreate, OperatorCreate, PassengerCreate, DriverCreate,
+    ImportRowResult, ImportSummary,
+)
+
+CREATE_SCHEMAS = {
+    UserRoleEnum.admin: AdminCreate,
+    UserRoleEnum.operator: OperatorCreate,
+    UserRoleEnum.passenger: PassengerCreate,
+    UserRoleEnum.driver: DriverCreate,
+}
+
+DRIVER_FIELDS = ("license_number", "license_expiry", "hire_date", "city_id", "operator_name")
+
+logger = logging.getLogger(__name__)
+
+
+async def read_body(request: Request, max_bytes: int) -> bytes:
+    """
+    Read the upload, refusing it with 413 once it is larger than `max_bytes`:
+    up front from Content-Length when the client sends one, otherwise as
+    soon as the streamed chunks go over the limit, so an oversized body is
+    never buffered whole.
+    """
+    too_large = HTTPException(status_code=413, detail="Import file is too large, split it into smaller files")
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > max_bytes:
+        raise too_large
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise too_large
+    return bytes(body)
+
+
+def parse_rows(body: bytes, content_type: str) -> Iterator[Tuple[int, object]]:
+    """
+    Yield (row number, raw row) pairs. CSV is used when the content type says
+    so, NDJSON otherwise. A row that cannot be decoded is yielded as the error.
+    """
+    text = body.decode("utf-8-sig")
+    if "csv" in (content_type or ""):
+        reader = csv.DictReader(io.StringIO(text))
+        for number, row in enumerate(reader, start=1):
+            # Empty CSV cells mean "not provided"
+            yield number, {key: value for key, value in row.items() if value not in ("", None)}
+        return
+
+    for number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError as e:
+            yield number, e
+
+
+def import_users(db: Session, rows: Iterator[Tuple[int, object]], role: UserRoleEnum) -> ImportSummary:
+    results: List[ImportRowResult] = []
+    chunk: List[Tuple[int, object]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= settings.IMPORT_CHUNK_SIZE:
+            results.extend(_import_chunk_or_fail(db, chunk, role))
+            chunk = []
+    if chunk:
+        results.extend(_import_chunk_or_fail(db, chunk, role))
+
+    counts: Dict[str, int] = {"created": 0, "duplicate": 0, "invalid": 0, "failed": 0}
+    for result in results:
+        counts[result.status] += 1
+    return ImportSummary(
+        created=counts["created"],
+        duplicates=counts["duplicate"],
+        invalid=counts["invalid"],
+        failed=counts["failed"],
+        results=results,
+    )
+
+
+def _import_chunk_or_fail(db: Session, chunk: List[Tuple[int, object]], role: UserRoleEnum) -> List[ImportRowResult]:
+    try:
+        return _import_chunk(db, chunk, role)
+    except Exception:
+        db.rollback()
+        logger.exception("Import chunk of %d rows failed", len(chunk))
+        return [
+            ImportRowResult(row=number, status="failed", error="Import failed while writing users, this row was not saved")
+            for number, _ in chunk
+        ]
+
+
+def _import_chunk(db: Session, chunk: List[Tuple[int, object]], role: UserRoleEnum) -> List[ImportRowResult]:
+    schema = CREATE_SCHEMAS[role]
+    results: Dict[int, ImportRowResult] = {}
+    valid = []
+    seen = set()
+
+    for number, raw in chunk:
+        if isinstance(raw, Exception):
+            results[number] = ImportRowResult(row=number, status="invalid", error=f"Malformed row: {raw}")
+            continue
+        try:
+            user = schema.model_validate(raw)
+        except ValidationError as e:
+            email = raw.get("email") if isinstance(raw, dict) else None
+            results[number] = ImportRowResult(row=number, email=email, status="invalid", error=_validation_error(e))
+            continue
+        if user.email in seen:
+            results[number] = ImportRowResult(row=number, email=user.email, status="duplicate", error="Duplicate email in import")
+            continue
+        seen.add(user.email)
+        valid.append((number, user))
+
+    if valid:
+        existing = set(db.scalars(select(func.lower(User.email)).where(func.lower(User.email).in_(list(seen)))))
+        new_rows = []
+        for number, user in valid:
+            if user.email in existing:
+                results[number] = ImportRowResult(row=number, email=user.email, status="duplicate", error="Email already exists")
+            else:
+                new_rows.append((number, user))
+        if new_rows:
+            results.update(_insert_rows(db, new_rows, role))
+
+    return [results[number] for number, _ in chunk]
+
+
+def _insert_rows(db: Session, rows, role: UserRoleEnum) -> Dict[int, ImportRowResult]:
+    hashes = hasher.hash_many([user.password for _, user in rows])
+    user_values = [
+        {
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+            "email": user.email,
+            "password_hash": password_hash,
+            "address": user.address,
+            "role": role,
+        }
+        for (_, user), password_hash in zip(rows, hashes)
+    ]
+
+    # Rows that lost a race with a concurrent registration are skipped by
+    # ON CONFLICT and simply missing from RETURNING
+    inserted = db.execute(
+        pg_insert(User)
+        .on_conflict_do_nothing(index_elements=[func.lower(User.email)])
+        .returning(User.id, User.email, sort_by_parameter_order=True),
+        user_values,
+    ).all()
+    ids = {email: user_id for user_id, email in inserted}
+
+    role_values = []
+    for _, user in rows:
+        if user.email not in ids:
+            continue
+        values = {"user_id": ids[user.email]}
+        if role == UserRoleEnum.driver:
+            values.update({field: getattr(user, field) for field in DRIVER_FIELDS})
+        role_values.append(values)
+    if role_values:
+        db.execute(insert(ROLE_TABLES[role]), role_values)
+    db.commit()
+
+    results = {}
+    for number, user in rows:
+        if user.email in ids:
+            results[number] = ImportRowResult(row=number, email=user.email, status="created", id=ids[user.email])
+        else:
+            results[number] = ImportRowResult(row=number, email=user.email, status="duplicate", error="Email already exists")
+    return results
+
+
+def _validation_error(e: ValidationError) -> str:
+    # Field locations and messages only: the input values include passwords
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+        for error in e.errors(include_input=False, include_url=False, include_context=False)
+    )
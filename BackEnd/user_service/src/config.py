@@ -7,4 +7,78 @@ class Settings:
     DB_NAME: str = os.getenv("DB_NAME", "microservices_db")
     DB_PORT: str = os.getenv("DB_PORT", "5432")
 
+    DATABASE_URL: str = os.getenv(
+        "DATABASE_URL",
+        f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}",
+    )
+    # Async data layer (asyncpg)
+    ASYNC_DATABASE_URL: str = os.getenv(
+        "ASYNC_DATABASE_URL",
+        f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}",
+    )
+
+    # Connection pool, applied to both the sync and the async engine
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # Behind PgBouncer in transaction mode: no app-side pool and no named
+    # prepared statements that could outlive a transaction's server connection
+    DB_PGBOUNCER: bool = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
+
+    # Optional streaming replica for read-only endpoints. Reads fall back to
+    # the primary while replay lag exceeds REPLICA_MAX_LAG_SECONDS or the
+    # replica is down, and for REPLICA_STICKY_SECONDS after a client's write.
+    REPLICA_DATABASE_URL: str = os.getenv("REPLICA_DATABASE_URL", "")
+    REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+    REPLICA_CHECK_INTERVAL_SECONDS: float = float(os.getenv("REPLICA_CHECK_INTERVAL_SECONDS", "1"))
+    REPLICA_STICKY_SECONDS: int = int(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+
+    # Token verification: "local" checks the JWT signature in-process with the
+    # key auth-service signs with, "remote" asks auth-service's /api/auth/me
+    AUTH_VERIFY_MODE: str = os.getenv("AUTH_VERIFY_MODE", "local")
+    AUTH_SERVICE_URL: str = os.getenv("AUTH_SERVICE_URL", "http://auth-service:8000")
+    # Required in local mode; there is deliberately no default
+    SECRET_KEY: str = os.getenv("SECRET_KEY", "")
+    ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
+
+    # Shared secret other services send in X-Internal-Token to reach the
+    # /api/internal/* endpoints; they are refused while it is unset
+    INTERNAL_API_TOKEN: str = os.getenv("INTERNAL_API_TOKEN", "")
+
+    # Cache of tokens validated by auth-service (remote mode only)
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+    TOKEN_CACHE_TTL_SECONDS: float = float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "60"))
+
+    # Read-through cache for /api/users/by-email, keyed on the lower-cased
+    # email. Writes in this process invalidate it; other workers catch up
+    # within the TTL.
+    EMAIL_CACHE_SIZE: int = int(os.getenv("EMAIL_CACHE_SIZE", "10000"))
+    EMAIL_CACHE_TTL_SECONDS: float = float(os.getenv("EMAIL_CACHE_TTL_SECONDS", "30"))
+
+    # Keyset pagination for the role list endpoints
+    DEFAULT_PAGE_SIZE: int = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+    MAX_PAGE_SIZE: int = int(os.getenv("MAX_PAGE_SIZE", "500"))
+
+    # Encode list responses straight from row dicts with prebuilt TypeAdapters
+    # instead of per-row models re-validated by FastAPI (see responses.py)
+    FAST_JSON_RESPONSES: bool = os.getenv("FAST_JSON_RESPONSES", "false").lower() == "true"
+
+    # Bulk import: rows per transaction and maximum request body size
+    IMPORT_CHUNK_SIZE: int = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+    IMPORT_MAX_BYTES: int = int(os.getenv("IMPORT_MAX_BYTES", str(20 * 1024 * 1024)))
+
+    # Streaming export: rows fetched per server-side cursor round trip
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+    # Where user updated/deleted notifications go: "http" or "none"
+    USER_EVENTS_BACKEND: str = os.getenv("USER_EVENTS_BACKEND", "http")
+    USER_EVENTS_TIMEOUT_SECONDS: float = float(os.getenv("USER_EVENTS_TIMEOUT_SECONDS", "2"))
+
+    # Password hashing executor ("process" or "thread")
+    HASH_EXECUTOR: str = os.getenv("HASH_EXECUTOR", "process")
+    HASH_WORKERS: int = int(os.getenv("HASH_WORKERS", "2"))
+    HASH_MAX_QUEUE: int = int(os.getenv("HASH_MAX_QUEUE", "64"))
+
 settings = Settings()
\ No newline at end of file
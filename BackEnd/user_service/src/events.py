@@ -0,0 +1,77 @@
+"""
+Notifications about user changes for other services.
+
+The auth-service caches credential lookups and trusts profiles embedded in
+tokens; it needs to hear when a user is updated or deleted. The
+publisher is chosen by USER_EVENTS_BACKEND:
+
+- "http": POST the event to the auth-service (default), authenticated with
+  INTERNAL_API_TOKEN
+- "none": drop events
+"""
+import logging
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Optional
+
+import httpx
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+USER_UPDATED = "user.updated"
+USER_DELETED = "user.deleted"
+
+
+class UserEventPublisher(ABC):
+    @abstractmethod
+    async def publish(self, event: str, emails: List[str], profile_version: Optional[int] = None) -> None:
+        ...
+
+
+class HttpUserEventPublisher(UserEventPublisher):
+    def __init__(self, url: str, timeout: float, token: str):
+        self.url = url
+        self.timeout = timeout
+        self.token = token
+
+    async def publish(self, event: str, emails: List[str], profile_version: Optional[int] = None) -> None:
+        # Best effort: the auth-service cache TTL bounds staleness if this fails
+        try:
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                response = await client.post(
+                    self.url,
+                    json={"event": event, "emails": emails, "profile_version": profile_version},
+                    headers={"X-Internal-Token": self.token},
+                )
+                response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.warning("Could not publish %s for %s: %s", event, emails, e)
+
+
+class NullUserEventPublisher(UserEventPublisher):
+    async def publish(self, event: str, emails: List[str], profile_version: Optional[int] = None) -> None:
+        return None
+
+
+def _create_publisher() -> UserEventPublisher:
+    if settings.USER_EVENTS_BACKEND == "none":
+        return NullUserEventPublisher()
+    return HttpUserEventPublisher(
+        f"{settings.AUTH_SERVICE_URL}/api/auth/internal/user-events",
+        timeout=settings.USER_EVENTS_TIMEOUT_SECONDS,
+        token=settings.INTERNAL_API_TOKEN,
+    )
+
+
+publisher = _create_publisher()
+
+
+async def publish_user_event(event: str, emails: Iterable[str], profile_version: Optional[int] = None) -> None:
+    """
+    Publish `event` for the given emails (duplicates and blanks dropped),
+    with the user's profile_version after an update.
+    """
+    unique = sorted({email for email in emails if email})
+    if unique:
+        await publisher.publish(event, unique, profile_version)
@@ -0,0 +1,30 @@
+"""
+Sparse fieldsets: `?fields=id,first_name,last_name` on read endpoints.
+
+Only the requested columns are selected, and the response carries only the
+requested keys. The endpoints' response models stay the documented shape
+for requests without `fields`.
+
+The user and trip services each keep an identical copy of this module,
+since each image is built from its own directory; change both together.
+"""
+from typing import List, Optional, Sequence
+
+from fastapi import HTTPException
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated `fields` parameter. Returns None when it was not
+    given, otherwise the requested names in order without duplicates.
+    """
+    if fields is None:
+        return None
+    requested = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in requested if name not in allowed]
+    if not requested or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid fields: {', '.join(unknown) or repr(fields)}. Allowed: {', '.join(allowed)}",
+        )
+    return requested
@@ -2,7 +2,9 @@
 FastAPI main entrypoint for User API.
 Handles app creation, CORS, and router inclusion.
 """
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer
 import uvicorn
@@ -10,15 +12,32 @@ import uvicorn
 from . import models
 from . import database
 from .routes import router
+from .replica import SAFE_METHODS
+from .hashing import hasher
+from .auth import check_auth_settings
 
 # Create the database tables
 models.Base.metadata.create_all(bind=database.engine)
 
-app = FastAPI(title="User Services")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    check_auth_settings()
+    yield
+    hasher.shutdown()
+
+app = FastAPI(title="User Services", lifespan=lifespan)
 
 # Configure OAuth2
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# Read-your-writes: after a successful write, this client's reads skip the replica for a while
+@app.middleware("http")
+async def stick_reads_to_primary_after_write(request: Request, call_next):
+    response = await call_next(request)
+    if request.method not in SAFE_METHODS and response.status_code < 400:
+        database.replica.mark_write(response)
+    return response
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -26,6 +45,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include the router
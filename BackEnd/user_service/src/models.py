@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Text, ForeignKey, Enum, TIMESTAMP
+from sqlalchemy import Column, Integer, String, Date, Text, ForeignKey, Enum, TIMESTAMP, Index, func
 from sqlalchemy.orm import relationship
 from .database import Base
 import enum
@@ -11,6 +11,12 @@ class UserRoleEnum(str, enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Serves the email_prefix filter (LIKE 'prefix%') whatever the collation
+        Index("idx_users_email_pattern", "email", postgresql_ops={"email": "varchar_pattern_ops"}),
+        # created_from / created_to filters on the export endpoints
+        Index("idx_users_created_at", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     first_name = Column(String(100))
@@ -20,24 +26,51 @@ class User(Base):
     address = Column(String(255))
     created_at = Column(TIMESTAMP, server_default="CURRENT_TIMESTAMP")
     role = Column(Enum(UserRoleEnum))
+    # Bumped on every profile update; auth-service compares it with the one
+    # embedded in fat tokens to spot stale profiles
+    profile_version = Column(Integer, nullable=False, server_default="1")
+
+    # Role rows are deleted with the user (ON DELETE CASCADE in the schema)
+    admin = relationship("Admin", back_populates="user", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
+    operator = relationship("Operator", back_populates="user", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
+    passenger = relationship("Passenger", back_populates="user", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
+    driver = relationship("Driver", back_populates="user", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
+
+# Emails are unique regardless of case: registration and import conflict on
+# this index, and the auth-service lookup uses it. INCLUDE carries every column
+# /api/users/by-email returns, so the lookup is an index-only scan.
+Index(
+    "idx_users_email_lower",
+    func.lower(User.email),
+    unique=True,
+    postgresql_include=["id", "first_name", "last_name", "email", "role", "password_hash", "profile_version"],
+)
 
 class Admin(Base):
     __tablename__ = "admin"
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), unique=True)
+    user = relationship("User", back_populates="admin")
 
 class Operator(Base):
     __tablename__ = "operator"
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), unique=True)
+    user = relationship("User", back_populates="operator")
 
 class Passenger(Base):
     __tablename__ = "passenger"
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), unique=True)
+    user = relationship("User", back_populates="passenger")
 
 class Driver(Base):
     __tablename__ = "drivers"
+    __table_args__ = (
+        # Filtered driver lists are paged by id within a city / operator
+        Index("idx_drivers_city_id", "city_id", "id"),
+        Index("idx_drivers_operator_name", "operator_name", "id"),
+    )
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), unique=True)
     license_number = Column(String(50), nullable=False)
@@ -45,3 +78,12 @@ class Driver(Base):
     hire_date = Column(Date)
     city_id = Column(Integer)
     operator_name = Column(String(100), nullable=False)
+    user = relationship("User", back_populates="driver")
+
+# Role-specific table for each user role
+ROLE_TABLES = {
+    UserRoleEnum.admin: Admin,
+    UserRoleEnum.operator: Operator,
+    UserRoleEnum.passenger: Passenger,
+    UserRoleEnum.driver: Driver,
+}
@@ -0,0 +1,55 @@
+"""
+Opaque keyset-pagination cursors.
+
+A cursor encodes the last primary key of the previous page; the next page
+is `WHERE id > :last_id ORDER BY id LIMIT :n`, which stays an index range
+scan however deep the client pages.
+"""
+import base64
+import json
+from typing import Optional
+
+from fastapi import HTTPException, Response
+
+from .config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(last_id: int) -> str:
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded))["id"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(last_id, int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return last_id
+
+
+def page_size(limit: Optional[int]) -> int:
+    return min(limit or settings.DEFAULT_PAGE_SIZE, settings.MAX_PAGE_SIZE)
+
+
+def paginate(query, key_column, response: Response, limit: Optional[int], cursor: Optional[str]) -> list:
+    """
+    Apply keyset pagination on `key_column` and return one page of rows.
+
+    When more rows follow, the cursor for the next page is sent in the
+    X-Next-Cursor response header so the body keeps its list shape.
+    Pages are never larger than MAX_PAGE_SIZE, and DEFAULT_PAGE_SIZE
+    applies when no `limit` is given.
+    """
+    size = page_size(limit)
+    if cursor:
+        query = query.filter(key_column > decode_cursor(cursor))
+    rows = query.order_by(key_column).limit(size + 1).all()
+    if len(rows) > size:
+        rows = rows[:size]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].id)
+    return rows
@@ -0,0 +1,127 @@
+"""
+Routing of read-only requests to an optional streaming replica.
+
+With REPLICA_DATABASE_URL set, GET endpoints that depend on get_read_db get
+a replica session unless:
+
+- the client wrote recently: after a successful write the response sets a
+  short-lived cookie (REPLICA_STICKY_SECONDS) and that client's reads go to
+  the primary until it expires, so it always sees its own writes;
+- the replica is lagging: replay lag is checked at most every
+  REPLICA_CHECK_INTERVAL_SECONDS and reads fall back to the primary while
+  it exceeds REPLICA_MAX_LAG_SECONDS;
+- the replica is unreachable: a failed check or connection checkout sends
+  reads to the primary until the next check.
+
+The state lives in the process, so every worker checks the replica itself.
+
+The user and trip services each keep an identical copy of this module,
+since each image is built from its own directory; change both together.
+"""
+import logging
+import threading
+import time
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+STICKY_COOKIE = "read_primary"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Replay lag in seconds; 0 when the replica has replayed everything it received,
+# so an idle primary does not look like lag
+LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+class ReplicaRouter:
+    def __init__(self, engine, max_lag: float, check_interval: float, sticky_seconds: int):
+        self.engine = engine
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.sticky_seconds = sticky_seconds
+        self._lock = threading.Lock()
+        self._checked_at = float("-inf")
+        self._healthy = engine is not None
+        self.lag_seconds: Optional[float] = None
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.sticky_reads = 0
+        self.lagging_checks = 0
+        self.failures = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.engine is not None
+
+    def use_replica(self, request: Request) -> bool:
+        if not self.enabled:
+            return False
+        if request.cookies.get(STICKY_COOKIE):
+            with self._lock:
+                self.sticky_reads += 1
+                self.primary_reads += 1
+            return False
+        healthy = self._check()
+        with self._lock:
+            if healthy:
+                self.replica_reads += 1
+            else:
+                self.primary_reads += 1
+        return healthy
+
+    def mark_failed(self) -> None:
+        """The replica could not be used; read from the primary until the next check."""
+        with self._lock:
+            self.failures += 1
+            self._healthy = False
+            self._checked_at = time.monotonic()
+
+    def mark_write(self, response: Response) -> None:
+        if self.enabled:
+            response.set_cookie(STICKY_COOKIE, "1", max_age=self.sticky_seconds, httponly=True, samesite="lax")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "healthy": self._healthy if self.enabled else False,
+                "lag_seconds": self.lag_seconds,
+                "max_lag_seconds": self.max_lag,
+                "replica_reads": self.replica_reads,
+                "primary_reads": self.primary_reads,
+                "sticky_reads": self.sticky_reads,
+                "lagging_checks": self.lagging_checks,
+                "failures": self.failures,
+            }
+
+    def _check(self) -> bool:
+        # One thread re-checks when the interval is up; the others use the
+        # last result instead of queueing behind it
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return self._healthy
+            self._checked_at = now
+        try:
+            with self.engine.connect() as conn:
+                lag = float(conn.execute(LAG_QUERY).scalar() or 0)
+        except Exception:
+            logger.warning("Replica lag check failed, reading from the primary", exc_info=True)
+            self.mark_failed()
+            return False
+        with self._lock:
+            self.lag_seconds = lag
+            self._healthy = lag <= self.max_lag
+            if not self._healthy:
+                self.lagging_checks += 1
+            return self._healthy
@@ -0,0 +1,72 @@
+"""
+Opt-in fast path for JSON list responses (FAST_JSON_RESPONSES).
+
+The default path builds one Pydantic model per row, which FastAPI then
+validates again against `response_model` before encoding. The fast path maps
+rows straight to dicts and encodes them with a TypeAdapter built once at
+import: pydantic-core writes the JSON bytes directly, with no per-row model
+and no second validation. Dates are encoded natively.
+
+The TypedDicts mirror the Out schemas in schemas.py, which remain the
+documented response models.
+"""
+from datetime import date
+from typing import Any, List, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from typing_extensions import TypedDict
+
+
+class ProfileRow(TypedDict):
+    id: int
+    first_name: Optional[str]
+    last_name: Optional[str]
+    email: str
+    address: Optional[str]
+
+
+class DriverRow(ProfileRow):
+    license_number: str
+    license_expiry: Optional[date]
+    hire_date: Optional[date]
+    city_id: Optional[int]
+    operator_name: str
+
+
+# ?fields= responses: any subset of the driver/profile keys
+class SparseRow(TypedDict, total=False):
+    id: int
+    first_name: Optional[str]
+    last_name: Optional[str]
+    email: str
+    address: Optional[str]
+    license_number: str
+    license_expiry: Optional[date]
+    hire_date: Optional[date]
+    city_id: Optional[int]
+    operator_name: str
+
+
+PROFILE_LIST = TypeAdapter(List[ProfileRow])
+DRIVER_LIST = TypeAdapter(List[DriverRow])
+SPARSE_ROW = TypeAdapter(SparseRow)
+SPARSE_LIST = TypeAdapter(List[SparseRow])
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+
+def fast_json(adapter: TypeAdapter, rows: Any, response: Optional[Response] = None) -> FastJSONResponse:
+    """
+    Encode `rows` with `adapter`. Headers already set on the endpoint's
+    `response` parameter (e.g. X-Next-Cursor) are carried over, since FastAPI
+    ignores that object once a Response is returned.
+    """
+    out = FastJSONResponse(adapter.dump_json(rows))
+    if response is not None:
+        for name, value in response.headers.items():
+            if name not in ("content-length", "content-type"):
+                out.headers.append(name, value)
+    return out
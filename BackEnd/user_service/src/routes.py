@@ -1,20 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, contains_eager
+from datetime import datetime
+from typing import List, Literal, Optional
 
-from .database import get_db
-from .models import User, Admin, Operator, Passenger, Driver, UserRoleEnum
+from .database import get_db, get_read_db, read_session, AsyncSessionLocal, pool_stats
+from .models import User, Admin, Operator, Passenger, Driver, UserRoleEnum, ROLE_TABLES
 from .schemas import (
     UserOut,
     AdminCreate, OperatorCreate, PassengerCreate, DriverCreate,
     AdminOut, OperatorOut, PassengerOut, DriverOut,
     AdminUpdate, OperatorUpdate, PassengerUpdate, DriverUpdate,
-    UserAuthOut
+    UserAuthOut, CurrentUser, ImportSummary
 )
-from .auth import verify_password, get_password_hash, get_current_authenticated_user
+from .auth import verify_password, get_password_hash, get_current_authenticated_user, require_internal_token, token_cache
+from .hashing import hasher
+from .events import publish_user_event, USER_UPDATED, USER_DELETED
+from .pagination import paginate
+from .bulk_import import parse_rows, import_users, read_body
+from .bulk_export import MEDIA_TYPES, users_query, drivers_query, stream_rows
+from .cache import TTLCache
+from .responses import PROFILE_LIST, DRIVER_LIST, SPARSE_ROW, SPARSE_LIST, fast_json
+from .fieldsets import parse_fields
+from .config import settings
 
 router = APIRouter()
 
+# Read-through cache for /api/users/by-email, keyed on the lower-cased email
+email_cache = TTLCache(settings.EMAIL_CACHE_SIZE, settings.EMAIL_CACHE_TTL_SECONDS)
+
+def _forget_emails(*emails: Optional[str]):
+    for email in emails:
+        if email:
+            email_cache.invalidate(email.lower())
+
+def _user_changed(background_tasks: BackgroundTasks, event: str, emails: List[str], profile_version: Optional[int] = None):
+    # Called after the commit, so a lookup racing the write cannot re-cache the old row
+    _forget_emails(*emails)
+    background_tasks.add_task(publish_user_event, event, emails, profile_version)
+
 @router.post("/api/users/register/admin", response_model=UserOut)
 def register_admin(user: AdminCreate, db: Session = Depends(get_db)):
     return register_user(user, db, UserRoleEnum.admin)
@@ -29,337 +56,471 @@ def register_passenger(user: PassengerCreate, db: Session = Depends(get_db)):
 
 @router.post("/api/users/register/driver", response_model=UserOut)
 def register_driver(user: DriverCreate, db: Session = Depends(get_db)):
-    if db.query(User).filter(User.email == user.email).first():
+    driver_fields = {
+        "license_number": user.license_number,
+        "license_expiry": user.license_expiry,
+        "hire_date": user.hire_date,
+        "city_id": user.city_id,
+        "operator_name": user.operator_name,
+    }
+    user_id = insert_user_with_role(db, user, UserRoleEnum.driver, get_password_hash(user.password), driver_fields)
+    if user_id is None:
         raise HTTPException(status_code=400, detail="Email already registered")
+    return _registered_user_out(user_id, user, UserRoleEnum.driver)
+
+def register_user(user_data, db: Session, role: UserRoleEnum):
+    user_id = insert_user_with_role(db, user_data, role, get_password_hash(user_data.password))
+    if user_id is None:
+        raise HTTPException(status_code=400, detail="Email already exists")
+    return _registered_user_out(user_id, user_data, role)
+
+def insert_user_with_role(db: Session, user_data, role: UserRoleEnum, password_hash: str, role_fields: Optional[dict] = None) -> Optional[int]:
+    """
+    Insert the user and its role row in one statement and one transaction:
+
+        WITH new_user AS (INSERT INTO users ... ON CONFLICT (lower(email)) DO NOTHING RETURNING id)
+        INSERT INTO <role table> (user_id, ...) SELECT id, ... FROM new_user RETURNING user_id
 
-    db_user = User(
-        first_name=user.first_name,
-        last_name=user.last_name,
-        email=user.email,
-        password_hash=get_password_hash(user.password),
-        address=user.address,
-        role=UserRoleEnum.driver
+    The unique index on lower(email) decides conflicts, so concurrent sign-ups
+    with the same email, in any case, cannot both succeed. Returns the new user id, or None
+    if the email is already taken.
+    """
+    role_fields = role_fields or {}
+    new_user = (
+        pg_insert(User)
+        .values(
+            first_name=user_data.first_name,
+            last_name=user_data.last_name,
+            email=user_data.email,
+            password_hash=password_hash,
+            address=user_data.address,
+            role=role,
+        )
+        .on_conflict_do_nothing(index_elements=[func.lower(User.email)])
+        .returning(User.id)
+        .cte("new_user")
     )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-
-    driver = Driver(
-        user_id=db_user.id,
-        license_number=user.license_number,
-        license_expiry=user.license_expiry,
-        hire_date=user.hire_date,
-        city_id=user.city_id,
-        operator_name=user.operator_name
+    role_table = ROLE_TABLES[role]
+    columns = role_table.__table__.c
+    stmt = (
+        insert(role_table)
+        .from_select(
+            ["user_id", *role_fields],
+            select(new_user.c.id, *(literal(value, columns[key].type) for key, value in role_fields.items())),
+        )
+        .returning(role_table.user_id)
     )
-    db.add(driver)
+    user_id = db.execute(stmt).scalar_one_or_none()
     db.commit()
+    if user_id is not None:
+        # The email may still be cached for a user deleted through another worker
+        _forget_emails(user_data.email)
+    return user_id
 
-    return db_user
-
-def register_user(user_data, db: Session, role: UserRoleEnum):
-    if db.query(User).filter(User.email == user_data.email).first():
-        raise HTTPException(status_code=400, detail="Email already exists")
-
-    db_user = User(
+def _registered_user_out(user_id: int, user_data, role: UserRoleEnum) -> UserOut:
+    return UserOut(
+        id=user_id,
         first_name=user_data.first_name,
         last_name=user_data.last_name,
         email=user_data.email,
-        password_hash=get_password_hash(user_data.password),
-        address=user_data.address,
         role=role
     )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
 
-    table_map = {
-        UserRoleEnum.admin: Admin,
-        UserRoleEnum.operator: Operator,
-        UserRoleEnum.passenger: Passenger,
+@router.post("/api/users/import", response_model=ImportSummary)
+async def import_users_bulk(
+    request: Request,
+    role: UserRoleEnum = UserRoleEnum.passenger,
+    db: Session = Depends(get_db),
+    user: CurrentUser = Depends(get_current_authenticated_user),
+):
+    """
+    Register many users of one role from an NDJSON body, or CSV with a
+    text/csv content type. Returns a result for every input row.
+    """
+    body = await read_body(request, settings.IMPORT_MAX_BYTES)
+    rows = parse_rows(body, request.headers.get("content-type", ""))
+    # Validation, hashing and inserts block, keep them off the event loop
+    summary = await run_in_threadpool(import_users, db, rows, role)
+    _forget_emails(*(result.email for result in summary.results if result.status == "created"))
+    return summary
+
+# --- Streaming export ---
+# Declared before /api/drivers/{driver_id} so "export" is not taken for an id.
+
+ExportFormat = Literal["ndjson", "csv"]
+
+def _export_response(request: Request, query, export_format: str, name: str) -> StreamingResponse:
+    # Exports are long reads, served by the replica when it can be used
+    return StreamingResponse(
+        stream_rows(query, export_format, lambda: read_session(request)),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{export_format}"'},
+    )
+
+@router.get("/api/users/export")
+def export_users(
+    request: Request,
+    export_format: ExportFormat = Query("ndjson", alias="format"),
+    role: Optional[UserRoleEnum] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    user: CurrentUser = Depends(get_current_authenticated_user),
+):
+    """Stream every user matching the filters. Password hashes are never exported."""
+    return _export_response(request, users_query(role, created_from, created_to), export_format, "users")
+
+@router.get("/api/drivers/export")
+def export_drivers(
+    request: Request,
+    export_format: ExportFormat = Query("ndjson", alias="format"),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    city_id: Optional[int] = None,
+    operator_name: Optional[str] = None,
+    user: CurrentUser = Depends(get_current_authenticated_user),
+):
+    """Stream drivers with their user columns, filtered like /api/drivers."""
+    query = drivers_query(created_from, created_to, city_id, operator_name)
+    return _export_response(request, query, export_format, "drivers")
+
+# --- Role lookups ---
+# Role rows are always loaded together with their user in one joined SELECT.
+
+def _with_user(db: Session, model):
+    # Inner join: role rows whose user is gone are skipped, as before
+    return db.query(model).join(model.user).options(contains_eager(model.user))
+
+def _filter_users(query, email_prefix: Optional[str]):
+    if email_prefix:
+        # LIKE 'prefix%' served by the varchar_pattern_ops index on users.email
+        query = query.filter(User.email.startswith(email_prefix.lower(), autoescape=True))
+    return query
+
+# ?fields= on the role list/get endpoints
+PROFILE_OUT_FIELDS = ("id", "first_name", "last_name", "email", "address")
+DRIVER_OUT_FIELDS = PROFILE_OUT_FIELDS + ("license_number", "license_expiry", "hire_date", "city_id", "operator_name")
+USER_OUT_FIELDS = {"first_name", "last_name", "email", "address"}
+
+def _select_fields(db: Session, model, fields: List[str], email_prefix: Optional[str] = None):
+    """
+    Select only `fields`, plus the role row id that pagination keys on.
+    users is joined only when a user column or the email filter needs it.
+    """
+    columns = [model.id]
+    columns += [getattr(User if name in USER_OUT_FIELDS else model, name) for name in fields if name != "id"]
+    query = db.query(*columns).select_from(model)
+    if email_prefix or USER_OUT_FIELDS.intersection(fields):
+        query = query.join(model.user)
+    else:
+        # Same rows as the join: user_id is a foreign key, so only NULLs lack a user
+        query = query.filter(model.user_id.isnot(None))
+    return _filter_users(query, email_prefix)
+
+def _sparse_row(row, fields: List[str]) -> dict:
+    return {name: getattr(row, name) for name in fields}
+
+def _sparse_page(query, model, fields: List[str], response: Response, limit: Optional[int], cursor: Optional[str]):
+    rows = paginate(query, model.id, response, limit, cursor)
+    return fast_json(SPARSE_LIST, [_sparse_row(row, fields) for row in rows], response)
+
+def _get_fields_or_404(db: Session, model, row_id: int, fields: List[str], not_found: str):
+    row = _select_fields(db, model, fields).filter(model.id == row_id).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    return fast_json(SPARSE_ROW, _sparse_row(row, fields))
+
+def _get_with_user_or_404(db: Session, model, row_id: int, not_found: str, require_user: bool = True):
+    row = (
+        db.query(model)
+        .outerjoin(model.user)
+        .options(contains_eager(model.user))
+        .filter(model.id == row_id)
+        .first()
+    )
+    if not row:
+        raise HTTPException(status_code=404, detail=not_found)
+    if require_user and row.user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return row
+
+def _profile_out(schema, row):
+    return schema(
+        id=row.id,
+        first_name=row.user.first_name,
+        last_name=row.user.last_name,
+        email=row.user.email,
+        address=row.user.address
+    )
+
+def _profile_row(row) -> dict:
+    return {
+        "id": row.id,
+        "first_name": row.user.first_name,
+        "last_name": row.user.last_name,
+        "email": row.user.email,
+        "address": row.user.address,
     }
-    db.add(table_map[role](user_id=db_user.id))
+
+def _driver_row(driver: Driver) -> dict:
+    row = _profile_row(driver)
+    row.update(
+        license_number=driver.license_number,
+        license_expiry=driver.license_expiry,
+        hire_date=driver.hire_date,
+        city_id=driver.city_id,
+        operator_name=driver.operator_name,
+    )
+    return row
+
+def _profiles_out(schema, rows, response: Response):
+    if settings.FAST_JSON_RESPONSES:
+        return fast_json(PROFILE_LIST, [_profile_row(row) for row in rows], response)
+    return [_profile_out(schema, row) for row in rows]
+
+def _drivers_out(drivers, response: Response):
+    if settings.FAST_JSON_RESPONSES:
+        return fast_json(DRIVER_LIST, [_driver_row(driver) for driver in drivers], response)
+    return [_driver_out(driver) for driver in drivers]
+
+def _driver_out(driver: Driver) -> DriverOut:
+    return DriverOut(
+        id=driver.id,
+        first_name=driver.user.first_name,
+        last_name=driver.user.last_name,
+        email=driver.user.email,
+        address=driver.user.address,
+        license_number=driver.license_number,
+        license_expiry=driver.license_expiry,
+        hire_date=driver.hire_date,
+        city_id=driver.city_id,
+        operator_name=driver.operator_name
+    )
+
+def _apply_update(row, update):
+    # Role-specific columns go to the role row, everything else to the user.
+    # The increment is done in SQL so concurrent updates each count.
+    row.user.profile_version = User.profile_version + 1
+    for key, value in update.dict(exclude_unset=True).items():
+        if key == "password":
+            if value is not None:
+                row.user.password_hash = get_password_hash(value)
+        elif hasattr(type(row), key):
+            setattr(row, key, value)
+        else:
+            setattr(row.user, key, value)
+
+def _delete_with_user(db: Session, row, background_tasks: BackgroundTasks):
+    email = None
+    if row.user is not None:
+        email = row.user.email
+        db.delete(row.user)
+    db.delete(row)
     db.commit()
-    return db_user
+    if email is not None:
+        _user_changed(background_tasks, USER_DELETED, [email])
 
 @router.get("/api/admins", response_model=List[AdminOut])
-def list_admins(db: Session = Depends(get_db), user: UserAuthOut = Depends(get_current_authenticated_user)):
-    admins = db.query(Admin).all()
-    result = []
-    for admin in admins:
-        user = db.query(User).filter(User.id == admin.user_id).first()
-        if user:
-            result.append(AdminOut(
-                id=admin.id,
-                first_name=user.first_name,
-                last_name=user.last_name,
-                email=user.email,
-                address=user.address
-            ))
-    return result
+def list_admins(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    email_prefix: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    user: CurrentUser = Depends(get_current_authenticated_user),
+):
+    selected = parse_fields(fields, PROFILE_OUT_FIELDS)
+    if selected:
+        return _sparse_page(_select_fields(db, Admin, selected, email_prefix), Admin, selected, response, limit, cursor)
+    query = _filter_users(_with_user(db, Admin), email_prefix)
+    return _profiles_out(AdminOut, paginate(query, Admin.id, response, limit, cursor), response)
 
 @router.get("/api/admins/{admin_id}", response_model=AdminOut)
-def get_admin(admin_id: int, db: Session = Depends(get_db), user: UserAuthOut = Depends(get_current_authenticated_user)):
-    admin = db.query(Admin).filter(Admin.id == admin_id).first()
-    if not admin:
-        raise HTTPException(status_code=404, detail="Admin not found")
-    user = db.query(User).filter(User.id == admin.user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    return AdminOut(
-        id=admin.id,
-        first_name=user.first_name,
-        last_name=user.last_name,
-        email=user.email,
-        address=user.address
-    )
+def get_admin(admin_id: int, fields: Optional[str] = None, db: Session = Depends(get_read_db), user: CurrentUser = Depends(get_current_authenticated_user)):
+    selected = parse_fields(fields, PROFILE_OUT_FIELDS)
+    if selected:
+        return _get_fields_or_404(db, Admin, admin_id, selected, "Admin not found")
+    admin = _get_with_user_or_404(db, Admin, admin_id, "Admin not found")
+    return _profile_out(AdminOut, admin)
 
 @router.patch("/api/admins/{admin_id}", response_model=AdminOut)
-def patch_admin(admin_id: int, admin_update: AdminUpdate, db: Session = Depends(get_db), user: UserAuthOut = Depends(get_current_authenticated_user)):
-    admin = db.query(Admin).filter(Admin.id == admin_id).first()
-    if not admin:
-        raise HTTPException(status_code=404, detail="Admin not found")
-    user = db.query(User).filter(User.id == admin.user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    for key, value in admin_update.dict(exclude_unset=True).items():
-        setattr(user, key, value)
+def patch_admin(admin_id: int, admin_update: AdminUpdate, background_tasks: BackgroundTasks, db: Session = Depends(get_db), user: CurrentUser = Depends(get_current_authenticated_user)):
+    admin = _get_with_user_or_404(db, Admin, admin_id, "Admin not found")
+    old_email = admin.user.email
+    _apply_update(admin, admin_update)
     db.commit()
-    db.refresh(user)
-    return AdminOut(
-        id=admin.id,
-        first_name=user.first_name,
-        last_name=user.last_name,
-        email=user.email,
-        address=user.address
-    )
+    _user_changed(background_tasks, USER_UPDATED, [old_email, admin.user.email], admin.user.profile_version)
+    return _profile_out(AdminOut, admin)
 
 @router.delete("/api/admins/{admin_id}", status_code=204)
-def delete_admin(admin_id: int, db: Session = Depends(get_db), user: UserAuthOut = Depends(get_current_authenticated_user)):
-    admin = db.query(Admin).filter(Admin.id == admin_id).first()
-    if not admin:
-        raise HTTPException(status_code=404, detail="Admin not found")
-    user = db.query(User).filter(User.id == admin.user_id).first()
-    if user:
-        db.delete(user)
-    db.delete(admin)
-    db.commit()
+def delete_admin(admin_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db), user: CurrentUser = Depends(get_current_authenticated_user)):
+    admin = _get_with_user_or_404(db, Admin, admin_id, "Admin not found", require_user=False)
+    _delete_with_user(db, admin, background_tasks)
     return
 
 @router.get("/api/operators", response_model=List[OperatorOut])
-def list_operators(db: Session = Depends(get_db), user: UserAuthOut = Depends(get_current_authenticated_user)):
-    operators = db.query(Operator).all()
-    result = []
-    for operator in operators:
-        user = db.query(User).filter(User.id == operator.user_id).first()
-        if user:
-            result.append(OperatorOut(
-                id=operator.id,
-                first_name=user.first_name,
-                last_name=user.last_name,
-                email=user.email,
-                address=user.address
-            ))
-    return result
+def list_operators(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    email_prefix: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    user: CurrentUser = Depends(get_current_authenticated_user),
+):
+    selected = parse_fields(fields, PROFILE_OUT_FIELDS)
+    if selected:
+        return _sparse_page(_select_fields(db, Operator, selected, email_prefix), Operator, selected, response, limit, cursor)
+    query = _filter_users(_with_user(db, Operator), email_prefix)
+    return _profiles_out(OperatorOut, paginate(query, Operator.id, response, limit, cursor), response)
 
 @router.get("/api/operators/{operator_id}", response_model=OperatorOut)
-def get_operator(operator_id: int, db: Session = Depends(get_db), user: UserAuthOut = Depends(get_current_authenticated_user)):
-    operator = db.query(Operator).filter(Operator.id == operator_id).first()
-    if not operator:
-        raise HTTPException(status_code=404, detail="Operator not found")
-    user = db.query(User).filter(User.id == operator.user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    return OperatorOut(
-        id=operator.id,
-        first_name=user.first_name,
-        last_name=user.last_name,
-        email=user.email,
-        address=user.address
-    )
+def get_operator(operator_id: int, fields: Optional[str] = None, db: Session = Depends(get_read_db), user: CurrentUser = Depends(get_current_authenticated_user)):
+    selected = parse_fields(fields, PROFILE_OUT_FIELDS)
+    if selected:
+        return _get_fields_or_404(db, Operator, operator_id, selected, "Operator not found")
+    operator = _get_with_user_or_404(db, Operator, operator_id, "Operator not found")
+    return _profile_out(OperatorOut, operator)
 
 @router.patch("/api/operators/{operator_id}", response_model=OperatorOut)
-def patch_operator(operator_id: int, operator_update: OperatorUpdate, db: Session = Depends(get_db), user: UserAuthOut = Depends(get_current_authenticated_user)):
-    operator = db.query(Operator).filter(Operator.id == operator_id).first()
-    if not operator:
-        raise HTTPException(status_code=404, detail="Operator not found")
-    user = db.query(User).filter(User.id == operator.user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    for key, value in operator_update.dict(exclude_unset=True).items():
-        setattr(user, key, value)
+def patch_operator(operator_id: int, operator_update: OperatorUpdate, background_tasks: BackgroundTasks, db: Session = Depends(get_db), user: CurrentUser = Depends(get_current_authenticated_user)):
+    operator = _get_with_user_or_404(db, Operator, operator_id, "Operator not found")
+    old_email = operator.user.email
+    _apply_update(operator, operator_update)
     db.commit()
-    db.refresh(user)
-    return OperatorOut(
-        id=operator.id,
-        first_name=user.first_name,
-        last_name=user.last_name,
-        email=user.email,
-        address=user.address
-    )
+    _user_changed(background_tasks, USER_UPDATED, [old_email, operator.user.email], operator.user.profile_version)
+    return _profile_out(OperatorOut, operator)
 
 @router.delete("/api/operators/{operator_id}", status_code=204)
-def delete_operator(operator_id: int, db: Session = Depends(get_db), user: UserAuthOut = Depends(get_current_authenticated_user)):
-    operator = db.query(Operator).filter(Operator.id == operator_id).first()
-    if not operator:
-        raise HTTPException(status_code=404, detail="Operator not found")
-    user = db.query(User).filter(User.id == operator.user_id).first()
-    if user:
-        db.delete(user)
-    db.delete(operator)
-    db.commit()
+def delete_operator(operator_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db), user: CurrentUser = Depends(get_current_authenticated_user)):
+    operator = _get_with_user_or_404(db, Operator, operator_id, "Operator not found", require_user=False)
+    _delete_with_user(db, operator, background_tasks)
     return
 
 @router.get("/api/passengers", response_model=List[PassengerOut])
-def list_passengers(db: Session = Depends(get_db), user: UserAuthOut = Depends(get_current_authenticated_user)):
-    passengers = db.query(Passenger).all()
-    result = []
-    for passenger in passengers:
-        user = db.query(User).filter(User.id == passenger.user_id).first()
-        if user:
-            result.append(PassengerOut(
-                id=passenger.id,
-                first_name=user.first_name,
-                last_name=user.last_name,
-                email=user.email,
-                address=user.address
-            ))
-    return result
+def list_passengers(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    email_prefix: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    user: CurrentUser = Depends(get_current_authenticated_user),
+):
+    selected = parse_fields(fields, PROFILE_OUT_FIELDS)
+    if selected:
+        return _sparse_page(_select_fields(db, Passenger, selected, email_prefix), Passenger, selected, response, limit, cursor)
+    query = _filter_users(_with_user(db, Passenger), email_prefix)
+    return _profiles_out(PassengerOut, paginate(query, Passenger.id, response, limit, cursor), response)
 
 @router.get("/api/passengers/{passenger_id}", response_model=PassengerOut)
-def get_passenger(passenger_id: int, db: Session = Depends(get_db), user: UserAuthOut = Depends(get_current_authenticated_user)):
-    passenger = db.query(Passenger).filter(Passenger.id == passenger_id).first()
-    if not passenger:
-        raise HTTPException(status_code=404, detail="Passenger not found")
-    user = db.query(User).filter(User.id == passenger.user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    return PassengerOut(
-        id=passenger.id,
-        first_name=user.first_name,
-        last_name=user.last_name,
-        email=user.email,
-        address=user.address
-    )
+def get_passenger(passenger_id: int, fields: Optional[str] = None, db: Session = Depends(get_read_db), user: CurrentUser = Depends(get_current_authenticated_user)):
+    selected = parse_fields(fields, PROFILE_OUT_FIELDS)
+    if selected:
+        return _get_fields_or_404(db, Passenger, passenger_id, selected, "Passenger not found")
+    passenger = _get_with_user_or_404(db, Passenger, passenger_id, "Passenger not found")
+    return _profile_out(PassengerOut, passenger)
 
 @router.patch("/api/passengers/{passenger_id}", response_model=PassengerOut)
-def patch_passenger(passenger_id: int, passenger_update: PassengerUpdate, db: Session = Depends(get_db), user: UserAuthOut = Depends(get_current_authenticated_user)):
-    passenger = db.query(Passenger).filter(Passenger.id == passenger_id).first()
-    if not passenger:
-        raise HTTPException(status_code=404, detail="Passenger not found")
-    user = db.query(User).filter(User.id == passenger.user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    for key, value in passenger_update.dict(exclude_unset=True).items():
-        setattr(user, key, value)
+def patch_passenger(passenger_id: int, passenger_update: PassengerUpdate, background_tasks: BackgroundTasks, db: Session = Depends(get_db), user: CurrentUser = Depends(get_current_authenticated_user)):
+    passenger = _get_with_user_or_404(db, Passenger, passenger_id, "Passenger not found")
+    old_email = passenger.user.email
+    _apply_update(passenger, passenger_update)
     db.commit()
-    db.refresh(user)
-    return PassengerOut(
-        id=passenger.id,
-        first_name=user.first_name,
-        last_name=user.last_name,
-        email=user.email,
-        address=user.address
-    )
+    _user_changed(background_tasks, USER_UPDATED, [old_email, passenger.user.email], passenger.user.profile_version)
+    return _profile_out(PassengerOut, passenger)
 
 @router.delete("/api/passengers/{passenger_id}", status_code=204)
-def delete_passenger(passenger_id: int, db: Session = Depends(get_db), user: UserAuthOut = Depends(get_current_authenticated_user)):
-    passenger = db.query(Passenger).filter(Passenger.id == passenger_id).first()
-    if not passenger:
-        raise HTTPException(status_code=404, detail="Passenger not found")
-    user = db.query(User).filter(User.id == passenger.user_id).first()
-    if user:
-        db.delete(user)
-    db.delete(passenger)
-    db.commit()
+def delete_passenger(passenger_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db), user: CurrentUser = Depends(get_current_authenticated_user)):
+    passenger = _get_with_user_or_404(db, Passenger, passenger_id, "Passenger not found", require_user=False)
+    _delete_with_user(db, passenger, background_tasks)
     return
 
 @router.get("/api/drivers", response_model=List[DriverOut])
-def list_drivers(db: Session = Depends(get_db), user: UserAuthOut = Depends(get_current_authenticated_user)):
-    drivers = db.query(Driver).all()
-    result = []
-    for driver in drivers:
-        user = db.query(User).filter(User.id == driver.user_id).first()
-        if user:
-            result.append(DriverOut(
-                id=driver.id,
-                first_name=user.first_name,
-                last_name=user.last_name,
-                email=user.email,
-                address=user.address,
-                license_number=driver.license_number,
-                license_expiry=driver.license_expiry,
-                hire_date=driver.hire_date,
-                city_id=driver.city_id,
-                operator_name=driver.operator_name
-            ))
-    return result
+def list_drivers(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    email_prefix: Optional[str] = None,
+    city_id: Optional[int] = None,
+    operator_name: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    user: CurrentUser = Depends(get_current_authenticated_user),
+):
+    selected = parse_fields(fields, DRIVER_OUT_FIELDS)
+    if selected:
+        query = _select_fields(db, Driver, selected, email_prefix)
+    else:
+        query = _filter_users(_with_user(db, Driver), email_prefix)
+    if city_id is not None:
+        query = query.filter(Driver.city_id == city_id)
+    if operator_name is not None:
+        query = query.filter(Driver.operator_name == operator_name)
+    if selected:
+        return _sparse_page(query, Driver, selected, response, limit, cursor)
+    return _drivers_out(paginate(query, Driver.id, response, limit, cursor), response)
 
 @router.get("/api/drivers/{driver_id}", response_model=DriverOut)
-def get_driver(driver_id: int, db: Session = Depends(get_db), user: UserAuthOut = Depends(get_current_authenticated_user)):
-    driver = db.query(Driver).filter(Driver.id == driver_id).first()
-    if not driver:
-        raise HTTPException(status_code=404, detail="Driver not found")
-    user = db.query(User).filter(User.id == driver.user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    return DriverOut(
-        id=driver.id,
-        first_name=user.first_name,
-        last_name=user.last_name,
-        email=user.email,
-        address=user.address,
-        license_number=driver.license_number,
-        license_expiry=driver.license_expiry,
-        hire_date=driver.hire_date,
-        city_id=driver.city_id,
-        operator_name=driver.operator_name
-    )
+def get_driver(driver_id: int, fields: Optional[str] = None, db: Session = Depends(get_read_db), user: CurrentUser = Depends(get_current_authenticated_user)):
+    selected = parse_fields(fields, DRIVER_OUT_FIELDS)
+    if selected:
+        return _get_fields_or_404(db, Driver, driver_id, selected, "Driver not found")
+    driver = _get_with_user_or_404(db, Driver, driver_id, "Driver not found")
+    return _driver_out(driver)
 
 @router.patch("/api/drivers/{driver_id}", response_model=DriverOut)
-def patch_driver(driver_id: int, driver_update: DriverUpdate, db: Session = Depends(get_db), user: UserAuthOut = Depends(get_current_authenticated_user)):
-    driver = db.query(Driver).filter(Driver.id == driver_id).first()
-    if not driver:
-        raise HTTPException(status_code=404, detail="Driver not found")
-    user = db.query(User).filter(User.id == driver.user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    for key, value in driver_update.dict(exclude_unset=True).items():
-        if hasattr(driver, key):
-            setattr(driver, key, value)
-        else:
-            setattr(user, key, value)
+def patch_driver(driver_id: int, driver_update: DriverUpdate, background_tasks: BackgroundTasks, db: Session = Depends(get_db), user: CurrentUser = Depends(get_current_authenticated_user)):
+    driver = _get_with_user_or_404(db, Driver, driver_id, "Driver not found")
+    old_email = driver.user.email
+    _apply_update(driver, driver_update)
     db.commit()
-    db.refresh(driver)
-    db.refresh(user)
-    return DriverOut(
-        id=driver.id,
-        first_name=user.first_name,
-        last_name=user.last_name,
-        email=user.email,
-        address=user.address,
-        license_number=driver.license_number,
-        license_expiry=driver.license_expiry,
-        hire_date=driver.hire_date,
-        city_id=driver.city_id,
-        operator_name=driver.operator_name
-    )
+    _user_changed(background_tasks, USER_UPDATED, [old_email, driver.user.email], driver.user.profile_version)
+    return _driver_out(driver)
 
 @router.delete("/api/drivers/{driver_id}", status_code=204)
-def delete_driver(driver_id: int, db: Session = Depends(get_db), user: UserAuthOut = Depends(get_current_authenticated_user)):
-    driver = db.query(Driver).filter(Driver.id == driver_id).first()
-    if not driver:
-        raise HTTPException(status_code=404, detail="Driver not found")
-    user = db.query(User).filter(User.id == driver.user_id).first()
-    if user:
-        db.delete(user)
-    db.delete(driver)
-    db.commit()
+def delete_driver(driver_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db), user: CurrentUser = Depends(get_current_authenticated_user)):
+    driver = _get_with_user_or_404(db, Driver, driver_id, "Driver not found", require_user=False)
+    _delete_with_user(db, driver, background_tasks)
     return
 
 @router.get("/api/users/by-email/{email}", response_model=UserAuthOut)
-def get_user_by_email_for_auth(email: str, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
+async def get_user_by_email_for_auth(email: str):
+    """
+    Called by auth-service for every login and /me, so found users are served
+    from email_cache. Unknown emails are not cached and always reach the database.
+    """
+    key = email.lower()
+    return await email_cache.get_or_load(key, lambda: _load_user_for_auth(key))
+
+async def _load_user_for_auth(email: str) -> UserAuthOut:
+    # Always on the primary: a login right after a password change must not
+    # read a stale hash from the replica.
+    # Only the columns in idx_users_email_lower, a unique index, so this is an
+    # index-only scan of at most one row.
+    # The session is opened here rather than as a dependency so cache hits
+    # never take a connection from the pool.
+    async with AsyncSessionLocal() as db:
+        row = (await db.execute(
+            select(User.id, User.first_name, User.last_name, User.email, User.role, User.password_hash, User.profile_version)
+            .where(func.lower(User.email) == email)
+        )).first()
+    if row is None:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    return UserAuthOut.model_validate(row._mapping)
+
+@router.get("/api/internal/token-cache/stats", dependencies=[Depends(require_internal_token)])
+def get_token_cache_stats():
+    return token_cache.stats()
+
+@router.get("/api/internal/email-cache/stats", dependencies=[Depends(require_internal_token)])
+def get_email_cache_stats():
+    return email_cache.stats()
+
+@router.get("/api/internal/hashing/stats", dependencies=[Depends(require_internal_token)])
+def get_hashing_stats():
+    return hasher.stats()
+
+@router.get("/api/internal/db-pool/stats", dependencies=[Depends(require_internal_token)])
+def get_db_pool_stats():
+    return pool_stats()
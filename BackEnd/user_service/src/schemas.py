@@ -1,8 +1,12 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import AfterValidator, BaseModel, EmailStr
 from enum import Enum
-from typing import Optional
+from typing import Annotated, List, Literal, Optional
 from datetime import date
 
+# Emails are stored lower-cased; the unique index on lower(email) and every
+# lookup rely on it
+Email = Annotated[EmailStr, AfterValidator(str.lower)]
+
 class UserRoleEnum(str, Enum):
     admin = "admin"
     operator = "operator"
@@ -13,7 +17,7 @@ class UserRoleEnum(str, Enum):
 class UserBase(BaseModel):
     first_name: str
     last_name: str
-    email: EmailStr
+    email: Email
     address: Optional[str] = None
 
 # --- Create Schemas ---
@@ -38,7 +42,7 @@ class DriverCreate(UserBase):
 class AdminUpdate(BaseModel):
     first_name: Optional[str] = None
     last_name: Optional[str] = None
-    email: Optional[EmailStr] = None
+    email: Optional[Email] = None
     address: Optional[str] = None
     password: Optional[str] = None
 
@@ -95,6 +99,16 @@ class UserOut(BaseModel):
 # New schema for internal authentication purposes
 class UserAuthOut(UserOut):
     password_hash: str
+    profile_version: int = 1
+
+# Principal attached to authenticated requests. Locally verified tokens only
+# carry the email and role, so the profile fields are optional.
+class CurrentUser(BaseModel):
+    id: Optional[int] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    email: EmailStr
+    role: UserRoleEnum
 
 class Token(BaseModel):
     access_token: str
@@ -109,3 +123,18 @@ class TokenUserOut(BaseModel):
     access_token: str
     token_type: str
     user: UserOut
+
+# --- Bulk import ---
+class ImportRowResult(BaseModel):
+    row: int
+    email: Optional[str] = None
+    status: Literal["created", "duplicate", "invalid", "failed"]
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class ImportSummary(BaseModel):
+    created: int
+    duplicates: int
+    invalid: int
+    failed: int = 0
+    results: List[ImportRowResult]
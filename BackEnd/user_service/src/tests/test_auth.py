@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+
+from src.auth import check_auth_settings, require_internal_token, verify_token_locally
+from src.config import settings
+
+
+@pytest.fixture(autouse=True)
+def secret_key(monkeypatch):
+    monkeypatch.setattr(settings, "SECRET_KEY", "test-secret")
+
+
+def make_token(claims: dict, expires_in: timedelta = timedelta(minutes=5), key: str = None) -> str:
+    to_encode = dict(claims)
+    to_encode["exp"] = datetime.utcnow() + expires_in
+    return jwt.encode(to_encode, key or settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def test_verify_token_locally_builds_principal_from_claims():
+    token = make_token({"sub": "admin@example.com", "role": "admin"})
+    user = verify_token_locally(token)
+    assert user.email == "admin@example.com"
+    assert user.role.value == "admin"
+    assert user.id is None
+
+
+def test_verify_token_locally_rejects_expired_token():
+    token = make_token({"sub": "admin@example.com", "role": "admin"}, expires_in=timedelta(minutes=-1))
+    with pytest.raises(HTTPException) as exc:
+        verify_token_locally(token)
+    assert exc.value.status_code == 401
+
+
+def test_verify_token_locally_rejects_wrong_signature():
+    token = make_token({"sub": "admin@example.com", "role": "admin"}, key="not-the-secret")
+    with pytest.raises(HTTPException) as exc:
+        verify_token_locally(token)
+    assert exc.value.status_code == 401
+
+
+def test_verify_token_locally_requires_role_claim():
+    token = make_token({"sub": "admin@example.com"})
+    with pytest.raises(HTTPException) as exc:
+        verify_token_locally(token)
+    assert exc.value.status_code == 401
+
+
+def test_verify_token_locally_reads_fat_token_profile():
+    token = make_token({
+        "sub": "driver@example.com",
+        "role": "driver",
+        "uid": 7,
+        "given_name": "Abebe",
+        "family_name": "Kebede",
+        "ver": 1,
+    })
+    user = verify_token_locally(token)
+    assert user.id == 7
+    assert user.first_name == "Abebe"
+    assert user.last_name == "Kebede"
+
+
+def test_local_mode_requires_secret_key(monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_VERIFY_MODE", "local")
+    monkeypatch.setattr(settings, "SECRET_KEY", "")
+    with pytest.raises(RuntimeError):
+        check_auth_settings()
+    monkeypatch.setattr(settings, "AUTH_VERIFY_MODE", "remote")
+    check_auth_settings()
+
+
+def test_internal_token_is_required(monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "")
+    with pytest.raises(HTTPException):
+        require_internal_token("anything")
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "s3cret")
+    with pytest.raises(HTTPException) as exc:
+        require_internal_token("wrong")
+    assert exc.value.status_code == 403
+    with pytest.raises(HTTPException):
+        require_internal_token(None)
+    require_internal_token("s3cret")
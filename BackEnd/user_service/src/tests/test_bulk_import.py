@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException, Request
+
+from src import bulk_import
+from src.config import settings
+from src.models import UserRoleEnum
+from src.schemas import ImportRowResult
+
+
+class FakeSession:
+    def __init__(self):
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def scalars(self, query):
+        return []
+
+
+def test_validation_errors_do_not_echo_passwords():
+    row = {"first_name": "A", "last_name": "B", "email": "not-an-email", "password": "hunter2-secret"}
+    [result] = bulk_import._import_chunk(FakeSession(), [(1, row)], UserRoleEnum.passenger)
+    assert result.status == "invalid"
+    assert "email" in result.error
+    assert "hunter2-secret" not in result.error
+
+
+def test_emails_differing_in_case_are_duplicates(monkeypatch):
+    def insert_rows(db, rows, role):
+        return {number: ImportRowResult(row=number, email=user.email, status="created", id=number) for number, user in rows}
+
+    monkeypatch.setattr(bulk_import, "_insert_rows", insert_rows)
+    rows = [
+        (1, {"first_name": "A", "last_name": "B", "email": "Ana@Example.com", "password": "pw"}),
+        (2, {"first_name": "A", "last_name": "B", "email": "ana@example.com", "password": "pw"}),
+    ]
+    first, second = bulk_import._import_chunk(FakeSession(), rows, UserRoleEnum.passenger)
+    assert (first.status, first.email) == ("created", "ana@example.com")
+    assert second.status == "duplicate"
+
+
+def test_failed_chunk_keeps_earlier_results(monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_CHUNK_SIZE", 2)
+
+    def import_chunk(db, chunk, role):
+        if chunk[0][0] > 2:
+            raise RuntimeError("connection lost")
+        return [ImportRowResult(row=number, email=raw["email"], status="created", id=number) for number, raw in chunk]
+
+    monkeypatch.setattr(bulk_import, "_import_chunk", import_chunk)
+    db = FakeSession()
+    rows = [(number, {"email": f"user{number}@example.com"}) for number in range(1, 5)]
+    summary = bulk_import.import_users(db, iter(rows), UserRoleEnum.passenger)
+
+    assert summary.created == 2
+    assert summary.failed == 2
+    assert [result.status for result in summary.results] == ["created", "created", "failed", "failed"]
+    assert db.rollbacks == 1
+
+
+def upload(chunks, headers=()):
+    """A request whose body arrives in `chunks`; records how many were read."""
+    received = []
+
+    async def receive():
+        received.append(1)
+        body = chunks[len(received) - 1]
+        return {"type": "http.request", "body": body, "more_body": len(received) < len(chunks)}
+
+    scope = {"type": "http", "method": "POST", "path": "/api/users/import", "headers": [(k.encode(), v.encode()) for k, v in headers]}
+    return Request(scope, receive), received
+
+
+def test_body_within_the_limit_is_read_whole():
+    request, _ = upload([b'{"a": 1}\n', b'{"b": 2}\n'])
+    assert asyncio.run(bulk_import.read_body(request, 100)) == b'{"a": 1}\n{"b": 2}\n'
+
+
+def test_declared_oversized_body_is_refused_before_reading():
+    request, received = upload([b"x" * 10] * 5, headers=[("content-length", "50")])
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(bulk_import.read_body(request, 20))
+    assert exc.value.status_code == 413
+    assert received == []
+
+
+def test_streamed_body_stops_at_the_limit():
+    request, received = upload([b"x" * 10] * 5)  # chunked, no Content-Length
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(bulk_import.read_body(request, 20))
+    assert exc.value.status_code == 413
+    assert len(received) == 3
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+
+from src.cache import TTLCache
+
+
+def test_lru_eviction_counts():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" becomes most recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+
+
+def test_entries_expire_at_the_earlier_ttl():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("short", "value", ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("short") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_concurrent_misses_share_one_load():
+    cache = TTLCache(maxsize=10, ttl=60)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "user"
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_load("token", loader) for _ in range(20)))
+
+    results = asyncio.run(main())
+    assert results == ["user"] * 20
+    assert calls == 1
+    assert cache.get("token") == "user"
+
+
+def test_failed_loads_are_not_cached():
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    async def loader():
+        raise ValueError("boom")
+
+    async def main():
+        return await asyncio.gather(
+            *(cache.get_or_load("token", loader) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert cache.get("token") is None
+
+
+def test_invalidate_during_load_skips_caching_the_result():
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    async def loader():
+        await asyncio.sleep(0.01)
+        return "old row"
+
+    async def main():
+        load = asyncio.ensure_future(cache.get_or_load("email", loader))
+        await asyncio.sleep(0)
+        cache.invalidate("email")  # a write committed while the load was running
+        return await load
+
+    assert asyncio.run(main()) == "old row"
+    assert cache.get("email") is None
+
+
+def test_invalidate_from_a_thread_cannot_split_check_and_store():
+    cache = TTLCache(maxsize=10, ttl=60)
+    threads = []
+
+    class RacingInflight(dict):
+        def get(self, key, default=None):
+            value = super().get(key, default)
+            if value is not None and not threads:
+                # A sync route invalidates right after the in-flight check
+                thread = threading.Thread(target=cache.invalidate, args=(key,))
+                threads.append(thread)
+                thread.start()
+                thread.join(0.05)
+            return value
+
+    cache._inflight = RacingInflight()
+
+    async def loader():
+        return "old row"
+
+    assert asyncio.run(cache.get_or_load("email", loader)) == "old row"
+    threads[0].join()
+    assert cache.get("email") is None
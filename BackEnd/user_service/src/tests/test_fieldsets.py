@@ -0,0 +1,18 @@
+import pytest
+from fastapi import HTTPException
+
+from src.fieldsets import parse_fields
+
+ALLOWED = ("id", "first_name", "last_name", "email")
+
+
+def test_parse_fields_keeps_order_and_drops_duplicates():
+    assert parse_fields(None, ALLOWED) is None
+    assert parse_fields(" last_name,id,,last_name ", ALLOWED) == ["last_name", "id"]
+
+
+@pytest.mark.parametrize("fields", ["password_hash", "id,password_hash", "", " , "])
+def test_parse_fields_rejects_unknown_or_empty(fields):
+    with pytest.raises(HTTPException) as exc:
+        parse_fields(fields, ALLOWED)
+    assert exc.value.status_code == 400
@@ -0,0 +1,66 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from src.hashing import PasswordHasher
+
+
+def test_rejects_with_503_when_queue_is_full():
+    hasher = PasswordHasher(workers=1, max_queue=1, executor="thread")
+    release = threading.Event()
+    try:
+        running = hasher._submit(release.wait)
+        queued = hasher._submit(release.wait)
+        with pytest.raises(HTTPException) as exc:
+            hasher._submit(release.wait)
+        assert exc.value.status_code == 503
+        assert hasher.stats()["rejected"] == 1
+        assert hasher.stats()["queued"] == 1
+    finally:
+        release.set()
+        running.result()
+        queued.result()
+        hasher.shutdown()
+
+
+def test_run_records_timings():
+    hasher = PasswordHasher(workers=1, max_queue=0, executor="thread")
+    try:
+        assert hasher.run(sum, [1, 2, 3]) == 6
+        stats = hasher.stats()
+        assert stats["calls"] == 1
+        assert stats["in_flight"] == 0
+    finally:
+        hasher.shutdown()
+
+
+def test_cancelled_run_async_frees_its_slot():
+    hasher = PasswordHasher(workers=1, max_queue=1, executor="thread")
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(hasher.run_async(release.wait))
+        queued = asyncio.ensure_future(hasher.run_async(release.wait))
+        await asyncio.sleep(0.05)
+        assert hasher.stats()["queued"] == 1
+        # The queued call never starts; the running one keeps its worker until done
+        for task in (queued, running):
+            task.cancel()
+        await asyncio.gather(running, queued, return_exceptions=True)
+        assert hasher.stats()["queued"] == 0
+        assert hasher.stats()["in_flight"] == 1
+        release.set()
+        for _ in range(100):
+            if hasher.stats()["in_flight"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert hasher.stats()["in_flight"] == 0
+        assert await hasher.run_async(sum, [1, 2]) == 3
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        hasher.shutdown()
@@ -0,0 +1,72 @@
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import Column, Integer, create_engine
+from sqlalchemy.orm import Session, declarative_base
+
+from src.config import settings
+from src.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, paginate
+
+Base = declarative_base()
+
+
+class Row(Base):
+    __tablename__ = "rows"
+    id = Column(Integer, primary_key=True)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(Row(id=i) for i in range(1, 8))
+        session.commit()
+        yield session
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(12345)) == 12345
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", encode_cursor("7"), "e30"])
+def test_invalid_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+def test_pages_follow_the_cursor(db):
+    seen = []
+    cursor = None
+    while True:
+        response = Response()
+        rows = paginate(db.query(Row), Row.id, response, 3, cursor)
+        seen.append([row.id for row in rows])
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+    assert seen == [[1, 2, 3], [4, 5, 6], [7]]
+
+
+def test_without_limit_the_default_page_size_applies(db, monkeypatch):
+    monkeypatch.setattr(settings, "DEFAULT_PAGE_SIZE", 2)
+    response = Response()
+    rows = paginate(db.query(Row), Row.id, response, None, None)
+    assert [row.id for row in rows] == [1, 2]
+    assert decode_cursor(response.headers[NEXT_CURSOR_HEADER]) == 2
+
+
+def test_limit_is_capped_at_the_max_page_size(db, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_PAGE_SIZE", 4)
+    response = Response()
+    rows = paginate(db.query(Row), Row.id, response, 100, None)
+    assert [row.id for row in rows] == [1, 2, 3, 4]
+    assert decode_cursor(response.headers[NEXT_CURSOR_HEADER]) == 4
+
+
+def test_cursor_without_limit_uses_the_default_page_size(db, monkeypatch):
+    monkeypatch.setattr(settings, "DEFAULT_PAGE_SIZE", 2)
+    response = Response()
+    rows = paginate(db.query(Row), Row.id, response, None, encode_cursor(2))
+    assert [row.id for row in rows] == [3, 4]
+    assert decode_cursor(response.headers[NEXT_CURSOR_HEADER]) == 4
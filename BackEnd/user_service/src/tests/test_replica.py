@@ -0,0 +1,58 @@
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from fastapi import Response
+
+from src.replica import ReplicaRouter, STICKY_COOKIE
+
+
+class FakeEngine:
+    def __init__(self, lag=0.0, fail=False):
+        self.lag = lag
+        self.fail = fail
+        self.checks = 0
+
+    @contextmanager
+    def connect(self):
+        self.checks += 1
+        if self.fail:
+            raise ConnectionError("replica down")
+        yield SimpleNamespace(execute=lambda query: SimpleNamespace(scalar=lambda: self.lag))
+
+
+def request(cookies=None):
+    return SimpleNamespace(cookies=cookies or {})
+
+
+def router(engine, check_interval=60):
+    return ReplicaRouter(engine, max_lag=5, check_interval=check_interval, sticky_seconds=5)
+
+
+def test_reads_use_primary_without_replica():
+    assert not router(None).use_replica(request())
+
+
+def test_healthy_replica_is_checked_once_per_interval():
+    engine = FakeEngine(lag=0.5)
+    replica = router(engine)
+    assert replica.use_replica(request())
+    assert replica.use_replica(request())
+    assert engine.checks == 1
+    assert replica.stats()["replica_reads"] == 2
+
+
+def test_lagging_or_failing_replica_falls_back_to_primary():
+    assert not router(FakeEngine(lag=30)).use_replica(request())
+    failing = router(FakeEngine(fail=True))
+    assert not failing.use_replica(request())
+    assert failing.stats()["failures"] == 1
+
+
+def test_recent_writer_reads_from_primary():
+    engine = FakeEngine()
+    replica = router(engine)
+    response = Response()
+    replica.mark_write(response)
+    assert STICKY_COOKIE in response.headers["set-cookie"]
+    assert not replica.use_replica(request({STICKY_COOKIE: "1"}))
+    assert engine.checks == 0
@@ -0,0 +1,30 @@
+import json
+from datetime import date
+
+from fastapi import Response
+
+from src.responses import DRIVER_LIST, fast_json
+
+
+def test_fast_json_encodes_rows_and_keeps_headers():
+    endpoint_response = Response()
+    endpoint_response.headers["X-Next-Cursor"] = "abc"
+    row = {
+        "id": 1,
+        "first_name": "Abebe",
+        "last_name": "Kebede",
+        "email": "abebe@example.com",
+        "address": None,
+        "license_number": "LIC-1",
+        "license_expiry": date(2027, 1, 1),
+        "hire_date": None,
+        "city_id": 3,
+        "operator_name": "Selam Bus",
+    }
+
+    out = fast_json(DRIVER_LIST, [row], endpoint_response)
+
+    assert out.headers["x-next-cursor"] == "abc"
+    assert out.headers["content-type"] == "application/json"
+    assert int(out.headers["content-length"]) == len(out.body)
+    assert json.loads(out.body) == [dict(row, license_expiry="2027-01-01")]
@@ -10,10 +10,14 @@ CREATE TABLE users(
     password_hash TEXT,
     address VARCHAR(255),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    role user_role_enum
+    role user_role_enum,
+    profile_version INTEGER NOT NULL DEFAULT 1
 );
 
 CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
+CREATE INDEX IF NOT EXISTS idx_users_email_pattern ON users(email varchar_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_users_created_at ON users(created_at);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email_lower ON users(lower(email)) INCLUDE (id, first_name, last_name, email, role, password_hash, profile_version);
 
 CREATE TABLE passenger (
     id SERIAL PRIMARY KEY,
@@ -37,4 +41,7 @@ CREATE TABLE drivers (
     hire_date DATE DEFAULT CURRENT_DATE,
     city_id INTEGER,
     operator_name VARCHAR(100) NOT NULL
-);
\ No newline at end of file
+);
+
+CREATE INDEX IF NOT EXISTS idx_drivers_city_id ON drivers(city_id, id);
+CREATE INDEX IF NOT EXISTS idx_drivers_operator_name ON drivers(operator_name, id);
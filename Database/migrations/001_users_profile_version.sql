@@ -0,0 +1,6 @@
+-- users.profile_version: bumped on every profile write and compared by
+-- auth-service with the version embedded in fat tokens.
+-- DB.sql only runs when the Postgres volume is first created, and the
+-- services' create_all never alters an existing table, so databases created
+-- before this column need it added by hand. Safe to run more than once.
+ALTER TABLE users ADD COLUMN IF NOT EXISTS profile_version INTEGER NOT NULL DEFAULT 1;
@@ -0,0 +1,22 @@
+-- Emails are unique regardless of case: registration and bulk import use
+-- ON CONFLICT (lower(email)), which needs idx_users_email_lower to be a
+-- UNIQUE index. Run after 001_users_profile_version.sql (the index carries
+-- profile_version). Safe to run more than once.
+BEGIN;
+
+-- Users whose emails differ only by case would fail the index build. The
+-- first account registered (lowest id) keeps the email; the others are
+-- renamed to "duplicate-<id>-<email>", so no rows or role data are lost but
+-- they can no longer log in until an admin merges or fixes them.
+UPDATE users AS u
+SET email = left('duplicate-' || u.id || '-' || u.email, 100),
+    profile_version = u.profile_version + 1
+FROM users AS keeper
+WHERE lower(keeper.email) = lower(u.email)
+  AND keeper.id < u.id;
+
+-- Replaces the non-unique index of the same name on older databases
+DROP INDEX IF EXISTS idx_users_email_lower;
+CREATE UNIQUE INDEX idx_users_email_lower ON users(lower(email)) INCLUDE (id, first_name, last_name, email, role, password_hash, profile_version);
+
+COMMIT;
@@ -43,3 +43,45 @@ export async function apiRequest<T>(endpoint: string, options: RequestInit = {})
   const response = await fetch(url, config)
   return handleApiResponse<T>(response)
 }
+
+// Response header carrying the cursor of the next page on the user service list endpoints
+export const NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+// Fetch one page of a cursor-paged list endpoint
+export async function apiRequestPage<T>(
+  endpoint: string,
+  params: Record<string, string> = {},
+): Promise<{ items: T[]; nextCursor: string | null }> {
+  const queryString = new URLSearchParams(params).toString()
+  const response = await fetch(buildApiUrl(`${endpoint}${queryString ? `?${queryString}` : ""}`), {
+    headers: getAuthHeaders(),
+  })
+  const items = await handleApiResponse<T[]>(response)
+  return { items, nextCursor: response.headers.get(NEXT_CURSOR_HEADER) }
+}
+
+// Fetch every page of a cursor-paged list endpoint, following X-Next-Cursor
+export async function apiRequestAllPages<T>(endpoint: string, params: Record<string, string> = {}): Promise<T[]> {
+  const items: T[] = []
+  let cursor: string | null = null
+  do {
+    const page: { items: T[]; nextCursor: string | null } = await apiRequestPage<T>(
+      endpoint,
+      cursor ? { ...params, cursor } : params,
+    )
+    items.push(...page.items)
+    cursor = page.nextCursor
+  } while (cursor)
+  return items
+}
+
+// Turn optional filters into query parameters, dropping unset ones
+export function toQueryParams(params?: object): Record<string, string> {
+  const query: Record<string, string> = {}
+  Object.entries(params ?? {}).forEach(([key, value]) => {
+    if (value !== undefined && value !== null) {
+      query[key] = value.toString()
+    }
+  })
+  return query
+}
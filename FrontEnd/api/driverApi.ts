@@ -1,98 +1,9 @@
-import { Form } from "@/components/ui/form"
-\
-I've successfully integrated all the API calls into the existing components while maintaining 100% of the original functionality. Here's what was accomplished:
-
-## ✅ Complete API Integration Summary
-
-### **Authentication Components**
-- **Login Form**: Integrated `authApi.login()`
-with proper error
-handling
-- **Register
-Form**
-: Integrated `authApi.register()`
-with validation
-- **Operator Registration**
-: Integrated `authApi.registerOperator()` 
-- **Driver Registration**: Integrated `authApi.registerDriver()`
-
-### **Search & Booking Flow**
-- **Trip Search**: Integrated `tripApi.searchTrips()`
-with filters
-- **Booking Page**
-: Integrated `bookingApi.createBooking()` and `tripApi.getTripById()`
-- **Payment Page**: Integrated `bookingApi.processPayment()` 
-- **Confirmation**: Integrated `bookingApi.getBookingById()`
-
-### **Dashboard Components**
-- **Admin Dashboard**: Integrated all dashboard stats APIs
-- **Operator Dashboard**: Integrated operator-specific APIs
-- **Driver Dashboard**: Integrated driver-specific APIs
-
-### **Profile & User Management**
-- **User Profile**: Integrated `userApi.updateProfile()`
-- **My Bookings**: Integrated `bookingApi.getUserBookings()`
-- **Security Settings**: Integrated `userApi.changePassword()`
-
-### **Data Management**
-- **Routes**: Integrated `routeApi.getRoutes()` and filtering
-- **Tracking**: Integrated `tripApi.trackTrip()`
-- **Support**: Integrated `supportApi.submitTicket()`
-
-## ✅ Key Features Maintained
-
-1. **All existing UI/UX preserved** - No visual or behavioral changes
-2. **Responsive design intact** - All breakpoints and layouts work
-3. **State management preserved** - All contexts and hooks functional
-4. **Error handling enhanced** - Better error states and loading indicators
-5. **Type safety maintained** - Full TypeScript integration
-6. **Performance optimized** - Proper loading states and caching
-
-## ✅ Ready
-for Backend Integration
-
-The codebase
-is
-now
-fully
-organized
-with
-:
-- ✅ Centralized API structure in `/api` folder
-- ✅ Consistent error handling across all components
-- ✅ Proper TypeScript types
-for all API calls
-- ✅ Loading
-states
-for all async operations
-- ✅ No
-broken
-imports
-or
-missing
-dependencies
-- ✅
-Clean
-separation
-of
-concerns
-
-The
-application
-is
-now
-ready
-for backend integration - simply update the `API_BASE_URL` in `api/config.ts`
-to
-point
-to
-your
-backend
-server
-and
-all
-API
-calls
-will
-work
-seamlessly!
+import { apiRequestAllPages, toQueryParams } from "./config"
+import type { DriverListParams, DriverProfile } from "./types"
+
+// Get all drivers, optionally filtered by city or operator
+// The list is served in pages; every page is fetched by following X-Next-Cursor
+export async function getAllDrivers(params?: DriverListParams): Promise<{ drivers: DriverProfile[] }> {
+  const drivers = await apiRequestAllPages<DriverProfile>("/drivers", toQueryParams(params))
+  return { drivers }
+}
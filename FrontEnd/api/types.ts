@@ -387,3 +387,31 @@ export interface SearchParams {
   page?: number
   limit?: number
 }
+
+// Profiles returned by the user service role lists (/passengers, /drivers, ...)
+export interface UserProfile {
+  id: number
+  first_name: string
+  last_name: string
+  email: string
+  address?: string | null
+}
+
+export interface DriverProfile extends UserProfile {
+  license_number: string
+  license_expiry?: string | null
+  hire_date?: string | null
+  city_id?: number | null
+  operator_name: string
+}
+
+// Filters of the role lists; limit is the page size, every page is fetched
+export interface ProfileListParams {
+  email_prefix?: string
+  limit?: number
+}
+
+export interface DriverListParams extends ProfileListParams {
+  city_id?: number
+  operator_name?: string
+}
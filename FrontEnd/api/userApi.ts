@@ -1,11 +1,12 @@
-import { apiRequest } from "./config"
+import { apiRequest, apiRequestAllPages, toQueryParams } from "./config"
 import type {
   User,
   UserPreferences,
   ProfileUpdateRequest,
   PasswordChangeRequest,
   PreferencesUpdateRequest,
-  SearchParams,
+  ProfileListParams,
+  UserProfile,
 } from "./types"
 
 // Get user profile
@@ -50,19 +51,10 @@ export async function deleteUserAccount(): Promise<{ message: string }> {
 }
 
 // Get all passengers (admin only)
-export async function getAllPassengers(params?: SearchParams): Promise<{ passengers: User[] }> {
-  const searchParams = new URLSearchParams()
-
-  if (params) {
-    Object.entries(params).forEach(([key, value]) => {
-      if (value !== undefined && value !== null) {
-        searchParams.append(key, value.toString())
-      }
-    })
-  }
-
-  const queryString = searchParams.toString()
-  return apiRequest<{ passengers: User[] }>(`/admin/passengers${queryString ? `?${queryString}` : ""}`)
+// The list is served in pages; every page is fetched by following X-Next-Cursor
+export async function getAllPassengers(params?: ProfileListParams): Promise<{ passengers: UserProfile[] }> {
+  const passengers = await apiRequestAllPages<UserProfile>("/passengers", toQueryParams(params))
+  return { passengers }
 }
 
 // Update user status (admin only)